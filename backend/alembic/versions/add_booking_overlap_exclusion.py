@@ -0,0 +1,101 @@
+"""add exclusion constraint against overlapping bookings of a jet
+
+Revision ID: add_booking_overlap_exclusion
+Revises: add_pagination_indexes
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from alembic import op
+from bisect import bisect_left
+import logging
+import sqlalchemy as sa
+
+logger = logging.getLogger('alembic.runtime.migration')
+
+# revision identifiers, used by Alembic.
+revision = 'add_booking_overlap_exclusion'
+down_revision = 'add_pagination_indexes'
+branch_labels = None
+depends_on = None
+
+# Name checked by routers/bookings.py (services/availability.BOOKING_OVERLAP_CONSTRAINT)
+CONSTRAINT = 'bookings_no_overlap'
+
+def _btree_gist_available() -> bool:
+    context = op.get_context()
+    if context.dialect.name != 'postgresql':
+        return False
+    if context.as_sql:
+        # Offline (--sql) scripts assume the extension can be installed
+        return True
+    return op.get_bind().execute(sa.text("SELECT 1 FROM pg_available_extensions WHERE name = 'btree_gist'")).scalar() is not None
+
+LIVE = "status <> 'cancelled'"
+
+def _cancel_overlapping_bookings():
+    """Cancel live bookings that overlap an earlier booking of the same jet.
+
+    The constraint cannot be added while such rows exist. The booking made
+    first (by created_at, then id) keeps the jet; each later one that clashes
+    with a booking being kept is cancelled and logged, so it can be followed
+    up with the customer.
+    """
+    if op.get_context().as_sql:
+        # No rows to look at offline: cancel every booking that overlaps an earlier one
+        op.execute(
+            "UPDATE bookings AS later SET status = 'cancelled', updated_at = now() "
+            f"WHERE later.{LIVE} AND later.start_time < later.end_time AND EXISTS (SELECT 1 FROM bookings AS earlier "
+            f"WHERE earlier.{LIVE} AND earlier.start_time < earlier.end_time AND earlier.jet_id = later.jet_id "
+            "AND (earlier.created_at, earlier.id) < (later.created_at, later.id) "
+            "AND earlier.start_time < later.end_time AND later.start_time < earlier.end_time)"
+        )
+        return
+    bind = op.get_bind()
+    inverted = bind.execute(sa.text(f"SELECT id FROM bookings WHERE {LIVE} AND end_time < start_time")).scalars().all()
+    if inverted:
+        raise RuntimeError(
+            f"{len(inverted)} live bookings end before they start and cannot be checked for overlaps; "
+            f"fix or cancel them first: {', '.join(str(booking_id) for booking_id in inverted)}"
+        )
+    rows = bind.execute(sa.text(
+        f"SELECT id, jet_id, start_time, end_time FROM bookings WHERE {LIVE} "
+        "ORDER BY jet_id, created_at, id"
+    ))
+    kept = {}  # jet_id -> (sorted starts, ends in the same order) of the bookings kept so far
+    cancelled = []
+    for booking_id, jet_id, start_time, end_time in rows:
+        if start_time == end_time:
+            # An empty range overlaps nothing
+            continue
+        starts, ends = kept.setdefault(jet_id, ([], []))
+        # Kept bookings never overlap, so only the neighbours of the insertion point can clash
+        index = bisect_left(starts, start_time)
+        if (index > 0 and ends[index - 1] > start_time) or (index < len(starts) and starts[index] < end_time):
+            cancelled.append((booking_id, jet_id))
+            continue
+        starts.insert(index, start_time)
+        ends.insert(index, end_time)
+    for booking_id, jet_id in cancelled:
+        logger.warning(f"Cancelling booking {booking_id}: it overlaps an earlier booking of jet {jet_id}")
+    if cancelled:
+        bind.execute(
+            sa.text("UPDATE bookings SET status = 'cancelled', updated_at = now() WHERE id = ANY(:ids)"),
+            {"ids": [booking_id for booking_id, _ in cancelled]},
+        )
+
+def upgrade():
+    # Booking creation already serializes on the jet row lock; the constraint
+    # is a second line of defence for writes that bypass the API.
+    if not _btree_gist_available():
+        logger.warning("btree_gist is not available; skipping the bookings overlap exclusion constraint")
+        return
+    op.execute('CREATE EXTENSION IF NOT EXISTS btree_gist')
+    _cancel_overlapping_bookings()
+    op.execute(
+        f"ALTER TABLE bookings ADD CONSTRAINT {CONSTRAINT} EXCLUDE USING gist "
+        "(jet_id WITH =, tstzrange(start_time, end_time, '[)') WITH &&) "
+        "WHERE (status <> 'cancelled')"
+    )
+
+def downgrade():
+    op.execute(f'ALTER TABLE bookings DROP CONSTRAINT IF EXISTS {CONSTRAINT}')
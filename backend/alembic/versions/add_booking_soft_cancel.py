@@ -0,0 +1,52 @@
+"""keep cancelled bookings: cancelled_at column and partial indexes on live bookings
+
+Revision ID: add_booking_soft_cancel
+Revises: add_booking_overlap_exclusion
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_booking_soft_cancel'
+down_revision = 'add_booking_overlap_exclusion'
+branch_labels = None
+depends_on = None
+
+# Must match services/availability.live_bookings, or the planner cannot use the indexes
+LIVE = "status <> 'cancelled'"
+
+# (name, columns, where), mirrored by __table_args__ on models/booking.py
+PARTIAL_INDEXES = [
+    ('ix_bookings_live_jet_id_start_time_end_time', ['jet_id', 'start_time', 'end_time'], LIVE),
+    ('ix_bookings_live_user_id_created_at_id', ['user_id', 'created_at', 'id'], LIVE),
+    ('ix_bookings_cancelled_at', ['cancelled_at'], 'cancelled_at IS NOT NULL'),
+]
+
+def upgrade():
+    op.add_column('bookings', sa.Column('cancelled_at', sa.DateTime(timezone=True), nullable=True))
+    # Best available timestamp for bookings cancelled before the column existed
+    op.execute("UPDATE bookings SET cancelled_at = updated_at WHERE status = 'cancelled' AND cancelled_at IS NULL")
+    # CONCURRENTLY keeps the table writable while the indexes build
+    with op.get_context().autocommit_block():
+        for name, columns, where in PARTIAL_INDEXES:
+            op.create_index(
+                name, 'bookings', columns,
+                postgresql_where=sa.text(where),
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+        # Superseded by the partial index on live bookings
+        op.drop_index('ix_bookings_jet_id_start_time_end_time', table_name='bookings', postgresql_concurrently=True, if_exists=True)
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_bookings_jet_id_start_time_end_time', 'bookings', ['jet_id', 'start_time', 'end_time'],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        for name, _, _ in PARTIAL_INDEXES:
+            op.drop_index(name, table_name='bookings', postgresql_concurrently=True, if_exists=True)
+    op.drop_column('bookings', 'cancelled_at')
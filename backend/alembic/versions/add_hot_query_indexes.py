@@ -0,0 +1,64 @@
+"""add indexes for hot query predicates
+
+Revision ID: add_hot_query_indexes
+Revises: add_location_to_jets
+Create Date: 2026-10-17 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_hot_query_indexes'
+down_revision = 'add_location_to_jets'
+branch_labels = None
+depends_on = None
+
+# (name, table, columns), mirrored by index=True / __table_args__ on the models
+BTREE_INDEXES = [
+    ('ix_bookings_user_id', 'bookings', ['user_id']),
+    ('ix_bookings_jet_id_start_time_end_time', 'bookings', ['jet_id', 'start_time', 'end_time']),
+    ('ix_ownership_shares_user_id', 'ownership_shares', ['user_id']),
+    ('ix_jets_status', 'jets', ['status']),
+    ('ix_jets_price_per_hour', 'jets', ['price_per_hour']),
+    ('ix_jets_range_nm', 'jets', ['range_nm']),
+]
+
+# Trigram GIN indexes serve ILIKE '%...%'. They are migration-only because
+# create_all cannot assume the pg_trgm extension exists.
+TRIGRAM_INDEXES = [
+    ('ix_jets_location_trgm', 'jets', 'location'),
+    ('ix_jet_categories_name_trgm', 'jet_categories', 'name'),
+]
+
+def _pg_trgm_available() -> bool:
+    context = op.get_context()
+    if context.dialect.name != 'postgresql':
+        return False
+    if context.as_sql:
+        # Offline (--sql) scripts assume the extension can be installed
+        return True
+    return op.get_bind().execute(sa.text("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")).scalar() is not None
+
+def upgrade():
+    # CONCURRENTLY keeps the tables writable while the indexes build
+    with op.get_context().autocommit_block():
+        for name, table, columns in BTREE_INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+        if _pg_trgm_available():
+            op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+            for name, table, column in TRIGRAM_INDEXES:
+                op.create_index(
+                    name, table, [column],
+                    postgresql_using='gin',
+                    postgresql_ops={column: 'gin_trgm_ops'},
+                    postgresql_concurrently=True,
+                    if_not_exists=True,
+                )
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, _ in TRIGRAM_INDEXES:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+        for name, table, _ in reversed(BTREE_INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
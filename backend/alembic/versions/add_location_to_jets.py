@@ -0,0 +1,22 @@
+"""add location to jets
+
+Revision ID: add_location_to_jets
+Revises: 12f525463e91, add_updated_at_to_memberships
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+# Also merges the two independent root revisions into a single head.
+revision = 'add_location_to_jets'
+down_revision = ('12f525463e91', 'add_updated_at_to_memberships')
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.add_column('jets', sa.Column('location', sa.String(100), nullable=True))
+
+def downgrade():
+    op.drop_column('jets', 'location')
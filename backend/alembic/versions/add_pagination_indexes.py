@@ -0,0 +1,26 @@
+"""add (created_at, id) indexes for keyset pagination
+
+Revision ID: add_pagination_indexes
+Revises: add_hot_query_indexes
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'add_pagination_indexes'
+down_revision = 'add_hot_query_indexes'
+branch_labels = None
+depends_on = None
+
+TABLES = ['users', 'jets', 'bookings', 'memberships', 'ownership_shares']
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        for table in TABLES:
+            op.create_index(f'ix_{table}_created_at_id', table, ['created_at', 'id'], postgresql_concurrently=True, if_not_exists=True)
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for table in reversed(TABLES):
+            op.drop_index(f'ix_{table}_created_at_id', table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,58 @@
+"""Measure in-process throughput of a single API endpoint.
+
+Drives the FastAPI app through httpx's ASGI transport, so the numbers cover
+routing, dependencies, database access and logging but not the network or
+uvicorn. Point DATABASE_URL at a seeded database before running.
+
+Usage:
+    python -m backend.benchmarks.bench_endpoint --path /api/v1/jets/ --requests 2000 --concurrency 50
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+async def run(path: str, total: int, concurrency: int, warmup: int) -> None:
+    from backend.main import app
+    from backend.database import async_engine
+
+    latencies = []
+    statuses = {}
+    remaining = iter(range(total))
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        for _ in range(warmup):
+            await client.get(path)
+
+        async def worker():
+            for _ in remaining:
+                start = time.perf_counter()
+                response = await client.get(path)
+                latencies.append(time.perf_counter() - start)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    await async_engine.dispose()
+
+    latencies.sort()
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(f"path={path} requests={total} concurrency={concurrency} statuses={statuses}")
+    print(f"throughput={total / elapsed:.1f} req/s")
+    print(f"latency p50={statistics.median(latencies) * 1000:.2f}ms p99={p99 * 1000:.2f}ms")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--path", default="/api/v1/jets/")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(run(args.path, args.requests, args.concurrency, args.warmup))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""Show how the hot-query indexes change PostgreSQL query plans.
+
+The script copies the current table definitions into a scratch schema and
+seeds it with synthetic users, jets, bookings and ownership shares. It runs
+EXPLAIN ANALYZE on the hot queries, creates the secondary indexes declared
+on the models (plus the pg_trgm indexes from the add_hot_query_indexes
+migration when the extension is available), and runs the queries again. The
+scratch schema is dropped at the end. Point DATABASE_URL at a PostgreSQL
+database where you can create schemas.
+
+Usage:
+    python -m backend.benchmarks.explain_hot_queries --bookings 500000 --jets 50000 --users 20000
+"""
+import argparse
+import json
+from datetime import timedelta
+
+from sqlalchemy import text
+
+SCHEMA = "bench_hot_queries"
+TABLES = ["users", "jet_categories", "jets", "bookings", "ownership_shares"]
+CITIES = ["Teterboro", "Van Nuys", "Miami-Opa Locka", "Dallas Love Field", "London Farnborough",
+          "Paris Le Bourget", "Aspen", "Scottsdale", "Boca Raton", "White Plains", "Nice", "Geneva"]
+
+QUERIES = [
+    ("bookings by user", "SELECT * FROM bookings WHERE user_id = :user_id"),
+    ("user by email", "SELECT * FROM users WHERE email = :email"),
+    ("ownership shares by user", "SELECT * FROM ownership_shares WHERE user_id = :user_id"),
+    ("jet search price/range",
+     "SELECT * FROM jets WHERE status = 'available' AND price_per_hour BETWEEN 2000 AND 2200 AND range_nm >= 7000"),
+    ("jet location ILIKE", "SELECT * FROM jets WHERE location ILIKE '%boro%'"),
+    ("jet category ILIKE",
+     "SELECT jets.* FROM jets JOIN jet_categories ON jets.category_id = jet_categories.id "
+     "WHERE jets.status = 'available' AND jet_categories.name ILIKE '%ultra%'"),
+    ("availability overlap",
+     "SELECT id FROM bookings WHERE jet_id = :jet_id AND start_time < :end_time AND end_time > :start_time"),
+]
+
+def create_schema(conn) -> None:
+    conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+    conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+    for table in TABLES:
+        # Column types and defaults only, i.e. the schema as it was before the migration
+        conn.execute(text(f"CREATE TABLE {SCHEMA}.{table} (LIKE public.{table} INCLUDING DEFAULTS)"))
+        conn.execute(text(f"ALTER TABLE {SCHEMA}.{table} ADD PRIMARY KEY (id)"))
+    conn.execute(text(f"ALTER TABLE {SCHEMA}.users ADD UNIQUE (email)"))
+    conn.execute(text(f"SET search_path TO {SCHEMA}, public"))
+
+def seed(conn, users: int, jets: int, bookings: int) -> None:
+    conn.execute(text(
+        "INSERT INTO users (id, email, password_hash, role) "
+        "SELECT gen_random_uuid(), 'user' || g || '@example.com', 'x', 'user' FROM generate_series(1, :n) g"
+    ), {"n": users})
+    conn.execute(text(
+        "INSERT INTO jet_categories (id, name) SELECT gen_random_uuid(), name "
+        "FROM unnest(ARRAY['Light Jet', 'Midsize Jet', 'Super Midsize Jet', 'Heavy Jet', 'Ultra Long Range']) name"
+    ))
+    conn.execute(text(
+        "WITH c AS (SELECT array_agg(id) AS ids FROM jet_categories) "
+        "INSERT INTO jets (id, name, manufacturer, category_id, max_passengers, price_per_hour, status, location, range_nm) "
+        "SELECT gen_random_uuid(), 'Jet ' || g, 'Maker', c.ids[1 + g % 5], 4 + g % 16, "
+        "       1500 + (g * 37) % 10000, CASE WHEN g % 10 = 0 THEN 'maintenance' ELSE 'available' END, "
+        "       (:cities)[1 + (g * 7) % :city_count] || ' ' || (g % 97), 1000 + (g * 53) % 6500 "
+        "FROM generate_series(1, :n) g, c"
+    ), {"n": jets, "cities": CITIES, "city_count": len(CITIES)})
+    conn.execute(text(
+        "WITH u AS (SELECT array_agg(id) AS ids FROM users), j AS (SELECT array_agg(id) AS ids FROM jets) "
+        "INSERT INTO bookings (id, user_id, jet_id, origin, destination, start_time, end_time, status, passengers) "
+        "SELECT gen_random_uuid(), u.ids[1 + (g::bigint * 7919) % cardinality(u.ids)], j.ids[1 + (g::bigint * 104729) % cardinality(j.ids)], "
+        "       'A', 'B', s, s + interval '4 hours', 'confirmed', 2 "
+        "FROM generate_series(1, :n) g, u, j, LATERAL (SELECT now() + (g % 8760) * interval '1 hour' AS s) t"
+    ), {"n": bookings})
+    conn.execute(text(
+        "WITH u AS (SELECT array_agg(id) AS ids FROM users), j AS (SELECT array_agg(id) AS ids FROM jets) "
+        "INSERT INTO ownership_shares (id, user_id, jet_id, share_fraction, purchase_date, purchase_price, status) "
+        "SELECT gen_random_uuid(), u.ids[1 + (g * 31) % cardinality(u.ids)], j.ids[1 + g % cardinality(j.ids)], "
+        "       0.25, now(), 500000, 'active' "
+        "FROM generate_series(1, :n) g, u, j"
+    ), {"n": users})
+    for table in TABLES:
+        conn.execute(text(f"ANALYZE {table}"))
+
+def create_indexes(conn) -> bool:
+    """Create the migration's indexes in the scratch schema; return whether trigram indexes were built."""
+    from backend import models
+
+    for model in (models.Booking, models.OwnershipShare, models.Jet):
+        for index in model.__table__.indexes:
+            index.create(conn)
+    trigram = conn.execute(text("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")).scalar() is not None
+    if trigram:
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        conn.execute(text("CREATE INDEX ix_jets_location_trgm ON jets USING gin (location gin_trgm_ops)"))
+        conn.execute(text("CREATE INDEX ix_jet_categories_name_trgm ON jet_categories USING gin (name gin_trgm_ops)"))
+    for table in TABLES:
+        conn.execute(text(f"ANALYZE {table}"))
+    return trigram
+
+def _scans(plan: dict) -> list:
+    nodes = []
+    if "Relation Name" in plan or "Index Name" in plan:
+        label = plan["Node Type"]
+        if plan.get("Index Name"):
+            label += f" using {plan['Index Name']}"
+        else:
+            label += f" on {plan['Relation Name']}"
+        nodes.append(label)
+    for child in plan.get("Plans", []):
+        nodes.extend(_scans(child))
+    return nodes
+
+def explain(conn, params: dict, verbose: bool) -> dict:
+    results = {}
+    for name, sql in QUERIES:
+        row = conn.execute(text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}"), params).scalar()
+        plan = (row if isinstance(row, list) else json.loads(row))[0]
+        results[name] = (plan["Execution Time"], _scans(plan["Plan"]))
+        if verbose:
+            text_plan = conn.execute(text(f"EXPLAIN ANALYZE {sql}"), params).scalars().all()
+            print(f"-- {name}\n" + "\n".join(text_plan) + "\n")
+    return results
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=20000)
+    parser.add_argument("--jets", type=int, default=50000)
+    parser.add_argument("--bookings", type=int, default=500000)
+    parser.add_argument("--verbose", action="store_true", help="Print the full text plans")
+    args = parser.parse_args()
+
+    from backend.database import engine
+
+    with engine.connect() as conn:
+        try:
+            create_schema(conn)
+            seed(conn, args.users, args.jets, args.bookings)
+            sample = conn.execute(text(
+                "SELECT b.user_id, u.email, b.jet_id, b.start_time FROM bookings b JOIN users u ON u.id = b.user_id LIMIT 1"
+            )).one()
+            params = {
+                "user_id": sample.user_id,
+                "email": sample.email,
+                "jet_id": sample.jet_id,
+                "start_time": sample.start_time,
+                "end_time": sample.start_time + timedelta(hours=6),
+            }
+            before = explain(conn, params, args.verbose)
+            trigram = create_indexes(conn)
+            after = explain(conn, params, args.verbose)
+        finally:
+            conn.rollback()
+            conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+            conn.commit()
+
+    print(f"users={args.users} jets={args.jets} bookings={args.bookings} pg_trgm={'yes' if trigram else 'unavailable'}")
+    for name, _ in QUERIES:
+        before_ms, before_scans = before[name]
+        after_ms, after_scans = after[name]
+        print(f"{name}:")
+        print(f"  before {before_ms:9.3f}ms  {', '.join(before_scans)}")
+        print(f"  after  {after_ms:9.3f}ms  {', '.join(after_scans)}")
+
+if __name__ == "__main__":
+    main()
@@ -11,6 +11,10 @@ END $$;
 
 -- Enable UUID extension
 CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
+-- Trigram matching for ILIKE '%...%' searches
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+-- GiST equality on UUIDs, for the bookings overlap exclusion constraint
+CREATE EXTENSION IF NOT EXISTS btree_gist;
 
 -- Drop existing tables if they exist (in correct order)
 DROP TABLE IF EXISTS ownership_shares CASCADE;
@@ -80,6 +84,7 @@ CREATE TABLE jets (
     features TEXT[],
     amenities TEXT[],
     status VARCHAR(50) NOT NULL DEFAULT 'available',
+    location VARCHAR(100),
     range_nm INTEGER NOT NULL,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
@@ -117,8 +122,14 @@ CREATE TABLE bookings (
     passengers INTEGER NOT NULL DEFAULT 1,
     special_requests TEXT,
     total_price DECIMAL(10,2),
+    cancelled_at TIMESTAMP WITH TIME ZONE,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
-    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    -- A jet cannot hold two live bookings over overlapping time ranges
+    CONSTRAINT bookings_no_overlap EXCLUDE USING gist (
+        jet_id WITH =,
+        tstzrange(start_time, end_time, '[)') WITH &&
+    ) WHERE (status <> 'cancelled')
 );
 
 CREATE TABLE ownership_shares (
@@ -132,6 +143,25 @@ CREATE TABLE ownership_shares (
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Secondary indexes for hot query predicates
+CREATE INDEX ix_bookings_user_id ON bookings (user_id);
+CREATE INDEX ix_bookings_live_jet_id_start_time_end_time ON bookings (jet_id, start_time, end_time) WHERE status <> 'cancelled';
+CREATE INDEX ix_bookings_live_user_id_created_at_id ON bookings (user_id, created_at, id) WHERE status <> 'cancelled';
+CREATE INDEX ix_bookings_cancelled_at ON bookings (cancelled_at) WHERE cancelled_at IS NOT NULL;
+CREATE INDEX ix_ownership_shares_user_id ON ownership_shares (user_id);
+CREATE INDEX ix_jets_status ON jets (status);
+CREATE INDEX ix_jets_price_per_hour ON jets (price_per_hour);
+CREATE INDEX ix_jets_range_nm ON jets (range_nm);
+CREATE INDEX ix_jets_location_trgm ON jets USING gin (location gin_trgm_ops);
+CREATE INDEX ix_jet_categories_name_trgm ON jet_categories USING gin (name gin_trgm_ops);
+
+-- Keyset pagination order for list endpoints
+CREATE INDEX ix_users_created_at_id ON users (created_at, id);
+CREATE INDEX ix_jets_created_at_id ON jets (created_at, id);
+CREATE INDEX ix_bookings_created_at_id ON bookings (created_at, id);
+CREATE INDEX ix_memberships_created_at_id ON memberships (created_at, id);
+CREATE INDEX ix_ownership_shares_created_at_id ON ownership_shares (created_at, id);
+
 -- Insert sample data
 INSERT INTO jet_categories (name, description, image_url) VALUES
     ('Light Jet', 'Small, efficient jets perfect for short to medium-range flights', 'https://api.dicebear.com/7.x/shapes/svg?seed=LightJet&backgroundColor=b6e3f4'),
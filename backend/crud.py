@@ -1,6 +1,7 @@
 from sqlalchemy.orm import Session
 from . import models, schemas
 from .logger import db_logger
+from .services.quote_engine import flight_hours, price, user_discount
 from typing import List, Optional
 import uuid
 
@@ -23,6 +24,11 @@ def get_jet(db: Session, jet_id: str) -> Optional[models.Jet]:
 def create_booking(db: Session, booking: schemas.BookingCreate) -> models.Booking:
     db_logger.info(f"Creating new booking for jet ID: {booking.jet_id}")
     try:
+        # Priced here from the jet's rate; a client-supplied total is never trusted
+        price_per_hour = db.query(models.Jet.price_per_hour).filter(models.Jet.id == booking.jet_id).scalar()
+        total_price = None
+        if price_per_hour is not None:
+            total_price = price(price_per_hour, flight_hours(booking.start_time, booking.end_time), user_discount(db, booking.user_id))
         db_booking = models.Booking(
             user_id=booking.user_id,
             jet_id=booking.jet_id,
@@ -33,7 +39,7 @@ def create_booking(db: Session, booking: schemas.BookingCreate) -> models.Bookin
             status=booking.status,
             passengers=booking.passengers,
             special_requests=booking.special_requests,
-            total_price=booking.total_price
+            total_price=total_price
         )
         db.add(db_booking)
         db.commit()
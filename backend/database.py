@@ -1,9 +1,15 @@
 from sqlalchemy import create_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 import os
+import random
+import time
 from dotenv import load_dotenv
-from .logger import db_logger
+from .logger import db_logger, IS_PRODUCTION
+from .utils.metrics import LatencyHistogram
 
 # Load environment variables from .env file
 env_path = os.path.join(os.path.dirname(__file__), '.env')
@@ -17,25 +23,133 @@ if not DATABASE_URL:
 
 db_logger.info(f"Using database URL: {DATABASE_URL}")
 
+def _to_async_url(url: str) -> str:
+    """Map a sync database URL onto the matching asyncio driver."""
+    for prefix in ("postgresql+psycopg2://", "postgresql://", "postgres://"):
+        if url.startswith(prefix):
+            return "postgresql+asyncpg://" + url[len(prefix):]
+    if url.startswith("sqlite://"):
+        return "sqlite+aiosqlite://" + url[len("sqlite://"):]
+    return url
+
+# The async URL can be set explicitly, otherwise it is derived from DATABASE_URL
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or _to_async_url(DATABASE_URL)
+
+# Connection pool settings, applied to both engines
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # seconds, -1 disables
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "True") == "True"
+
+# SQL echo and per-session open/close logging default off in the production profile.
+# DB_SESSION_LOG_SAMPLE_RATE is the fraction of sessions whose lifecycle is logged.
+DB_ECHO = os.getenv("DB_ECHO", "False" if IS_PRODUCTION else "True") == "True"
+DB_SESSION_LOG_SAMPLE_RATE = float(os.getenv("DB_SESSION_LOG_SAMPLE_RATE", "0" if IS_PRODUCTION else "1"))
+
+class _TimedPoolMixin:
+    """Records how long each checkout waits for a free connection.
+
+    Pools are recreated on dispose(), so the metrics live on the class rather
+    than the instance. Each engine gets its own pool subclass.
+    """
+    wait_histogram: LatencyHistogram
+    timeouts = 0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            type(self).timeouts += 1
+            raise
+        finally:
+            type(self).wait_histogram.observe(time.perf_counter() - start)
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    wait_histogram = LatencyHistogram()
+
+class TimedAsyncAdaptedQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    wait_histogram = LatencyHistogram()
+
+def _pool_options(poolclass) -> dict:
+    return {
+        "poolclass": poolclass,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
+db_logger.info(
+    f"Database pool: size={DB_POOL_SIZE} max_overflow={DB_MAX_OVERFLOW} "
+    f"timeout={DB_POOL_TIMEOUT}s recycle={DB_POOL_RECYCLE}s pre_ping={DB_POOL_PRE_PING}"
+)
+
 try:
     # Create SQLAlchemy engine
-    engine = create_engine(DATABASE_URL, echo=True)
+    engine = create_engine(DATABASE_URL, echo=DB_ECHO, **_pool_options(TimedQueuePool))
     db_logger.info("Database engine created successfully")
 except Exception as e:
     db_logger.error(f"Failed to create database engine: {str(e)}")
     raise
 
+try:
+    # Create the asyncio engine used by the API routers
+    async_engine = create_async_engine(
+        ASYNC_DATABASE_URL, echo=DB_ECHO, **_pool_options(TimedAsyncAdaptedQueuePool)
+    )
+    db_logger.info("Async database engine created successfully")
+except Exception as e:
+    db_logger.error(f"Failed to create async database engine: {str(e)}")
+    raise
+
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Create AsyncSessionLocal class. Objects stay loaded after commit so handlers
+# can keep returning them without triggering a lazy refresh outside a greenlet.
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
 # Create Base class
 Base = declarative_base()
 
+def get_pool_status(db_engine) -> dict:
+    """Snapshot of an engine's connection pool for the admin metrics endpoint."""
+    pool = db_engine.pool
+    return {
+        "pool_class": type(pool).__name__,
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "idle": pool.checkedin(),
+        # QueuePool.overflow() counts from -size, only positive values are real overflow
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": DB_MAX_OVERFLOW,
+        "timeout_seconds": DB_POOL_TIMEOUT,
+        "recycle_seconds": DB_POOL_RECYCLE,
+        "checkout_timeouts": getattr(type(pool), "timeouts", 0),
+        "wait": type(pool).wait_histogram.snapshot() if hasattr(type(pool), "wait_histogram") else None,
+    }
+
+def _log_session_lifecycle() -> bool:
+    """Decide once per session whether its open/close lines are logged."""
+    if DB_SESSION_LOG_SAMPLE_RATE <= 0:
+        return False
+    return DB_SESSION_LOG_SAMPLE_RATE >= 1 or random.random() < DB_SESSION_LOG_SAMPLE_RATE
+
 # Dependency to get DB session
 def get_db():
     db = SessionLocal()
+    log_lifecycle = _log_session_lifecycle()
     try:
-        db_logger.info("Database session opened")
+        if log_lifecycle:
+            db_logger.info("Database session opened")
         yield db
     except Exception as e:
         db_logger.error(f"Database error: {str(e)}")
@@ -43,4 +157,21 @@ def get_db():
         raise
     finally:
         db.close()
-        db_logger.info("Database session closed") 
\ No newline at end of file
+        if log_lifecycle:
+            db_logger.info("Database session closed")
+
+# Dependency to get an async DB session
+async def get_async_db():
+    log_lifecycle = _log_session_lifecycle()
+    async with AsyncSessionLocal() as db:
+        try:
+            if log_lifecycle:
+                db_logger.info("Async database session opened")
+            yield db
+        except Exception as e:
+            db_logger.error(f"Database error: {str(e)}")
+            await db.rollback()
+            raise
+        finally:
+            if log_lifecycle:
+                db_logger.info("Async database session closed")
@@ -1,19 +1,51 @@
 import logging
 import sys
-from logging.handlers import RotatingFileHandler, TimedRotatingFileHandler
+import atexit
+import queue
+from logging.handlers import (
+    BaseRotatingHandler, QueueHandler, QueueListener, RotatingFileHandler, TimedRotatingFileHandler
+)
 import os
-from datetime import datetime
+from datetime import datetime, timezone
 import json
+from dotenv import load_dotenv
+
+# orjson is optional; it encodes log records several times faster than json
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+load_dotenv(os.path.join(os.path.dirname(__file__), '.env'))
+
+# Logging profile: "development" keeps SQL echo and per-session logging,
+# "production" turns that chatter off (see database.py)
+LOG_PROFILE = os.getenv("LOG_PROFILE", "development").lower()
+IS_PRODUCTION = LOG_PROFILE == "production"
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+
+# Log pipeline settings: bounded queue size, what to do when it is full
+# ("drop" or "block") and how many records one background write may carry
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+LOG_QUEUE_POLICY = os.getenv("LOG_QUEUE_POLICY", "drop").lower()
+LOG_QUEUE_BLOCK_TIMEOUT = float(os.getenv("LOG_QUEUE_BLOCK_TIMEOUT", "1.0"))
+LOG_BATCH_SIZE = int(os.getenv("LOG_BATCH_SIZE", "512"))
 
 # Create logs directory if it doesn't exist
 logs_dir = os.path.join(os.path.dirname(__file__), 'logs')
 os.makedirs(logs_dir, exist_ok=True)
 
+def _dumps(value: dict) -> str:
+    if orjson is not None:
+        return orjson.dumps(value, default=str).decode()
+    return json.dumps(value, default=str)
+
 # Custom JSON formatter
 class JsonFormatter(logging.Formatter):
     def format(self, record):
         log_record = {
-            "timestamp": datetime.utcnow().isoformat(),
+            # Use the creation time of the record, not the time it is written
+            "timestamp": datetime.fromtimestamp(record.created, tz=timezone.utc).replace(tzinfo=None).isoformat(),
             "level": record.levelname,
             "message": record.getMessage(),
             "module": record.module,
@@ -29,22 +61,18 @@ class JsonFormatter(logging.Formatter):
         if record.exc_info:
             log_record['exception'] = self.formatException(record.exc_info)
             
-        return json.dumps(log_record)
+        return _dumps(log_record)
 
 # Configure logging format
 log_format = logging.Formatter(
     '%(asctime)s - %(name)s - %(levelname)s - %(message)s - [%(module)s:%(lineno)d]'
 )
 
-# Create a logger
-def setup_logger(name: str) -> logging.Logger:
-    logger = logging.getLogger(name)
-    logger.setLevel(logging.INFO)
-
+def _build_handlers() -> list:
+    """Create the console and file handlers shared by every application logger."""
     # Console Handler with colored output
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setFormatter(log_format)
-    logger.addHandler(console_handler)
 
     # File Handler - Daily rotating log file
     log_file = os.path.join(logs_dir, f'app_{datetime.now().strftime("%Y%m%d")}.log')
@@ -54,7 +82,6 @@ def setup_logger(name: str) -> logging.Logger:
         backupCount=5
     )
     file_handler.setFormatter(log_format)
-    logger.addHandler(file_handler)
 
     # JSON File Handler - For structured logging
     json_log_file = os.path.join(logs_dir, f'app_{datetime.now().strftime("%Y%m%d")}.json')
@@ -64,7 +91,6 @@ def setup_logger(name: str) -> logging.Logger:
         backupCount=5
     )
     json_handler.setFormatter(JsonFormatter())
-    logger.addHandler(json_handler)
 
     # Error File Handler - Separate file for errors
     error_log_file = os.path.join(logs_dir, f'error_{datetime.now().strftime("%Y%m%d")}.log')
@@ -75,7 +101,6 @@ def setup_logger(name: str) -> logging.Logger:
     )
     error_handler.setLevel(logging.ERROR)
     error_handler.setFormatter(log_format)
-    logger.addHandler(error_handler)
 
     # Request Handler - For API requests
     request_log_file = os.path.join(logs_dir, f'requests_{datetime.now().strftime("%Y%m%d")}.log')
@@ -86,8 +111,175 @@ def setup_logger(name: str) -> logging.Logger:
         backupCount=30
     )
     request_handler.setFormatter(JsonFormatter())
-    logger.addHandler(request_handler)
 
+    return [console_handler, file_handler, json_handler, error_handler, request_handler]
+
+class BoundedQueueHandler(QueueHandler):
+    """Queue handler whose request-path cost is little more than an enqueue.
+
+    Formatting is left to the listener thread. When the bounded queue is full
+    the record is dropped ("drop" policy) or the caller waits up to
+    LOG_QUEUE_BLOCK_TIMEOUT seconds for space ("block" policy).
+    """
+
+    def __init__(self, log_queue: queue.Queue, policy: str = "drop", block_timeout: float = 1.0):
+        super().__init__(log_queue)
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Resolve %-style arguments now, since they may be mutated after the
+        # call returns. Everything else, including exceptions, is formatted later.
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            if self.policy == "block":
+                self.queue.put(record, timeout=self.block_timeout)
+            else:
+                self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+class BatchingQueueListener(QueueListener):
+    """Queue listener that drains records in batches and writes each batch with
+    a single write() and flush() per handler.
+
+    Size-based rotation is checked once per batch, so a file can exceed
+    maxBytes by at most one batch before it rolls over.
+    """
+
+    def __init__(self, log_queue, *handlers, batch_size: int = 512, respect_handler_level: bool = True):
+        super().__init__(log_queue, *handlers, respect_handler_level=respect_handler_level)
+        self.batch_size = batch_size
+        self.batches = 0
+        self.records = 0
+        self._reported_drops = 0
+
+    def enqueue_sentinel(self):
+        # The queue is bounded, wait for room rather than losing the stop signal
+        self.queue.put(self._sentinel)
+
+    def _monitor(self):
+        q = self.queue
+        has_task_done = hasattr(q, 'task_done')
+        while True:
+            batch = []
+            stop = False
+            try:
+                item = q.get(block=True)
+                while True:
+                    if item is self._sentinel:
+                        stop = True
+                    else:
+                        batch.append(item)
+                    if has_task_done:
+                        q.task_done()
+                    if stop or len(batch) >= self.batch_size:
+                        break
+                    item = q.get_nowait()
+            except queue.Empty:
+                pass
+            drop_notice = self._drop_notice()
+            if drop_notice is not None:
+                batch.append(drop_notice)
+            if batch:
+                self.handle_batch(batch)
+            if stop:
+                break
+
+    def _drop_notice(self):
+        dropped = sum(getattr(handler, 'dropped', 0) for handler in _queue_handlers)
+        if dropped == self._reported_drops:
+            return None
+        notice = logging.LogRecord(
+            'logging', logging.WARNING, __file__, 0,
+            f"Log queue full: dropped {dropped - self._reported_drops} records", None, None
+        )
+        self._reported_drops = dropped
+        return notice
+
+    def handle_batch(self, records):
+        self.batches += 1
+        self.records += len(records)
+        for handler in self.handlers:
+            selected = [
+                record for record in records
+                if not self.respect_handler_level or record.levelno >= handler.level
+            ]
+            if not selected:
+                continue
+            if isinstance(handler, logging.StreamHandler):
+                self._write_stream(handler, selected)
+            else:
+                for record in selected:
+                    handler.handle(record)
+
+    def _write_stream(self, handler, records):
+        parts = []
+        for record in records:
+            try:
+                parts.append(handler.format(record) + handler.terminator)
+            except Exception:
+                handler.handleError(record)
+        if not parts:
+            return
+        chunk = ''.join(parts)
+        with handler.lock:
+            try:
+                if isinstance(handler, BaseRotatingHandler):
+                    self._maybe_rollover(handler, records[0], chunk)
+                if handler.stream is None:
+                    handler.stream = handler._open()
+                handler.stream.write(chunk)
+                handler.flush()
+            except Exception:
+                handler.handleError(records[-1])
+
+    @staticmethod
+    def _maybe_rollover(handler, record, chunk):
+        if isinstance(handler, RotatingFileHandler):
+            if handler.maxBytes <= 0:
+                return
+            if handler.stream is None:
+                handler.stream = handler._open()
+            handler.stream.seek(0, 2)
+            if handler.stream.tell() and handler.stream.tell() + len(chunk) >= handler.maxBytes:
+                handler.doRollover()
+        elif handler.shouldRollover(record):
+            handler.doRollover()
+
+    def stats(self) -> dict:
+        return {
+            "policy": LOG_QUEUE_POLICY,
+            "queued": self.queue.qsize(),
+            "capacity": self.queue.maxsize,
+            "dropped": sum(getattr(handler, 'dropped', 0) for handler in _queue_handlers),
+            "batches": self.batches,
+            "records": self.records,
+            "encoder": "orjson" if orjson is not None else "json",
+        }
+
+# Request threads only enqueue records; a single listener thread does the
+# formatting and file I/O for all loggers
+log_queue = queue.Queue(LOG_QUEUE_SIZE)
+_queue_handlers = []
+log_listener = BatchingQueueListener(log_queue, *_build_handlers(), batch_size=LOG_BATCH_SIZE)
+log_listener.start()
+atexit.register(log_listener.stop)
+
+# Create a logger
+def setup_logger(name: str) -> logging.Logger:
+    logger = logging.getLogger(name)
+    logger.setLevel(LOG_LEVEL)
+    handler = BoundedQueueHandler(log_queue, policy=LOG_QUEUE_POLICY, block_timeout=LOG_QUEUE_BLOCK_TIMEOUT)
+    _queue_handlers.append(handler)
+    logger.addHandler(handler)
+    # The listener already writes to stdout, don't duplicate through the root logger
+    logger.propagate = False
     return logger
 
 # Create specific loggers for different components
@@ -4,8 +4,12 @@ from fastapi import FastAPI, Depends, HTTPException, Request, Path
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 from backend.routers import auth, jets, bookings, memberships, ownership_shares, admin, contact, categories, logs, users, chat
-from backend.database import engine, Base, get_db
+from backend.database import engine, async_engine, Base, get_db
 from backend.logger import api_logger
+from backend.services.chat_service import chat_service
+from backend.services.password_hasher import password_hasher
+from backend.services.token_revocation import revocation_list
+from backend.utils import debug_trace
 from sqlalchemy.orm import Session
 from . import models, schemas, crud
 import time
@@ -65,6 +69,15 @@ async def log_requests(request: Request, call_next):
     
     return response
 
+# Middleware that turns on diagnostic logging for requests sending X-Debug-Trace
+@app.middleware("http")
+async def debug_trace_scope(request: Request, call_next):
+    token = debug_trace.start(request.headers)
+    try:
+        return await call_next(request)
+    finally:
+        debug_trace.reset(token)
+
 # Error handling middleware
 @app.middleware("http")
 async def error_handling(request: Request, call_next):
@@ -88,6 +101,32 @@ app.include_router(categories.router, prefix="/api/v1", tags=["Categories"])
 app.include_router(logs.router, prefix="/api/v1", tags=["Logs"])
 app.include_router(users.router, prefix="/api/v1")
 
+@app.on_event("startup")
+async def load_token_revocations():
+    """Load persisted token revocations, dropping entries whose tokens have expired."""
+    revocation_list.compact()
+    revocation_list.start_sync()
+
+@app.on_event("shutdown")
+async def stop_token_revocation_sync():
+    """Stop the background token revocation sync."""
+    await revocation_list.stop_sync()
+
+@app.on_event("shutdown")
+async def dispose_async_engine():
+    """Close pooled async database connections on shutdown."""
+    await async_engine.dispose()
+
+@app.on_event("shutdown")
+async def close_chat_service():
+    """Close the pooled connections to the MCP server."""
+    await chat_service.close()
+
+@app.on_event("shutdown")
+async def stop_password_hasher():
+    """Stop the password hashing worker threads."""
+    password_hasher.shutdown()
+
 @app.get("/")
 async def root():
     api_logger.info("Root endpoint accessed")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, UUID, ForeignKey, Boolean, DateTime
+from sqlalchemy import Column, String, UUID, ForeignKey, Boolean, DateTime, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from .base import Base, TimestampMixin
@@ -7,6 +7,10 @@ import uuid
 class User(Base, TimestampMixin):
     """SQLAlchemy model for users."""
     __tablename__ = "users"
+    __table_args__ = (
+        # Keyset pagination order, see utils/pagination.py
+        Index("ix_users_created_at_id", "created_at", "id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     email = Column(String(255), unique=True, nullable=False)
@@ -1,13 +1,29 @@
-from sqlalchemy import Column, String, UUID, Integer, Numeric, Text, ForeignKey, DateTime
+from sqlalchemy import Column, String, UUID, Integer, Numeric, Text, ForeignKey, DateTime, Index, text
 from sqlalchemy.orm import relationship
 from .base import Base, TimestampMixin
 import uuid
 
 class Booking(Base, TimestampMixin):
     __tablename__ = "bookings"
+    __table_args__ = (
+        # Keyset pagination order, see utils/pagination.py
+        Index("ix_bookings_created_at_id", "created_at", "id"),
+        # Availability checks filter one jet's live bookings by overlapping time range
+        Index(
+            "ix_bookings_live_jet_id_start_time_end_time", "jet_id", "start_time", "end_time",
+            postgresql_where=text("status <> 'cancelled'"),
+        ),
+        # A user's live bookings in keyset pagination order
+        Index(
+            "ix_bookings_live_user_id_created_at_id", "user_id", "created_at", "id",
+            postgresql_where=text("status <> 'cancelled'"),
+        ),
+        # Cancellation reporting
+        Index("ix_bookings_cancelled_at", "cancelled_at", postgresql_where=text("cancelled_at IS NOT NULL")),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id = Column(UUID(as_uuid=True), ForeignKey('users.id'))
+    user_id = Column(UUID(as_uuid=True), ForeignKey('users.id'), index=True)
     jet_id = Column(UUID(as_uuid=True), ForeignKey('jets.id'))
     origin = Column(String(255), nullable=False)
     destination = Column(String(255), nullable=False)
@@ -17,6 +33,8 @@ class Booking(Base, TimestampMixin):
     passengers = Column(Integer, nullable=False, default=1)
     special_requests = Column(Text)
     total_price = Column(Numeric(10, 2))
+    # Set when the booking is cancelled; cancelled bookings are kept, not deleted
+    cancelled_at = Column(DateTime(timezone=True))
 
     # Relationships
     user = relationship("User", back_populates="bookings")
@@ -1,10 +1,14 @@
-from sqlalchemy import Column, String, UUID, Integer, Numeric, ARRAY, ForeignKey
+from sqlalchemy import Column, String, UUID, Integer, Numeric, ARRAY, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from .base import Base, TimestampMixin
 import uuid
 
 class Jet(Base, TimestampMixin):
     __tablename__ = "jets"
+    __table_args__ = (
+        # Keyset pagination order, see utils/pagination.py
+        Index("ix_jets_created_at_id", "created_at", "id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name = Column(String(100), nullable=False)
@@ -13,7 +17,7 @@ class Jet(Base, TimestampMixin):
     year = Column(Integer)
     max_speed_mph = Column(Integer)
     max_passengers = Column(Integer)
-    price_per_hour = Column(Numeric(10, 2))
+    price_per_hour = Column(Numeric(10, 2), index=True)
     cabin_height_ft = Column(Numeric(4, 1))
     cabin_width_ft = Column(Numeric(4, 1))
     cabin_length_ft = Column(Numeric(4, 1))
@@ -25,8 +29,9 @@ class Jet(Base, TimestampMixin):
     gallery_urls = Column(ARRAY(String))
     features = Column(ARRAY(String))
     amenities = Column(ARRAY(String))
-    status = Column(String(50), nullable=False, default='available')
-    range_nm = Column(Integer, nullable=False)
+    status = Column(String(50), nullable=False, default='available', index=True)
+    location = Column(String(100))
+    range_nm = Column(Integer, nullable=False, index=True)
 
     # Relationships
     category = relationship("JetCategory", back_populates="jets")
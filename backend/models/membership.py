@@ -1,10 +1,14 @@
-from sqlalchemy import Column, String, UUID, Integer, Numeric, ARRAY
+from sqlalchemy import Column, String, UUID, Integer, Numeric, ARRAY, Index
 from sqlalchemy.orm import relationship
 from .base import Base, TimestampMixin
 import uuid
 
 class Membership(Base, TimestampMixin):
     __tablename__ = "memberships"
+    __table_args__ = (
+        # Keyset pagination order, see utils/pagination.py
+        Index("ix_memberships_created_at_id", "created_at", "id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name = Column(String(100), nullable=False)
@@ -1,13 +1,17 @@
-from sqlalchemy import Column, String, UUID, Float, Numeric, DateTime, ForeignKey
+from sqlalchemy import Column, String, UUID, Float, Numeric, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from .base import Base, TimestampMixin
 import uuid
 
 class OwnershipShare(Base, TimestampMixin):
     __tablename__ = "ownership_shares"
+    __table_args__ = (
+        # Keyset pagination order, see utils/pagination.py
+        Index("ix_ownership_shares_created_at_id", "created_at", "id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id = Column(UUID(as_uuid=True), ForeignKey('users.id'))
+    user_id = Column(UUID(as_uuid=True), ForeignKey('users.id'), index=True)
     jet_id = Column(UUID(as_uuid=True), ForeignKey('jets.id'))
     share_fraction = Column(Float)
     purchase_date = Column(DateTime(timezone=True), nullable=False)
@@ -1,14 +1,27 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 from uuid import UUID
 import logging # Import the logging module
-import json
 import traceback
+from datetime import datetime, timezone
 
 from .. import schemas, models
-from ..database import get_db
-from ..utils import auth as auth_utils # Import auth_utils for password hashing
+from ..database import get_async_db, get_pool_status, engine, async_engine
+from ..logger import log_listener
+from ..services.availability import BOOKING_CONFLICT_DETAIL, CANCELLED, availability, blocks, find_conflict, lock_jet
+from ..services.cache import catalog_cache
+from ..services.chat_service import chat_service
+from ..services.chat_sessions import chat_sessions
+from ..services.jet_search_index import jet_search_index
+from ..services.password_hasher import password_hasher
+from ..services.principal_cache import principal_cache
+from ..services.quote_engine import quote_engine
+from ..services.token_revocation import revocation_list
+from ..utils import debug_trace
+from ..utils.auth import auth_overhead
+from ..utils.pagination import PageParams, paginate
 from .auth import get_current_admin_user # Admin-specific dependency
 
 # Configure logger for this module
@@ -30,29 +43,31 @@ router = APIRouter(
 # --- User Management Endpoints ---
 
 @router.get("/users/", response_model=List[schemas.User], summary="Get all users (Admin only)")
-def get_all_users(
-    db: Session = Depends(get_db)
+async def get_all_users(
+    response: Response,
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Retrieve a list of all users in the system.\n\n    Requires admin privileges.\n
-    Args:\n        db (Session): Database session dependency.\n
-    Returns:\n        List[schemas.User]: A list of all user objects.\n
+    Args:\n        response (Response): Receives the X-Next-Cursor header when more users exist.\n        page (PageParams): The limit and after cursor.\n        db (AsyncSession): Database session dependency.\n
+    Returns:\n        List[schemas.User]: One page of user objects, oldest first.\n
     """
     logger.info("Admin: Fetching all users.")
-    users = db.query(models.User).all()
+    users = await paginate(db, select(models.User), models.User, page, response)
     logger.info(f"Admin: Retrieved {len(users)} users.")
     return users
 
 @router.get("/users/{user_id}", response_model=schemas.User, summary="Get user by ID (Admin only)")
-def get_user_by_id(
+async def get_user_by_id(
     user_id: UUID,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Retrieve details of a specific user by their ID.\n\n    Requires admin privileges.\n
-    Args:\n        user_id (UUID): The unique identifier of the user.\n        db (Session): Database session dependency.\n
+    Args:\n        user_id (UUID): The unique identifier of the user.\n        db (AsyncSession): Database session dependency.\n
     Raises:\n        HTTPException: 404 if the user is not found.\n
     Returns:\n        schemas.User: The user object.\n    """
     logger.info(f"Admin: Attempting to retrieve user with ID: {user_id}")
-    user = db.query(models.User).filter(models.User.id == user_id).first()
+    user = await db.scalar(select(models.User).where(models.User.id == user_id))
     if not user:
         logger.warning(f"Admin: User with ID {user_id} not found.")
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
@@ -60,122 +75,130 @@ def get_user_by_id(
     return user
 
 @router.post("/users/", response_model=schemas.User, status_code=status.HTTP_201_CREATED, summary="Create a new user (Admin only)")
-def create_user(
+async def create_user(
     user: schemas.UserCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new user in the system.\n\n    Requires admin privileges.\n
-    Args:\n        user (schemas.UserCreate): The user data to create.\n        db (Session): Database session dependency.\n
+    Args:\n        user (schemas.UserCreate): The user data to create.\n        db (AsyncSession): Database session dependency.\n
     Raises:\n        HTTPException: 400 if the email is already registered.\n
     Returns:\n        schemas.User: The newly created user object.\n    """
     logger.info(f"Admin: Attempting to create new user with email: {user.email}")
-    db_user = db.query(models.User).filter(models.User.email == user.email).first()
+    db_user = await db.scalar(select(models.User).where(models.User.email == user.email))
     if db_user:
         logger.warning(f"Admin: User creation failed, email already registered: {user.email}")
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered")
 
-    hashed_password = auth_utils.get_password_hash(user.password)
+    hashed_password = await password_hasher.hash(user.password)
     # Admin can create any user, including other admins if 'role' field was exposed in schema
     # For simplicity, default role is 'user' or whatever is set in models.
-    db_user = models.User(email=user.email, name=user.name, passwordHash=hashed_password)
+    db_user = models.User(email=user.email, name=user.name, password_hash=hashed_password)
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
     logger.info(f"Admin: User created successfully with ID: {db_user.id}, email: {db_user.email}")
     return db_user
 
 @router.put("/users/{user_id}", response_model=schemas.User, summary="Update user details (Admin only)")
-def update_user(
+async def update_user(
     user_id: UUID,
     user_update: schemas.UserCreate, # Reusing UserCreate for update. In a real app, a UserUpdate schema might be better.
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update details for a specific user.\n\n    Requires admin privileges.\n
-    Args:\n        user_id (UUID): The unique identifier of the user to update.\n        user_update (schemas.UserCreate): The updated user data.\n        db (Session): Database session dependency.\n
+    Args:\n        user_id (UUID): The unique identifier of the user to update.\n        user_update (schemas.UserCreate): The updated user data.\n        db (AsyncSession): Database session dependency.\n
     Raises:\n        HTTPException: 404 if the user is not found.\n
     Returns:\n        schemas.User: The updated user object.\n    """
     logger.info(f"Admin: Attempting to update user with ID: {user_id}")
-    user = db.query(models.User).filter(models.User.id == user_id).first()
+    user = await db.scalar(select(models.User).where(models.User.id == user_id))
     if not user:
         logger.warning(f"Admin: User with ID {user_id} not found for update.")
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
     
     for key, value in user_update.dict(exclude_unset=True).items():
         if key == "password": # Handle password hashing if password is being updated
-            user.passwordHash = auth_utils.get_password_hash(value)
+            user.password_hash = await password_hasher.hash(value)
             logger.info(f"Admin: Password updated for user ID: {user_id}")
         else:
             setattr(user, key, value)
             logger.debug(f"Admin: Setting attribute {key} for user ID: {user_id}")
             
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    # Tokens carry email and role claims, so re-verify them on the next request
+    principal_cache.invalidate_user(user_id)
+    await db.refresh(user)
     logger.info(f"Admin: User {user_id} updated successfully.")
     return user
 
 @router.delete("/users/{user_id}", status_code=status.HTTP_204_NO_CONTENT, summary="Delete a user (Admin only)")
-def delete_user(
+async def delete_user(
     user_id: UUID,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete a specific user from the system.\n\n    Requires admin privileges.\n
-    Args:\n        user_id (UUID): The unique identifier of the user to delete.\n        db (Session): Database session dependency.\n
+    Args:\n        user_id (UUID): The unique identifier of the user to delete.\n        db (AsyncSession): Database session dependency.\n
     Raises:\n        HTTPException: 404 if the user is not found.\n
     Returns:\n        dict: A confirmation message upon successful deletion.\n    """
     logger.info(f"Admin: Attempting to delete user with ID: {user_id}")
-    user = db.query(models.User).filter(models.User.id == user_id).first()
+    user = await db.scalar(select(models.User).where(models.User.id == user_id))
     if not user:
         logger.warning(f"Admin: User with ID {user_id} not found for deletion.")
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
-    db.delete(user)
-    db.commit()
+    await db.delete(user)
+    await db.commit()
+    principal_cache.invalidate_user(user_id)
     logger.info(f"Admin: User {user_id} deleted successfully.")
     return {"message": "User deleted successfully"}
 
 # --- Jet Management Endpoints ---
 
 @router.get("/jets/", response_model=List[schemas.Jet], summary="Get all jets (Admin only)")
-def get_all_jets(
-    db: Session = Depends(get_db)
+async def get_all_jets(
+    response: Response,
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Retrieve a list of all jets in the system.\n\n    Requires admin privileges.\n
-    Args:\n        db (Session): Database session dependency.\n
-    Returns:\n        List[schemas.Jet]: A list of all jet objects.\n
+    Args:\n        response (Response): Receives the X-Next-Cursor header when more jets exist.\n        page (PageParams): The limit and after cursor.\n        db (AsyncSession): Database session dependency.\n
+    Returns:\n        List[schemas.Jet]: One page of jet objects, oldest first.\n
     """
     logger.info("Admin: Fetching all jets.")
-    jets = db.query(models.Jet).all()
+    jets = await paginate(db, select(models.Jet), models.Jet, page, response)
     logger.info(f"Admin: Retrieved {len(jets)} jets.")
     return jets
 
 @router.post("/jets/", response_model=schemas.Jet, status_code=status.HTTP_201_CREATED, summary="Create a new jet (Admin only)")
-def create_jet(
+async def create_jet(
     jet: schemas.JetCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new private jet entry in the system.\n\n    Requires admin privileges.\n
-    Args:\n        jet (schemas.JetCreate): The jet data to create.\n        db (Session): Database session dependency.\n
+    Args:\n        jet (schemas.JetCreate): The jet data to create.\n        db (AsyncSession): Database session dependency.\n
     Returns:\n        schemas.Jet: The newly created jet object.\n    """
     logger.info(f"Admin: Attempting to create new jet with name: {jet.name}")
     db_jet = models.Jet(**jet.dict())
     db.add(db_jet)
-    db.commit()
-    db.refresh(db_jet)
+    await db.commit()
+    await db.refresh(db_jet)
+    await catalog_cache.invalidate_jet_list()
+    await jet_search_index.refresh_jet(db, db_jet.id)
+    chat_service.invalidate_catalog()
     logger.info(f"Admin: Jet created successfully with ID: {db_jet.id}, name: {db_jet.name}")
     return db_jet
 
 @router.put("/jets/{jet_id}", response_model=schemas.Jet, summary="Update jet details (Admin only)")
-def update_jet(
+async def update_jet(
     jet_id: UUID,
     jet_update: schemas.JetCreate, # Reusing JetCreate for update. In a real app, a JetUpdate schema might be better.
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update details for a specific jet.\n\n    Requires admin privileges.\n
-    Args:\n        jet_id (UUID): The unique identifier of the jet to update.\n        jet_update (schemas.JetCreate): The updated jet data.\n        db (Session): Database session dependency.\n
+    Args:\n        jet_id (UUID): The unique identifier of the jet to update.\n        jet_update (schemas.JetCreate): The updated jet data.\n        db (AsyncSession): Database session dependency.\n
     Raises:\n        HTTPException: 404 if the jet is not found.\n
     Returns:\n        schemas.Jet: The updated jet object.\n    """
     logger.info(f"Admin: Attempting to update jet with ID: {jet_id}")
-    jet = db.query(models.Jet).filter(models.Jet.id == jet_id).first()
+    jet = await db.scalar(select(models.Jet).where(models.Jet.id == jet_id))
     if not jet:
         logger.warning(f"Admin: Jet with ID {jet_id} not found for update.")
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Jet not found")
@@ -185,64 +208,57 @@ def update_jet(
         logger.debug(f"Admin: Setting attribute {key} for jet ID: {jet_id}")
             
     db.add(jet)
-    db.commit()
-    db.refresh(jet)
+    await db.commit()
+    await db.refresh(jet)
+    await catalog_cache.invalidate_jet(jet_id)
+    quote_engine.invalidate_jet(jet_id)
+    await jet_search_index.refresh_jet(db, jet_id)
+    chat_service.invalidate_catalog()
     logger.info(f"Admin: Jet {jet_id} updated successfully.")
     return jet
 
 @router.delete("/jets/{jet_id}", status_code=status.HTTP_204_NO_CONTENT, summary="Delete a jet (Admin only)")
-def delete_jet(
+async def delete_jet(
     jet_id: UUID,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete a specific jet from the system.\n\n    Requires admin privileges.\n
-    Args:\n        jet_id (UUID): The unique identifier of the jet to delete.\n        db (Session): Database session dependency.\n
+    Args:\n        jet_id (UUID): The unique identifier of the jet to delete.\n        db (AsyncSession): Database session dependency.\n
     Raises:\n        HTTPException: 404 if the jet is not found.\n
     Returns:\n        dict: A confirmation message upon successful deletion.\n    """
     logger.info(f"Admin: Attempting to delete jet with ID: {jet_id}")
-    jet = db.query(models.Jet).filter(models.Jet.id == jet_id).first()
+    jet = await db.scalar(select(models.Jet).where(models.Jet.id == jet_id))
     if not jet:
         logger.warning(f"Admin: Jet with ID {jet_id} not found for deletion.")
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Jet not found")
-    db.delete(jet)
-    db.commit()
+    await db.delete(jet)
+    await db.commit()
+    await catalog_cache.invalidate_jet(jet_id)
+    quote_engine.invalidate_jet(jet_id)
+    jet_search_index.remove(jet_id)
+    chat_service.invalidate_catalog()
     logger.info(f"Admin: Jet {jet_id} deleted successfully.")
     return {"message": "Jet deleted successfully"}
 
 # --- Booking Management Endpoints ---
 
 @router.get("/bookings/", response_model=List[schemas.Booking], summary="Get all bookings (Admin only)")
-def get_all_bookings(
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_admin_user)
+async def get_all_bookings(
+    response: Response,
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: schemas.Principal = Depends(get_current_admin_user)
 ):
-    """Retrieve a list of all bookings in the system."""
+    """Retrieve one page of bookings in the system, oldest first."""
     try:
         logger.info(f"Admin {current_user.email}: Fetching all bookings")
-        bookings = db.query(models.Booking).all()
+        bookings = await paginate(db, select(models.Booking), models.Booking, page, response)
         
         # Log the number of bookings found
         logger.info(f"Admin {current_user.email}: Retrieved {len(bookings)} bookings")
         
-        # Log detailed information about each booking
-        for booking in bookings:
-            booking_dict = {
-                'id': str(booking.id),
-                'user_id': str(booking.user_id),
-                'jet_id': str(booking.jet_id),
-                'origin': booking.origin,
-                'destination': booking.destination,
-                'start_time': booking.start_time.isoformat() if booking.start_time else None,
-                'end_time': booking.end_time.isoformat() if booking.end_time else None,
-                'status': booking.status,
-                'passengers': booking.passengers,
-                'special_requests': booking.special_requests,
-                'total_price': float(booking.total_price) if booking.total_price else None,
-                'created_at': booking.created_at.isoformat() if booking.created_at else None,
-                'updated_at': booking.updated_at.isoformat() if booking.updated_at else None
-            }
-            logger.info(f"Admin {current_user.email}: Booking data: {json.dumps(booking_dict, indent=2)}")
-            
+        debug_trace.trace_rows(logger, f"Admin {current_user.email}: Bookings", bookings)
+
         return bookings
     except Exception as e:
         logger.error(f"Admin {current_user.email}: Error fetching bookings: {str(e)}")
@@ -253,92 +269,111 @@ def get_all_bookings(
         )
 
 @router.put("/bookings/{booking_id}", response_model=schemas.Booking, summary="Update booking details (Admin only)")
-def update_booking(
+async def update_booking(
     booking_id: UUID,
     booking_update: schemas.BookingCreate, # Reusing BookingCreate for update.
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update details for a specific booking.\n\n    Requires admin privileges.\n
-    Args:\n        booking_id (UUID): The unique identifier of the booking to update.\n        booking_update (schemas.BookingCreate): The updated booking data.\n        db (Session): Database session dependency.\n
-    Raises:\n        HTTPException: 404 if the booking is not found.\n
+    Args:\n        booking_id (UUID): The unique identifier of the booking to update.\n        booking_update (schemas.BookingCreate): The updated booking data.\n        db (AsyncSession): Database session dependency.\n
+    Raises:\n        HTTPException: 404 if the booking or jet is not found; 409 if the new times overlap another booking of the jet.\n
     Returns:\n        schemas.Booking: The updated booking object.\n    """
     logger.info(f"Admin: Attempting to update booking with ID: {booking_id}")
-    booking = db.query(models.Booking).filter(models.Booking.id == booking_id).first()
+    booking = await db.scalar(select(models.Booking).where(models.Booking.id == booking_id))
     if not booking:
         logger.warning(f"Admin: Booking with ID {booking_id} not found for update.")
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Booking not found")
     
-    for key, value in booking_update.dict(exclude_unset=True).items():
-        setattr(booking, key, value)
-        logger.debug(f"Admin: Setting attribute {key} for booking ID: {booking_id}")
-            
-    db.add(booking)
-    db.commit()
-    db.refresh(booking)
+    async with availability.jet_lock(booking_update.jet_id):
+        if not await lock_jet(db, booking_update.jet_id):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Jet not found")
+        if blocks(booking) and await find_conflict(
+            db, booking_update.jet_id, booking_update.start_time, booking_update.end_time, exclude_booking_id=booking_id
+        ):
+            await db.rollback()
+            logger.warning(f"Admin: Update of booking {booking_id} rejected, jet {booking_update.jet_id} is already booked.")
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=BOOKING_CONFLICT_DETAIL)
+
+        for key, value in booking_update.dict(exclude_unset=True).items():
+            setattr(booking, key, value)
+            logger.debug(f"Admin: Setting attribute {key} for booking ID: {booking_id}")
+        booking.total_price = await quote_engine.total_price(
+            db, booking.user_id, booking.jet_id, booking.start_time, booking.end_time
+        )
+                
+        db.add(booking)
+        await db.commit()
+    await db.refresh(booking)
+    availability.upsert(booking)
     logger.info(f"Admin: Booking {booking_id} updated successfully.")
     return booking
 
-@router.delete("/bookings/{booking_id}", status_code=status.HTTP_204_NO_CONTENT, summary="Delete a booking (Admin only)")
-def delete_booking(
+@router.delete("/bookings/{booking_id}", status_code=status.HTTP_204_NO_CONTENT, summary="Cancel a booking (Admin only)")
+async def delete_booking(
     booking_id: UUID,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Delete a specific booking from the system.\n\n    Requires admin privileges.\n
-    Args:\n        booking_id (UUID): The unique identifier of the booking to delete.\n        db (Session): Database session dependency.\n
+    """Cancel a specific booking.\n\n    Requires admin privileges. The row is kept with status "cancelled" and a cancelled_at timestamp for reporting.\n
+    Args:\n        booking_id (UUID): The unique identifier of the booking to cancel.\n        db (AsyncSession): Database session dependency.\n
     Raises:\n        HTTPException: 404 if the booking is not found.\n
-    Returns:\n        dict: A confirmation message upon successful deletion.\n    """
-    logger.info(f"Admin: Attempting to delete booking with ID: {booking_id}")
-    booking = db.query(models.Booking).filter(models.Booking.id == booking_id).first()
+    Returns:\n        dict: A confirmation message upon successful cancellation.\n    """
+    logger.info(f"Admin: Attempting to cancel booking with ID: {booking_id}")
+    booking = await db.scalar(select(models.Booking).where(models.Booking.id == booking_id))
     if not booking:
-        logger.warning(f"Admin: Booking with ID {booking_id} not found for deletion.")
+        logger.warning(f"Admin: Booking with ID {booking_id} not found for cancellation.")
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Booking not found")
-    db.delete(booking)
-    db.commit()
-    logger.info(f"Admin: Booking {booking_id} deleted successfully.")
-    return {"message": "Booking deleted successfully"}
+    if booking.status != CANCELLED:
+        booking.status = CANCELLED
+        booking.cancelled_at = datetime.now(timezone.utc)
+        await db.commit()
+    availability.remove(booking_id)
+    logger.info(f"Admin: Booking {booking_id} cancelled successfully.")
+    return {"message": "Booking cancelled successfully"}
 
 # --- Membership Management Endpoints ---
 
 @router.get("/memberships/", response_model=List[schemas.Membership], summary="Get all memberships (Admin only)")
-def get_all_memberships(
-    db: Session = Depends(get_db)
+async def get_all_memberships(
+    response: Response,
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Retrieve a list of all membership plans in the system.\n\n    Requires admin privileges.\n
-    Args:\n        db (Session): Database session dependency.\n
-    Returns:\n        List[schemas.Membership]: A list of all membership objects.\n    """
+    Args:\n        response (Response): Receives the X-Next-Cursor header when more memberships exist.\n        page (PageParams): The limit and after cursor.\n        db (AsyncSession): Database session dependency.\n
+    Returns:\n        List[schemas.Membership]: One page of membership objects, oldest first.\n    """
     logger.info("Admin: Fetching all memberships.")
-    memberships = db.query(models.Membership).all()
+    memberships = await paginate(db, select(models.Membership), models.Membership, page, response)
     logger.info(f"Admin: Retrieved {len(memberships)} memberships.")
     return memberships
 
 @router.post("/memberships/", response_model=schemas.Membership, status_code=status.HTTP_201_CREATED, summary="Create a new membership (Admin only)")
-def create_membership(
+async def create_membership(
     membership: schemas.MembershipCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new membership plan in the system.\n\n    Requires admin privileges.\n
-    Args:\n        membership (schemas.MembershipCreate): The membership data to create.\n        db (Session): Database session dependency.\n
+    Args:\n        membership (schemas.MembershipCreate): The membership data to create.\n        db (AsyncSession): Database session dependency.\n
     Returns:\n        schemas.Membership: The newly created membership object.\n    """
     logger.info(f"Admin: Attempting to create new membership with name: {membership.name}")
     db_membership = models.Membership(**membership.dict())
     db.add(db_membership)
-    db.commit()
-    db.refresh(db_membership)
+    await db.commit()
+    await db.refresh(db_membership)
     logger.info(f"Admin: Membership created successfully with ID: {db_membership.id}, name: {db_membership.name}")
     return db_membership
 
 @router.put("/memberships/{membership_id}", response_model=schemas.Membership, summary="Update membership details (Admin only)")
-def update_membership(
+async def update_membership(
     membership_id: UUID,
     membership_update: schemas.MembershipCreate, # Reusing MembershipCreate for update
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update details for a specific membership.\n\n    Requires admin privileges.\n
-    Args:\n        membership_id (UUID): The unique identifier of the membership to update.\n        membership_update (schemas.MembershipCreate): The updated membership data.\n        db (Session): Database session dependency.\n
+    Args:\n        membership_id (UUID): The unique identifier of the membership to update.\n        membership_update (schemas.MembershipCreate): The updated membership data.\n        db (AsyncSession): Database session dependency.\n
     Raises:\n        HTTPException: 404 if the membership is not found.\n
     Returns:\n        schemas.Membership: The updated membership object.\n    """
     logger.info(f"Admin: Attempting to update membership with ID: {membership_id}")
-    membership = db.query(models.Membership).filter(models.Membership.id == membership_id).first()
+    membership = await db.scalar(select(models.Membership).where(models.Membership.id == membership_id))
     if not membership:
         logger.warning(f"Admin: Membership with ID {membership_id} not found for update.")
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Membership not found")
@@ -348,72 +383,74 @@ def update_membership(
         logger.debug(f"Admin: Setting attribute {key} for membership ID: {membership_id}")
             
     db.add(membership)
-    db.commit()
-    db.refresh(membership)
+    await db.commit()
+    await db.refresh(membership)
     logger.info(f"Admin: Membership {membership_id} updated successfully.")
     return membership
 
 @router.delete("/memberships/{membership_id}", status_code=status.HTTP_204_NO_CONTENT, summary="Delete a membership (Admin only)")
-def delete_membership(
+async def delete_membership(
     membership_id: UUID,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete a specific membership from the system.\n\n    Requires admin privileges.\n
-    Args:\n        membership_id (UUID): The unique identifier of the membership to delete.\n        db (Session): Database session dependency.\n
+    Args:\n        membership_id (UUID): The unique identifier of the membership to delete.\n        db (AsyncSession): Database session dependency.\n
     Raises:\n        HTTPException: 404 if the membership is not found.\n
     Returns:\n        dict: A confirmation message upon successful deletion.\n    """
     logger.info(f"Admin: Attempting to delete membership with ID: {membership_id}")
-    membership = db.query(models.Membership).filter(models.Membership.id == membership_id).first()
+    membership = await db.scalar(select(models.Membership).where(models.Membership.id == membership_id))
     if not membership:
         logger.warning(f"Admin: Membership with ID {membership_id} not found for deletion.")
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Membership not found")
-    db.delete(membership)
-    db.commit()
+    await db.delete(membership)
+    await db.commit()
     logger.info(f"Admin: Membership {membership_id} deleted successfully.")
     return {"message": "Membership deleted successfully"}
 
 # --- Ownership Share Management Endpoints ---
 
 @router.get("/ownership-shares/", response_model=List[schemas.OwnershipShare], summary="Get all ownership shares (Admin only)")
-def get_all_ownership_shares(
-    db: Session = Depends(get_db)
+async def get_all_ownership_shares(
+    response: Response,
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Retrieve a list of all ownership shares in the system.\n\n    Requires admin privileges.\n
-    Args:\n        db (Session): Database session dependency.\n
-    Returns:\n        List[schemas.OwnershipShare]: A list of all ownership share objects.\n    """
+    Args:\n        response (Response): Receives the X-Next-Cursor header when more shares exist.\n        page (PageParams): The limit and after cursor.\n        db (AsyncSession): Database session dependency.\n
+    Returns:\n        List[schemas.OwnershipShare]: One page of ownership share objects, oldest first.\n    """
     logger.info("Admin: Fetching all ownership shares.")
-    shares = db.query(models.OwnershipShare).all()
+    shares = await paginate(db, select(models.OwnershipShare), models.OwnershipShare, page, response)
     logger.info(f"Admin: Retrieved {len(shares)} ownership shares.")
     return shares
 
 @router.post("/ownership-shares/", response_model=schemas.OwnershipShare, status_code=status.HTTP_201_CREATED, summary="Create a new ownership share (Admin only)")
-def create_ownership_share(
+async def create_ownership_share(
     share: schemas.OwnershipShareCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new ownership share entry in the system.\n\n    Requires admin privileges.\n
-    Args:\n        share (schemas.OwnershipShareCreate): The ownership share data to create.\n        db (Session): Database session dependency.\n
+    Args:\n        share (schemas.OwnershipShareCreate): The ownership share data to create.\n        db (AsyncSession): Database session dependency.\n
     Returns:\n        schemas.OwnershipShare: The newly created ownership share object.\n    """
     logger.info(f"Admin: Attempting to create new ownership share for jet ID: {share.jetId} and user ID: {share.userId}")
     db_share = models.OwnershipShare(**share.dict())
     db.add(db_share)
-    db.commit()
-    db.refresh(db_share)
+    await db.commit()
+    await db.refresh(db_share)
     logger.info(f"Admin: Ownership share created successfully with ID: {db_share.id}")
     return db_share
 
 @router.put("/ownership-shares/{share_id}", response_model=schemas.OwnershipShare, summary="Update ownership share details (Admin only)")
-def update_ownership_share(
+async def update_ownership_share(
     share_id: UUID,
     share_update: schemas.OwnershipShareCreate, # Reusing for update
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update details for a specific ownership share.\n\n    Requires admin privileges.\n
-    Args:\n        share_id (UUID): The unique identifier of the ownership share to update.\n        share_update (schemas.OwnershipShareCreate): The updated ownership share data.\n        db (Session): Database session dependency.\n
+    Args:\n        share_id (UUID): The unique identifier of the ownership share to update.\n        share_update (schemas.OwnershipShareCreate): The updated ownership share data.\n        db (AsyncSession): Database session dependency.\n
     Raises:\n        HTTPException: 404 if the ownership share is not found.\n
     Returns:\n        schemas.OwnershipShare: The updated ownership share object.\n    """
     logger.info(f"Admin: Attempting to update ownership share with ID: {share_id}")
-    share = db.query(models.OwnershipShare).filter(models.OwnershipShare.id == share_id).first()
+    share = await db.scalar(select(models.OwnershipShare).where(models.OwnershipShare.id == share_id))
     if not share:
         logger.warning(f"Admin: Ownership share with ID {share_id} not found for update.")
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Ownership share not found")
@@ -423,26 +460,64 @@ def update_ownership_share(
         logger.debug(f"Admin: Setting attribute {key} for ownership share ID: {share_id}")
             
     db.add(share)
-    db.commit()
-    db.refresh(share)
+    await db.commit()
+    await db.refresh(share)
     logger.info(f"Admin: Ownership share {share_id} updated successfully.")
     return share
 
 @router.delete("/ownership-shares/{share_id}", status_code=status.HTTP_204_NO_CONTENT, summary="Delete an ownership share (Admin only)")
-def delete_ownership_share(
+async def delete_ownership_share(
     share_id: UUID,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete a specific ownership share from the system.\n\n    Requires admin privileges.\n
-    Args:\n        share_id (UUID): The unique identifier of the ownership share to delete.\n        db (Session): Database session dependency.\n
+    Args:\n        share_id (UUID): The unique identifier of the ownership share to delete.\n        db (AsyncSession): Database session dependency.\n
     Raises:\n        HTTPException: 404 if the ownership share is not found.\n
     Returns:\n        dict: A confirmation message upon successful deletion.\n    """
     logger.info(f"Admin: Attempting to delete ownership share with ID: {share_id}")
-    share = db.query(models.OwnershipShare).filter(models.OwnershipShare.id == share_id).first()
+    share = await db.scalar(select(models.OwnershipShare).where(models.OwnershipShare.id == share_id))
     if not share:
         logger.warning(f"Admin: Ownership share with ID {share_id} not found for deletion.")
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Ownership share not found")
-    db.delete(share)
-    db.commit()
+    await db.delete(share)
+    await db.commit()
     logger.info(f"Admin: Ownership share {share_id} deleted successfully.")
-    return {"message": "Ownership share deleted successfully"} 
\ No newline at end of file
+    return {"message": "Ownership share deleted successfully"}
+
+# --- Database Diagnostics Endpoints ---
+
+@router.get("/db/pool", response_model=schemas.DatabasePoolMetrics, summary="Get database connection pool metrics (Admin only)")
+async def get_db_pool_metrics():
+    """Report connection pool usage for the sync and async engines.\n\n    Requires admin privileges.\n
+    Checkout wait times are cumulative histograms, so a p99 spike caused by pool\n    starvation shows up as waits in the upper buckets and as checkout timeouts.\n
+    Returns:\n        schemas.DatabasePoolMetrics: Checked-out, idle and overflow connections plus wait-time histograms.\n    """
+    logger.info("Admin: Fetching database pool metrics.")
+    return {
+        "sync_engine": get_pool_status(engine),
+        "async_engine": get_pool_status(async_engine),
+    }
+
+@router.get("/logging/pipeline", response_model=schemas.LogPipelineStats, summary="Get log pipeline statistics (Admin only)")
+async def get_log_pipeline_stats():
+    """Report queue depth, dropped records and batch counts of the background log writer.\n\n    Requires admin privileges.\n
+    Returns:\n        schemas.LogPipelineStats: The current log pipeline statistics.\n    """
+    return log_listener.stats()
+
+@router.get("/auth/metrics", response_model=schemas.AuthMetrics, summary="Get authentication metrics (Admin only)")
+async def get_auth_metrics():
+    """Report password hashing pool load, principal cache usage, revoked tokens and per-request auth overhead.\n\n    Requires admin privileges.\n
+    A growing queue or wait histogram means logins are arriving faster than\n    bcrypt can serve them; rejected counts requests that got a 503. Overhead is\n    split by whether the principal cache answered or the token was verified.\n
+    Returns:\n        schemas.AuthMetrics: Password hasher, principal cache, revocation and auth overhead statistics.\n    """
+    return {
+        "password_hasher": password_hasher.stats(),
+        "principal_cache": principal_cache.stats(),
+        "revocations": revocation_list.stats(),
+        "overhead": {name: histogram.snapshot() for name, histogram in auth_overhead.items()},
+    }
+
+@router.get("/chat/metrics", response_model=schemas.ChatMetrics, summary="Get chat concierge metrics (Admin only)")
+async def get_chat_metrics():
+    """Report MCP server call volume, retries, latency and circuit breaker state.\n\n    Requires admin privileges.\n
+    An open breaker means chat requests are being answered from the fallback\n    cache (or refused) without calling the MCP server. Dispatch shows the share\n    of messages answered by the response cache, locally from the database, or\n    by the MCP server's LLM, with the latency of each.\n
+    Returns:\n        schemas.ChatMetrics: Concierge client, fallback and response cache, dispatch tier and WebSocket session statistics.\n    """
+    return {**chat_service.stats(), "sessions": chat_sessions.stats()}
@@ -1,13 +1,24 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
-from ..database import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..database import get_async_db
 from .. import schemas, models
+from ..services.password_hasher import password_hasher
+from ..services.principal_cache import principal_cache
+from ..services.token_revocation import revocation_list
+from ..utils.auth import (
+    ACCESS_TOKEN_EXPIRE_MINUTES,
+    REFRESH_TOKEN_TYPE,
+    auth_overhead,
+    create_access_token,
+    create_refresh_token,
+    decode_access_token,
+)
 from uuid import UUID
-import jwt
-from datetime import datetime, timedelta
-from passlib.context import CryptContext
+from datetime import timedelta
 import logging
+import time
 from typing import Optional
 import traceback
 from jwt.exceptions import InvalidTokenError
@@ -15,14 +26,6 @@ from jwt.exceptions import InvalidTokenError
 # Configure logger
 logger = logging.getLogger(__name__)
 
-# Configure password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-# Configure JWT
-SECRET_KEY = "your-secret-key-here"  # In production, use a secure secret key
-ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_MINUTES = 30
-
 router = APIRouter(
     prefix="/auth",
     tags=["Auth"],
@@ -30,28 +33,21 @@ router = APIRouter(
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
-
-def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
-
-def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
-    to_encode = data.copy()
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
-    else:
-        expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
-    return encoded_jwt
+def _issue_tokens(user: models.User) -> dict:
+    """Build the access and refresh token pair for a user."""
+    claims = {"sub": user.email, "id": str(user.id), "role": user.role}
+    return {
+        "access_token": create_access_token(data=claims, expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)),
+        "refresh_token": create_refresh_token(data=claims),
+        "token_type": "bearer",
+    }
 
 @router.post("/login", response_model=schemas.Token)
-async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)):
     """Login endpoint that returns a JWT token."""
     try:
         # Find user by email
-        user = db.query(models.User).filter(models.User.email == form_data.username).first()
+        user = await db.scalar(select(models.User).where(models.User.email == form_data.username))
         if not user:
             logger.warning(f"Login attempt failed: User not found with email {form_data.username}")
             raise HTTPException(
@@ -60,32 +56,23 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session =
                 headers={"WWW-Authenticate": "Bearer"},
             )
 
-        # Verify password
-        if not verify_password(form_data.password, user.password_hash):
+        # Verify password off the event loop
+        valid, new_hash = await password_hasher.verify_and_update(form_data.password, user.password_hash)
+        if not valid:
             logger.warning(f"Login attempt failed: Invalid password for user {form_data.username}")
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Incorrect email or password",
                 headers={"WWW-Authenticate": "Bearer"},
             )
-
-        # Create access token
-        access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-        access_token = create_access_token(
-            data={
-                "sub": user.email,
-                "id": str(user.id),
-                "role": user.role  # Add role to token data
-            },
-            expires_delta=access_token_expires
-        )
+        if new_hash is not None:
+            # The stored hash used a different bcrypt cost; upgrade it now that we know the password
+            user.password_hash = new_hash
+            await db.commit()
+            logger.info(f"Rehashed password for user {user.email} at cost {password_hasher.rounds}")
 
         logger.info(f"User {user.email} logged in successfully")
-        return {
-            "access_token": access_token,
-            "token_type": "bearer",
-            "user": user
-        }
+        return {**_issue_tokens(user), "user": user}
     except HTTPException:
         raise
     except Exception as e:
@@ -96,16 +83,16 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session =
         )
 
 @router.post("/register", response_model=schemas.Token)
-def register(user: schemas.UserCreate, db: Session = Depends(get_db)):
+async def register(user: schemas.UserCreate, db: AsyncSession = Depends(get_async_db)):
     logger.info(f"Registration attempt for email: {user.email}")
     try:
         # Check if user already exists
-        existing_user = db.query(models.User).filter(models.User.email == user.email).first()
+        existing_user = await db.scalar(select(models.User).where(models.User.email == user.email))
         if existing_user:
             logger.warning(f"Registration failed: Email already exists: {user.email}")
             raise HTTPException(status_code=400, detail="Email already registered")
         logger.info("Hashing password...")
-        hashed_password = get_password_hash(user.password)
+        hashed_password = await password_hasher.hash(user.password)
         logger.info("Creating new user object...")
         db_user = models.User(
             email=user.email,
@@ -116,27 +103,43 @@ def register(user: schemas.UserCreate, db: Session = Depends(get_db)):
             role='user'
         )
         db.add(db_user)
-        db.commit()
-        db.refresh(db_user)
+        await db.commit()
+        await db.refresh(db_user)
         logger.info(f"User created successfully: {db_user.email} (id: {db_user.id})")
-        access_token = create_access_token(data={"sub": db_user.email, "role": db_user.role, "id": str(db_user.id)})
+        tokens = _issue_tokens(db_user)
         logger.info(f"Access token created for user: {db_user.email}")
-        return {"access_token": access_token, "token_type": "bearer"}
+        return tokens
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Registration error for email {user.email}: {str(e)}")
         logger.error(traceback.format_exc())
         raise HTTPException(status_code=500, detail="Internal server error during registration")
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> models.User:
-    """Get the current user from the JWT token."""
+async def get_current_principal(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)) -> schemas.Principal:
+    """Get the authenticated caller from the JWT token.
+
+    The first request with a given token checks its claims against the users
+    table. Later requests with the same token are served from principal_cache
+    without a database round trip.
+    """
+    started = time.perf_counter()
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+    principal = principal_cache.get(token)
+    if principal is not None:
+        if revocation_list.is_revoked(principal.token_id):
+            raise credentials_exception
+        auth_overhead["cached"].observe(time.perf_counter() - started)
+        return principal
+
+    cache_version = principal_cache.version
     try:
         logger.info("Attempting to decode JWT token")
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = decode_access_token(token)
         email: str = payload.get("sub")
         role: str = payload.get("role")
         user_id: str = payload.get("id")
@@ -144,10 +147,18 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
         if email is None:
             logger.error("Token missing 'sub' claim")
             raise credentials_exception
+
+        if payload.get("type") == REFRESH_TOKEN_TYPE:
+            logger.warning(f"Refresh token presented as an access token for user: {email}")
+            raise credentials_exception
+
+        if revocation_list.is_revoked(payload.get("jti")):
+            logger.warning(f"Revoked token presented for user: {email}")
+            raise credentials_exception
             
         logger.info(f"Token decoded successfully for user: {email}")
         
-        user = db.query(models.User).filter(models.User.email == email).first()
+        user = await db.scalar(select(models.User).where(models.User.email == email))
         if user is None:
             logger.error(f"User not found in database: {email}")
             raise credentials_exception
@@ -163,8 +174,19 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
             raise credentials_exception
             
         logger.info(f"Successfully authenticated user: {email}")
-        return user
+        principal = schemas.Principal(
+            id=user.id,
+            email=user.email,
+            role=user.role,
+            token_id=payload.get("jti"),
+            token_expires_at=payload.get("exp"),
+        )
+        principal_cache.put(token, principal, expires_at=payload.get("exp"), version=cache_version)
+        auth_overhead["verified"].observe(time.perf_counter() - started)
+        return principal
         
+    except HTTPException:
+        raise
     except InvalidTokenError as e:
         logger.error(f"Invalid JWT token: {str(e)}")
         raise HTTPException(status_code=401, detail="Invalid authentication credentials")
@@ -175,11 +197,79 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
             detail="An error occurred during authentication"
         )
 
-def get_current_active_user(current_user: models.User = Depends(get_current_user)) -> models.User:
+async def get_current_user(
+    principal: schemas.Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
+) -> models.User:
+    """Load the full user row for the current caller.
+
+    Only needed by endpoints that read or modify profile fields; everything
+    else should depend on get_current_principal.
+    """
+    user = await db.get(models.User, principal.id)
+    if user is None:
+        principal_cache.invalidate_user(principal.id)
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return user
+
+@router.post("/refresh", response_model=schemas.Token)
+async def refresh(request: schemas.RefreshRequest, db: AsyncSession = Depends(get_async_db)):
+    """Exchange a refresh token for a new access and refresh token pair.
+
+    Costs one HMAC check and a primary-key lookup instead of a bcrypt
+    verify. The presented refresh token is revoked, so each one can be used
+    only once.
+    """
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid refresh token",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    try:
+        payload = decode_access_token(request.refresh_token)
+    except InvalidTokenError as e:
+        logger.warning(f"Refresh rejected: {str(e)}")
+        raise credentials_exception
+    if payload.get("type") != REFRESH_TOKEN_TYPE or revocation_list.is_revoked(payload.get("jti")):
+        logger.warning(f"Refresh rejected for {payload.get('sub')}: wrong token type or revoked")
+        raise credentials_exception
+    try:
+        user = await db.get(models.User, UUID(payload.get("id")))
+    except (TypeError, ValueError):
+        raise credentials_exception
+    if user is None or user.email != payload.get("sub"):
+        logger.warning(f"Refresh rejected: user {payload.get('id')} no longer matches the token")
+        raise credentials_exception
+    revocation_list.revoke(payload.get("jti"), payload.get("exp"))
+    logger.info(f"Tokens refreshed for user {user.email}")
+    return _issue_tokens(user)
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(
+    request: Optional[schemas.LogoutRequest] = None,
+    principal: schemas.Principal = Depends(get_current_principal),
+):
+    """Revoke the caller's access token and, if given, their refresh token."""
+    revocation_list.revoke(principal.token_id, principal.token_expires_at)
+    if request is not None and request.refresh_token:
+        try:
+            payload = decode_access_token(request.refresh_token)
+        except InvalidTokenError:
+            payload = None
+        # Only the caller's own refresh tokens can be revoked this way
+        if payload is not None and payload.get("id") == str(principal.id):
+            revocation_list.revoke(payload.get("jti"), payload.get("exp"))
+    logger.info(f"User {principal.email} logged out")
+
+def get_current_active_user(current_user: schemas.Principal = Depends(get_current_principal)) -> schemas.Principal:
     """Get the current active user."""
     return current_user
 
-def get_current_admin_user(current_user: models.User = Depends(get_current_user)) -> models.User:
+def get_current_admin_user(current_user: schemas.Principal = Depends(get_current_principal)) -> schemas.Principal:
     """Get the current admin user."""
     try:
         logger.info(f"Checking admin privileges for user: {current_user.email}")
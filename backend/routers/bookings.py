@@ -1,14 +1,31 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from contextlib import AsyncExitStack
 from typing import List
 from uuid import UUID
 import logging
-import json
-from datetime import datetime
+from datetime import datetime, timezone
 
 from .. import schemas, models
-from ..database import get_db
-from .auth import get_current_user
+from ..database import get_async_db
+from ..services.availability import (
+    BOOKING_CONFLICT_DETAIL,
+    BOOKING_OVERLAP_CONSTRAINT,
+    CANCELLED,
+    availability,
+    find_conflict,
+    find_conflicts,
+    live_bookings,
+    lock_jet,
+    lock_jets,
+    to_timestamp,
+)
+from ..services.quote_engine import quote_engine
+from ..utils import debug_trace
+from ..utils.pagination import PageParams, paginate
+from .auth import get_current_principal
 
 # Configure logger for this module
 logger = logging.getLogger(__name__)
@@ -19,51 +36,197 @@ router = APIRouter(
 )
 
 @router.post("/", response_model=schemas.Booking, summary="Create a new booking")
-def create_booking(
+async def create_booking(
     booking: schemas.BookingCreate,
-    current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: schemas.Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Create a new booking in the database."""
+    """Create a new booking in the database.
+
+    Rejects the booking with 409 if the jet already has a booking that
+    overlaps [start_time, end_time). The overlap check and the insert run
+    under the jet's row lock, so concurrent requests for the same jet cannot
+    both succeed. total_price is computed on the server by the quote engine.
+    """
     logger.info(f"Creating new booking for jet ID: {booking.jet_id}")
     try:
-        # Create a new booking record
-        db_booking = models.Booking(
-            user_id=current_user.id,
-            jet_id=booking.jet_id,
-            origin=booking.origin,
-            destination=booking.destination,
-            start_time=booking.start_time,
-            end_time=booking.end_time,
-            passengers=booking.passengers,
-            special_requests=booking.special_requests,
-            status="pending"
-        )
-        
-        # Add to database and commit
-        db.add(db_booking)
-        db.commit()
-        db.refresh(db_booking)
+        async with availability.jet_lock(booking.jet_id):
+            if not await lock_jet(db, booking.jet_id):
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Jet not found")
+            conflict = await find_conflict(db, booking.jet_id, booking.start_time, booking.end_time)
+            if conflict is not None:
+                await db.rollback()
+                logger.info(f"Booking rejected: jet {booking.jet_id} already booked by {conflict}")
+                raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=BOOKING_CONFLICT_DETAIL)
+            total_price = await quote_engine.total_price(db, current_user.id, booking.jet_id, booking.start_time, booking.end_time)
+
+            # Create a new booking record
+            db_booking = models.Booking(
+                user_id=current_user.id,
+                jet_id=booking.jet_id,
+                origin=booking.origin,
+                destination=booking.destination,
+                start_time=booking.start_time,
+                end_time=booking.end_time,
+                passengers=booking.passengers,
+                special_requests=booking.special_requests,
+                total_price=total_price,
+                status="pending"
+            )
+            
+            # Add to database and commit
+            db.add(db_booking)
+            await db.commit()
+        await db.refresh(db_booking)
+        availability.upsert(db_booking)
         
         logger.info(f"Successfully created booking with ID: {db_booking.id}")
         return db_booking
+    except HTTPException:
+        raise
+    except IntegrityError as e:
+        await db.rollback()
+        if BOOKING_OVERLAP_CONSTRAINT in str(e.orig):
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=BOOKING_CONFLICT_DETAIL)
+        logger.error(f"Error creating booking: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to create booking"
+        )
     except Exception as e:
         logger.error(f"Error creating booking: {str(e)}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to create booking"
         )
 
+def _overlapping_legs(legs: List[schemas.BookingCreate]) -> bool:
+    """Whether two legs of one batch book the same jet for overlapping times."""
+    by_jet = {}
+    for leg in legs:
+        by_jet.setdefault(leg.jet_id, []).append((to_timestamp(leg.start_time), to_timestamp(leg.end_time)))
+    for windows in by_jet.values():
+        windows.sort()
+        if any(later_start < end for (_, end), (later_start, _) in zip(windows, windows[1:])):
+            return True
+    return False
+
+@router.post("/batch", response_model=List[schemas.Booking], summary="Create several bookings in one transaction")
+async def create_bookings(
+    batch: schemas.BookingBatchCreate,
+    current_user: schemas.Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Create every leg of a multi-leg itinerary, or none of them.
+
+    All jets are locked in one query and all legs are checked for overlaps in
+    one query, then the legs are written with a single multi-row
+    INSERT ... RETURNING and one commit. Rejects the batch with 409 if any leg
+    overlaps an existing booking or another leg of the same jet, and with 404
+    if any jet does not exist.
+
+    Returns:
+        List[schemas.Booking]: The created bookings, in the order given.
+    """
+    legs = batch.bookings
+    jet_ids = sorted({leg.jet_id for leg in legs})
+    logger.info(f"Creating {len(legs)} bookings across {len(jet_ids)} jets")
+    if _overlapping_legs(legs):
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Legs of the batch overlap on the same jet")
+    try:
+        async with AsyncExitStack() as stack:
+            # Same order as lock_jets takes the row locks
+            for jet_id in jet_ids:
+                await stack.enter_async_context(availability.jet_lock(jet_id))
+            missing = set(jet_ids) - await lock_jets(db, jet_ids)
+            if missing:
+                await db.rollback()
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Jet not found: {sorted(missing)[0]}")
+            windows = [(leg.jet_id, leg.start_time, leg.end_time) for leg in legs]
+            conflict = await find_conflicts(db, windows)
+            if conflict is not None:
+                await db.rollback()
+                logger.info(f"Booking batch rejected: jet {conflict} already booked")
+                raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=BOOKING_CONFLICT_DETAIL)
+            totals = await quote_engine.total_prices(db, current_user.id, windows)
+
+            rows = [
+                {**leg.dict(), "user_id": current_user.id, "total_price": total_price, "status": "pending"}
+                for leg, total_price in zip(legs, totals)
+            ]
+            db_bookings = (await db.scalars(insert(models.Booking).returning(models.Booking, sort_by_parameter_order=True), rows)).all()
+            await db.commit()
+        for db_booking in db_bookings:
+            availability.upsert(db_booking)
+
+        logger.info(f"Successfully created {len(db_bookings)} bookings")
+        return db_bookings
+    except HTTPException:
+        raise
+    except IntegrityError as e:
+        await db.rollback()
+        if BOOKING_OVERLAP_CONSTRAINT in str(e.orig):
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=BOOKING_CONFLICT_DETAIL)
+        logger.error(f"Error creating bookings: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to create bookings"
+        )
+    except Exception as e:
+        logger.error(f"Error creating bookings: {str(e)}")
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to create bookings"
+        )
+
+@router.post("/quote", response_model=List[schemas.JetQuote], summary="Price a trip on several jets at once")
+async def quote_booking(
+    request: schemas.QuoteRequest,
+    current_user: schemas.Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Quote the same trip on every jet in `jet_ids` in one call.
+
+    Prices include the current user's membership discount. Each quote also
+    says whether the jet is free over the window and has enough seats. Jets
+    that do not exist or have no hourly rate are left out.
+    """
+    try:
+        return await quote_engine.quote(
+            db, current_user.id, request.jet_ids, request.start_time, request.end_time, request.passengers
+        )
+    except Exception as e:
+        logger.error(f"Error quoting booking: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to quote booking"
+        )
+
 @router.get("/", response_model=List[schemas.Booking], summary="Get all bookings for the current user")
-def get_bookings(
-    current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+async def get_bookings(
+    response: Response,
+    page: PageParams = Depends(),
+    include_cancelled: bool = Query(False, description="Also list cancelled bookings"),
+    current_user: schemas.Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get all bookings for the current user."""
+    """Get one page of bookings for the current user, oldest first.
+
+    Cancelled bookings are left out unless include_cancelled is set.
+    """
+    query = select(models.Booking).where(models.Booking.user_id == current_user.id)
+    if not include_cancelled:
+        query = query.where(live_bookings())
     try:
-        bookings = db.query(models.Booking).filter(models.Booking.user_id == current_user.id).all()
-        return bookings
+        return await paginate(
+            db,
+            query,
+            models.Booking,
+            page,
+            response,
+        )
     except Exception as e:
         logger.error(f"Error fetching bookings: {str(e)}")
         raise HTTPException(
@@ -72,17 +235,17 @@ def get_bookings(
         )
 
 @router.get("/{booking_id}", response_model=schemas.Booking, summary="Get details of a specific booking")
-def get_booking(
+async def get_booking(
     booking_id: UUID,
-    current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: schemas.Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get details of a specific booking."""
     try:
-        booking = db.query(models.Booking).filter(
+        booking = await db.scalar(select(models.Booking).where(
             models.Booking.id == booking_id,
             models.Booking.user_id == current_user.id
-        ).first()
+        ))
         if not booking:
             raise HTTPException(status_code=404, detail="Booking not found")
         return booking
@@ -96,21 +259,28 @@ def get_booking(
         )
 
 @router.delete("/{booking_id}", status_code=status.HTTP_204_NO_CONTENT, summary="Cancel a booking")
-def cancel_booking(
+async def cancel_booking(
     booking_id: UUID,
-    current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: schemas.Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Cancel a booking."""
+    """Cancel a booking.
+
+    The booking is kept with status "cancelled" and a cancelled_at
+    timestamp, and stops holding the jet. Cancelling twice is a no-op.
+    """
     try:
-        booking = db.query(models.Booking).filter(
+        booking = await db.scalar(select(models.Booking).where(
             models.Booking.id == booking_id,
             models.Booking.user_id == current_user.id
-        ).first()
+        ))
         if not booking:
             raise HTTPException(status_code=404, detail="Booking not found")
-        db.delete(booking)
-        db.commit()
+        if booking.status != CANCELLED:
+            booking.status = CANCELLED
+            booking.cancelled_at = datetime.now(timezone.utc)
+            await db.commit()
+        availability.remove(booking_id)
         return {"message": "Booking cancelled successfully"}
     except HTTPException:
         raise
@@ -123,46 +293,23 @@ def cancel_booking(
 
 @router.get("/my-bookings", response_model=List[schemas.Booking])
 async def get_my_bookings(
-    current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    include_cancelled: bool = Query(False, description="Also list cancelled bookings"),
+    current_user: schemas.Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get the current user's bookings."""
+    """Get the current user's bookings, leaving out cancelled ones unless include_cancelled is set."""
     try:
         logger.info(f"Fetching bookings for user: {current_user.email}")
-        bookings = db.query(models.Booking).filter(
-            models.Booking.user_id == current_user.id
-        ).all()
+        query = select(models.Booking).where(models.Booking.user_id == current_user.id)
+        if not include_cancelled:
+            query = query.where(live_bookings())
+        bookings = (await db.scalars(query)).all()
         
         # Log the number of bookings found
         logger.info(f"Found {len(bookings)} bookings for user {current_user.email}")
         
-        # Log detailed information about each booking
-        for booking in bookings:
-            booking_dict = {
-                'id': str(booking.id),
-                'user_id': str(booking.user_id),
-                'jet_id': str(booking.jet_id),
-                'origin': booking.origin,
-                'destination': booking.destination,
-                'start_time': booking.start_time.isoformat() if booking.start_time else None,
-                'end_time': booking.end_time.isoformat() if booking.end_time else None,
-                'status': booking.status,
-                'passengers': booking.passengers,
-                'special_requests': booking.special_requests,
-                'total_price': float(booking.total_price) if booking.total_price else None,
-                'created_at': booking.created_at.isoformat() if booking.created_at else None,
-                'updated_at': booking.updated_at.isoformat() if booking.updated_at else None
-            }
-            logger.info(f"Booking data: {json.dumps(booking_dict, indent=2)}")
-        
-        # Try to convert the first booking to a dict to check for any serialization issues
-        if bookings:
-            try:
-                first_booking_dict = bookings[0].__dict__
-                logger.info(f"First booking dict: {json.dumps({k: str(v) for k, v in first_booking_dict.items()}, indent=2)}")
-            except Exception as e:
-                logger.error(f"Error converting first booking to dict: {str(e)}")
-        
+        debug_trace.trace_rows(logger, "Bookings", bookings)
+
         return bookings
     except Exception as e:
         logger.error(f"Error fetching user bookings: {str(e)}")
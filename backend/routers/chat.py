@@ -1,42 +1,35 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Request
-from fastapi.security import OAuth2PasswordBearer
-from typing import Dict, Any
+from fastapi import APIRouter, Depends, HTTPException, status, Request, WebSocket
+from fastapi.responses import StreamingResponse
+from typing import Dict, Any, Optional
+import json
 import logging
 from pydantic import BaseModel
-from backend.services.chat_service import ChatService
+from backend import schemas
+from backend.database import AsyncSessionLocal
+from backend.routers.auth import get_current_principal
+from backend.services.chat_service import chat_service
+from backend.services.chat_sessions import chat_sessions
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
-
-# Create a single instance of the chat service
-chat_service = ChatService()
-
-@router.on_event("shutdown")
-async def shutdown_event():
-    """Clean up resources when the application shuts down."""
-    await chat_service.close()
 
 class ChatMessage(BaseModel):
     message: str
-    user_id: str  # In a real app, this would come from the auth token
+    # Ignored: the caller is identified by the bearer token. Kept so older clients still validate.
+    user_id: Optional[str] = None
 
 @router.post("/chat/message")
-async def process_chat_message(chat_message: ChatMessage, request: Request):
+async def process_chat_message(
+    chat_message: ChatMessage,
+    request: Request,
+    current_user: schemas.Principal = Depends(get_current_principal)
+):
     """
     Process a chat message using the MCP server's AI Concierge.
     """
     try:
-        # In a real application, you would validate the user's token here
-        # and get the user_id from it
-        user_id = chat_message.user_id
-        
-        if not user_id:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="User not authenticated"
-            )
+        user_id = str(current_user.id)
         
         # Process the message
         response = await chat_service.process_message(
@@ -66,3 +59,50 @@ async def process_chat_message(chat_message: ChatMessage, request: Request):
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Error processing your message"
         )
+
+@router.post("/chat/message/stream")
+async def stream_chat_message(
+    chat_message: ChatMessage,
+    current_user: schemas.Principal = Depends(get_current_principal)
+):
+    """
+    Process a chat message, streaming the answer as newline-delimited JSON.
+
+    Each line is one event: "token" events carry pieces of the answer text
+    as the MCP server produces them, "data" events carry structured results,
+    and the stream ends with a "done" or "error" event.
+    """
+    user_id = str(current_user.id)
+
+    async def events():
+        async for event in chat_service.stream_message(chat_message.message, user_id):
+            yield json.dumps(event) + "\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="application/x-ndjson",
+        # Keep proxies from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.websocket("/chat/ws")
+async def chat_websocket(websocket: WebSocket, token: str = "", session_id: str = "default"):
+    """
+    Chat over one WebSocket connection for a whole conversation.
+
+    Browsers cannot set headers on the handshake, so the access token is
+    passed as ?token=. Send {"id": ..., "message": ..., "stream": false}
+    frames; several may be in flight at once. Each reply frame carries the id
+    it answers: one "response" frame, or the stream_message events when
+    "stream" is true. A new connection for the same user and session_id
+    closes the previous one.
+    """
+    try:
+        if not token:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
+        async with AsyncSessionLocal() as db:
+            current_user = await get_current_principal(token, db)
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="User not authenticated")
+        return
+    await chat_sessions.serve(websocket, str(current_user.id), session_id)
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, HTTPException, status, Depends
 from pydantic import BaseModel, EmailStr
-from sqlalchemy.orm import Session
-from backend.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.database import get_async_db
 
 router = APIRouter(prefix="/contact", tags=["Contact"])
 
@@ -27,7 +27,7 @@ def get_primary_contact_info():
     }
 
 @router.post("/", status_code=status.HTTP_201_CREATED)
-def submit_contact_form(contact: ContactMessage, db: Session = Depends(get_db)):
+async def submit_contact_form(contact: ContactMessage, db: AsyncSession = Depends(get_async_db)):
     # Here you would typically save the message to the database or send an email
     # For now, just return a success message
     # Example: db.add(ContactModel(**contact.dict())); db.commit()
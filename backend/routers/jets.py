@@ -1,18 +1,34 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from pydantic import TypeAdapter
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from uuid import UUID
 from datetime import datetime
 import logging # Import the logging module
-from decimal import Decimal
 
 from .. import schemas, models
-from ..database import get_db
+from ..database import get_async_db
+from ..services.availability import availability, busy_jet_ids, find_conflict, to_timestamp
+from ..services.cache import catalog_cache
+from ..services.jet_search_index import jet_search_index
+from ..utils.pagination import DEFAULT_PAGE_SIZE, NEXT_CURSOR_HEADER, PageParams, encode_cursor, fetch_page
 from .auth import get_current_active_user, get_current_admin_user # Import for protected routes
 
 # Configure logger for this module
 logger = logging.getLogger(__name__)
 
+# Catalog responses are cached as final JSON bytes, serialized with these adapters
+_jet_adapter = TypeAdapter(schemas.Jet)
+_jet_list_adapter = TypeAdapter(List[schemas.Jet])
+_category_list_adapter = TypeAdapter(List[schemas.JetCategory])
+
+def _json_response(body: bytes, next_cursor: Optional[str] = None) -> Response:
+    response = Response(content=body, media_type="application/json")
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return response
+
 router = APIRouter(
     prefix="/jets",
     tags=["Jets"],
@@ -22,17 +38,24 @@ router = APIRouter(
 )
 
 @router.get("/search", response_model=List[schemas.Jet], summary="Search for jets with filters")
-def search_jets(
+async def search_jets(
     category: Optional[str] = Query(None, description="Filter by jet category"),
     min_price: Optional[float] = Query(None, description="Minimum price per hour"),
     max_price: Optional[float] = Query(None, description="Maximum price per hour"),
     location: Optional[str] = Query(None, description="Filter by location"),
     passengers: Optional[int] = Query(None, description="Minimum number of passengers"),
     range: Optional[int] = Query(None, description="Minimum range in nautical miles"),
-    db: Session = Depends(get_db)
+    start_time: Optional[datetime] = Query(None, description="Only jets free from this time (requires end_time)"),
+    end_time: Optional[datetime] = Query(None, description="Only jets free until this time (requires start_time)"),
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Search for jets based on various filters.
 
+    Served from the in-memory jet search index rather than the database.
+    With a start_time/end_time window, jets booked at any point in the window
+    are excluded using the availability index.
+
     Args:
         category (Optional[str]): Filter by jet category
         min_price (Optional[float]): Minimum price per hour
@@ -40,60 +63,87 @@ def search_jets(
         location (Optional[str]): Filter by location
         passengers (Optional[int]): Minimum number of passengers
         range (Optional[int]): Minimum range in nautical miles
-        db (Session): Database session dependency
+        start_time (Optional[datetime]): Start of the window the jet must be free over
+        end_time (Optional[datetime]): End of the window the jet must be free over
+        page (PageParams): The limit and after cursor
+        db (AsyncSession): Database session dependency
+
+    Raises:
+        HTTPException: 400 if only one end of the window is given, or the window is empty.
 
     Returns:
-        List[schemas.Jet]: A list of jets matching the search criteria
+        List[schemas.Jet]: One page of matching jets, oldest first; X-Next-Cursor is set when more exist
     """
-    logger.info(f"Searching for jets with filters: category={category}, min_price={min_price}, max_price={max_price}, location={location}, passengers={passengers}, range={range}")
-    
-    query = db.query(models.Jet).filter(models.Jet.status == "available")
-
-    if category:
-        query = query.join(models.JetCategory).filter(models.JetCategory.name.ilike(f"%{category}%"))
-    
-    if min_price is not None:
-        query = query.filter(models.Jet.price_per_hour >= Decimal(str(min_price)))
-    
-    if max_price is not None:
-        query = query.filter(models.Jet.price_per_hour <= Decimal(str(max_price)))
-    
-    if location:
-        query = query.filter(models.Jet.location.ilike(f"%{location}%"))
-    
-    if passengers is not None:
-        query = query.filter(models.Jet.max_passengers >= passengers)
-    
-    if range is not None:
-        query = query.filter(models.Jet.range_nm >= range)
-
-    jets = query.all()
+    logger.info(f"Searching for jets with filters: category={category}, min_price={min_price}, max_price={max_price}, location={location}, passengers={passengers}, range={range}, window={start_time}..{end_time}")
+
+    busy = None
+    if start_time is not None or end_time is not None:
+        if start_time is None or end_time is None:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="start_time and end_time must be given together")
+        if to_timestamp(end_time) <= to_timestamp(start_time):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="end_time must be after start_time")
+        busy = await busy_jet_ids(db, start_time, end_time)
+
+    await jet_search_index.ensure_loaded(db)
+    jets, next_key = jet_search_index.search(
+        category=category,
+        min_price=min_price,
+        max_price=max_price,
+        location=location,
+        passengers=passengers,
+        range_nm=range,
+        exclude=busy,
+        after=page.after_key,
+        limit=page.limit,
+    )
     logger.info(f"Found {len(jets)} jets matching the search criteria")
-    return jets
+    return _json_response(b"[" + b",".join(jets) + b"]", encode_cursor(*next_key) if next_key else None)
 
 @router.get("/", response_model=List[schemas.Jet], summary="Get all jets")
-def get_all_jets(db: Session = Depends(get_db)):
-    """Get all available jets."""
+async def get_all_jets(page: PageParams = Depends(), db: AsyncSession = Depends(get_async_db)):
+    """Get one page of available jets, oldest first.
+
+    The default first page is cached together with its next-page cursor;
+    later pages and custom limits go to the database.
+    """
     logger.info("Fetching all jets")
-    jets = db.query(models.Jet).filter(models.Jet.status == "available").all()
-    logger.info(f"Found {len(jets)} jets")
-    return jets
+
+    async def load() -> bytes:
+        jets, next_key = await fetch_page(
+            db, select(models.Jet).where(models.Jet.status == "available"), models.Jet, page
+        )
+        logger.info(f"Found {len(jets)} jets")
+        body = _jet_list_adapter.dump_json(_jet_list_adapter.validate_python(jets, from_attributes=True))
+        cursor = encode_cursor(*next_key) if next_key else ""
+        # Cached value is "<cursor>\n<body>" so the header survives a cache hit
+        return cursor.encode() + b"\n" + body
+
+    if page.after is None and page.limit == DEFAULT_PAGE_SIZE:
+        value = await catalog_cache.get_or_load(catalog_cache.JETS_KEY, load)
+    else:
+        value = await load()
+    cursor, _, body = value.partition(b"\n")
+    return _json_response(body, cursor.decode() or None)
 
 @router.get("/categories", response_model=List[schemas.JetCategory], summary="Get all jet categories")
-def get_categories(db: Session = Depends(get_db)):
+async def get_categories(db: AsyncSession = Depends(get_async_db)):
     """Retrieve all available jet categories."""
     logger.info("Fetching all jet categories")
-    categories = db.query(models.JetCategory).all()
-    logger.info(f"Found {len(categories)} categories")
-    return categories
+
+    async def load() -> bytes:
+        categories = (await db.scalars(select(models.JetCategory))).all()
+        logger.info(f"Found {len(categories)} categories")
+        return _category_list_adapter.dump_json(_category_list_adapter.validate_python(categories, from_attributes=True))
+
+    return _json_response(await catalog_cache.get_or_load(catalog_cache.CATEGORIES_KEY, load))
 
 @router.get("/{jet_id}", response_model=schemas.Jet, summary="Get details of a specific jet")
-def get_jet_details(jet_id: UUID, db: Session = Depends(get_db)):
+async def get_jet_details(jet_id: UUID, db: AsyncSession = Depends(get_async_db)):
     """Retrieve details of a specific private jet by its ID.
 
     Args:
         jet_id (UUID): The unique identifier of the jet.
-        db (Session): Database session dependency.
+        db (AsyncSession): Database session dependency.
 
     Raises:
         HTTPException: 404 if the jet is not found.
@@ -102,9 +152,49 @@ def get_jet_details(jet_id: UUID, db: Session = Depends(get_db)):
         schemas.Jet: The jet object.
     """
     logger.info(f"Attempting to retrieve jet details for ID: {jet_id}")
-    jet = db.query(models.Jet).filter(models.Jet.id == jet_id).first()
-    if not jet:
+
+    async def load() -> Optional[bytes]:
+        jet = await db.scalar(select(models.Jet).where(models.Jet.id == jet_id))
+        if not jet:
+            return None
+        return _jet_adapter.dump_json(schemas.Jet.model_validate(jet))
+
+    body = await catalog_cache.get_or_load(catalog_cache.jet_key(jet_id), load)
+    if body is None:
         logger.warning(f"Jet with ID {jet_id} not found.")
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Jet not found")
     logger.info(f"Successfully retrieved jet details for ID: {jet_id}")
-    return jet 
\ No newline at end of file
+    return _json_response(body) 
+
+@router.get("/{jet_id}/availability", response_model=schemas.JetAvailability, summary="Check whether a jet is free over a time window")
+async def get_jet_availability(
+    jet_id: UUID,
+    start_time: datetime = Query(..., description="Window start (inclusive)"),
+    end_time: datetime = Query(..., description="Window end (exclusive)"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Report whether a jet has no bookings overlapping [start_time, end_time).
+
+    Answered from the in-memory availability index. Windows that start
+    before the index's horizon (i.e. in the past) are checked in SQL.
+
+    Args:
+        jet_id (UUID): The unique identifier of the jet.
+        start_time (datetime): Window start.
+        end_time (datetime): Window end; must be after start_time.
+        db (AsyncSession): Database session dependency.
+
+    Raises:
+        HTTPException: 400 if the window is empty.
+
+    Returns:
+        schemas.JetAvailability: The window and whether the jet is free over it.
+    """
+    if to_timestamp(end_time) <= to_timestamp(start_time):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="end_time must be after start_time")
+    await availability.ensure_loaded(db)
+    if availability.covers(start_time):
+        available = availability.is_free(jet_id, start_time, end_time)
+    else:
+        available = await find_conflict(db, jet_id, start_time, end_time) is None
+    return {"jet_id": jet_id, "start_time": start_time, "end_time": end_time, "available": available}
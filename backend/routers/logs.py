@@ -1,12 +1,25 @@
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from typing import List, Optional
-from datetime import datetime, timedelta
+from datetime import datetime
 from pydantic import BaseModel
-import json
+import asyncio
 import os
 
+from ..logger import logs_dir
+from ..services.log_store import LogStore
+from ..services.log_follower import LogFollower
+
 router = APIRouter()
 
+# Shared across requests so the sparse index is built once and then extended
+log_store = LogStore(logs_dir)
+# One follower tails the active file for every connected viewer
+log_follower = LogFollower(logs_dir, poll_interval=float(os.getenv("LOG_STREAM_POLL_INTERVAL", "0.5")))
+
+STREAM_HEARTBEAT_SECONDS = 15.0
+
 class LogEntry(BaseModel):
     level: str
     message: str
@@ -14,6 +27,18 @@ class LogEntry(BaseModel):
     location: Optional[str] = None
     stack: Optional[str] = None
 
+def _to_entry(record: dict) -> LogEntry:
+    location = None
+    if record.get("module"):
+        location = f"{record['module']}:{record.get('function')}:{record.get('line')}"
+    return LogEntry(
+        level=record.get("level", ""),
+        message=str(record.get("message", "")),
+        timestamp=record.get("timestamp", ""),
+        location=location,
+        stack=record.get("exception"),
+    )
+
 @router.get("/logs", response_model=List[LogEntry])
 async def get_logs(
     level: Optional[str] = Query(None, description="Filter by log level (info, warn, error, debug)"),
@@ -22,37 +47,58 @@ async def get_logs(
     search: Optional[str] = Query(None, description="Search in log messages"),
     limit: int = Query(100, description="Number of logs to return")
 ):
-    logs = []
-    log_file = "app.log"
-    
-    if not os.path.exists(log_file):
-        return []
-        
-    with open(log_file, "r") as f:
-        for line in f:
-            try:
-                log_entry = json.loads(line)
-                entry = LogEntry(**log_entry)
-                
-                # Apply filters
-                if level and entry.level != level:
-                    continue
-                    
-                if start_time and datetime.fromisoformat(entry.timestamp) < start_time:
-                    continue
-                    
-                if end_time and datetime.fromisoformat(entry.timestamp) > end_time:
-                    continue
-                    
-                if search and search.lower() not in entry.message.lower():
+    """Return the newest matching log entries first.
+
+    Reads the JSON logs backwards through a per-minute offset index, so only
+    the buckets that can match the time and level filters are touched.
+    """
+    records = await run_in_threadpool(
+        log_store.query,
+        level=level,
+        start_time=start_time,
+        end_time=end_time,
+        search=search,
+        limit=limit,
+    )
+    return [_to_entry(record) for record in records]
+
+def _sse_event(entry: LogEntry) -> str:
+    return f"data: {entry.model_dump_json()}\n\n"
+
+@router.get("/logs/stream")
+async def stream_logs(
+    request: Request,
+    level: Optional[str] = Query(None, description="Only stream entries with this level (info, warn, error, debug)"),
+    search: Optional[str] = Query(None, description="Only stream entries whose message contains this text"),
+    tail: int = Query(0, ge=0, le=1000, description="Number of recent matching entries to send before following"),
+):
+    """Stream new log entries as Server-Sent Events.
+
+    Filters are applied on the server, and every viewer shares the same file
+    follower, so an open dashboard costs a queue rather than a file scan.
+    """
+    history = []
+    if tail:
+        history = await run_in_threadpool(log_store.query, level=level, search=search, limit=tail)
+    subscription = log_follower.subscribe(level=level, search=search)
+
+    async def events():
+        try:
+            for record in reversed(history):
+                yield _sse_event(_to_entry(record))
+            while not await request.is_disconnected():
+                try:
+                    record = await asyncio.wait_for(subscription.queue.get(), timeout=STREAM_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    # Comment line keeps proxies from closing an idle stream
+                    yield ": keepalive\n\n"
                     continue
-                    
-                logs.append(entry)
-                
-                if len(logs) >= limit:
-                    break
-                    
-            except json.JSONDecodeError:
-                continue
-                
-    return logs[::-1]  # Return in reverse chronological order 
\ No newline at end of file
+                yield _sse_event(_to_entry(record))
+        finally:
+            log_follower.unsubscribe(subscription)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,11 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
-from ..database import get_db
+from ..database import get_async_db
 from .. import schemas, models
+from ..services.password_hasher import password_hasher
+from ..services.principal_cache import principal_cache
+from ..utils import debug_trace
 from .auth import get_current_user, get_current_admin_user
 import logging
-import json
 import traceback
 
 # Configure logger
@@ -21,19 +24,7 @@ async def get_current_user_data(current_user: models.User = Depends(get_current_
     """Get the current user's data."""
     try:
         logger.info(f"Fetching data for user: {current_user.email}")
-        # Convert the user model to a dict for logging
-        user_dict = {
-            'id': str(current_user.id),
-            'email': current_user.email,
-            'name': current_user.name,
-            'first_name': current_user.first_name,
-            'last_name': current_user.last_name,
-            'role': current_user.role,
-            'membership_id': str(current_user.membership_id) if current_user.membership_id else None,
-            'created_at': current_user.created_at.isoformat() if current_user.created_at else None,
-            'updated_at': current_user.updated_at.isoformat() if current_user.updated_at else None
-        }
-        logger.info(f"User data: {json.dumps(user_dict, indent=2)}")
+        debug_trace.trace(logger, "User data", lambda: debug_trace.columns(current_user))
         return current_user
     except Exception as e:
         logger.error(f"Error fetching user data: {str(e)}")
@@ -47,12 +38,12 @@ async def get_current_user_data(current_user: models.User = Depends(get_current_
 async def update_current_user(
     user_update: schemas.UserUpdate,
     current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update the current user's data."""
     try:
         logger.info(f"Updating data for user: {current_user.email}")
-        logger.info(f"Update data: {json.dumps(user_update.dict(exclude_unset=True), indent=2)}")
+        debug_trace.trace(logger, "Update data", lambda: debug_trace.columns(user_update.dict(exclude_unset=True)))
         
         # Only allow role updates if the user is an admin
         if user_update.role is not None and current_user.role != "admin":
@@ -66,28 +57,17 @@ async def update_current_user(
         for field, value in user_update.dict(exclude_unset=True).items():
             if field == "password":
                 # Hash the password before storing
-                from ..utils.auth import get_password_hash
-                current_user.password_hash = get_password_hash(value)
+                current_user.password_hash = await password_hasher.hash(value)
             else:
                 setattr(current_user, field, value)
         
         db.add(current_user)
-        db.commit()
-        db.refresh(current_user)
+        await db.commit()
+        # Tokens carry email and role claims, so re-verify them on the next request
+        principal_cache.invalidate_user(current_user.id)
+        await db.refresh(current_user)
         
-        # Log the updated user data
-        user_dict = {
-            'id': str(current_user.id),
-            'email': current_user.email,
-            'name': current_user.name,
-            'first_name': current_user.first_name,
-            'last_name': current_user.last_name,
-            'role': current_user.role,
-            'membership_id': str(current_user.membership_id) if current_user.membership_id else None,
-            'created_at': current_user.created_at.isoformat() if current_user.created_at else None,
-            'updated_at': current_user.updated_at.isoformat() if current_user.updated_at else None
-        }
-        logger.info(f"Updated user data: {json.dumps(user_dict, indent=2)}")
+        debug_trace.trace(logger, "Updated user data", lambda: debug_trace.columns(current_user))
         
         return current_user
     except HTTPException:
@@ -103,13 +83,13 @@ async def update_current_user(
 @router.get("/{user_id}", response_model=schemas.User)
 async def get_user(
     user_id: str,
-    current_user: models.User = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
+    current_user: schemas.Principal = Depends(get_current_admin_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get a specific user's data (admin only)."""
     try:
         logger.info(f"Admin {current_user.email}: Fetching data for user ID: {user_id}")
-        user = db.query(models.User).filter(models.User.id == user_id).first()
+        user = await db.scalar(select(models.User).where(models.User.id == user_id))
         if not user:
             logger.warning(f"Admin {current_user.email}: User not found with ID: {user_id}")
             raise HTTPException(
@@ -117,19 +97,7 @@ async def get_user(
                 detail="User not found"
             )
         
-        # Log the user data
-        user_dict = {
-            'id': str(user.id),
-            'email': user.email,
-            'name': user.name,
-            'first_name': user.first_name,
-            'last_name': user.last_name,
-            'role': user.role,
-            'membership_id': str(user.membership_id) if user.membership_id else None,
-            'created_at': user.created_at.isoformat() if user.created_at else None,
-            'updated_at': user.updated_at.isoformat() if user.updated_at else None
-        }
-        logger.info(f"Admin {current_user.email}: User data: {json.dumps(user_dict, indent=2)}")
+        debug_trace.trace(logger, f"Admin {current_user.email}: User data", lambda: debug_trace.columns(user))
         
         return user
     except HTTPException:
@@ -146,15 +114,15 @@ async def get_user(
 async def update_user(
     user_id: str,
     user_update: schemas.UserUpdate,
-    current_user: models.User = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
+    current_user: schemas.Principal = Depends(get_current_admin_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update a specific user's data (admin only)."""
     try:
         logger.info(f"Admin {current_user.email}: Updating data for user ID: {user_id}")
-        logger.info(f"Admin {current_user.email}: Update data: {json.dumps(user_update.dict(exclude_unset=True), indent=2)}")
+        debug_trace.trace(logger, f"Admin {current_user.email}: Update data", lambda: debug_trace.columns(user_update.dict(exclude_unset=True)))
         
-        user = db.query(models.User).filter(models.User.id == user_id).first()
+        user = await db.scalar(select(models.User).where(models.User.id == user_id))
         if not user:
             logger.warning(f"Admin {current_user.email}: User not found with ID: {user_id}")
             raise HTTPException(
@@ -166,28 +134,16 @@ async def update_user(
         for field, value in user_update.dict(exclude_unset=True).items():
             if field == "password":
                 # Hash the password before storing
-                from ..utils.auth import get_password_hash
-                user.password_hash = get_password_hash(value)
+                user.password_hash = await password_hasher.hash(value)
             else:
                 setattr(user, field, value)
         
         db.add(user)
-        db.commit()
-        db.refresh(user)
+        await db.commit()
+        principal_cache.invalidate_user(user.id)
+        await db.refresh(user)
         
-        # Log the updated user data
-        user_dict = {
-            'id': str(user.id),
-            'email': user.email,
-            'name': user.name,
-            'first_name': user.first_name,
-            'last_name': user.last_name,
-            'role': user.role,
-            'membership_id': str(user.membership_id) if user.membership_id else None,
-            'created_at': user.created_at.isoformat() if user.created_at else None,
-            'updated_at': user.updated_at.isoformat() if user.updated_at else None
-        }
-        logger.info(f"Admin {current_user.email}: Updated user data: {json.dumps(user_dict, indent=2)}")
+        debug_trace.trace(logger, f"Admin {current_user.email}: Updated user data", lambda: debug_trace.columns(user))
         
         return user
     except HTTPException:
@@ -117,6 +117,7 @@ class JetBase(BaseModel):
     features: Optional[List[str]] = None
     amenities: Optional[List[str]] = None
     status: str = "available"
+    location: Optional[str] = None
     range_nm: int
 
 class JetCreate(JetBase):
@@ -150,6 +151,7 @@ class JetUpdate(BaseModel):
     features: Optional[List[str]] = None
     amenities: Optional[List[str]] = None
     status: Optional[str] = None
+    location: Optional[str] = None
     range_nm: Optional[int] = None
 
 class BookingBase(BaseModel):
@@ -170,11 +172,15 @@ class BookingBase(BaseModel):
 class BookingCreate(BookingBase):
     pass
 
+class BookingBatchCreate(BaseModel):
+    bookings: List[BookingCreate] = Field(..., min_items=1, max_items=100)
+
 class Booking(BookingBase):
     id: UUID
     user_id: UUID
     status: str = "pending"
     total_price: Optional[Decimal] = None
+    cancelled_at: Optional[datetime] = None
     created_at: datetime
     updated_at: datetime
 
@@ -183,13 +189,39 @@ class Booking(BookingBase):
 
     def __init__(self, **data):
         try:
-            logger.info(f"Initializing Booking with data: {data}")
             super().__init__(**data)
         except Exception as e:
             logger.error(f"Error initializing Booking: {str(e)}")
             logger.error(f"Data that caused the error: {data}")
             raise
 
+class JetAvailability(BaseModel):
+    jet_id: UUID
+    start_time: datetime
+    end_time: datetime
+    available: bool
+
+class QuoteRequest(BaseModel):
+    jet_ids: List[UUID] = Field(..., min_items=1, max_items=1000)
+    start_time: datetime
+    end_time: datetime
+    passengers: int = Field(1, ge=1)
+
+    @validator('end_time')
+    def end_time_must_be_after_start_time(cls, v, values):
+        if 'start_time' in values and v <= values['start_time']:
+            raise ValueError('end_time must be after start_time')
+        return v
+
+class JetQuote(BaseModel):
+    jet_id: UUID
+    price_per_hour: Decimal
+    hours: Decimal
+    discount_percent: Decimal
+    total_price: Decimal
+    fits_passengers: bool
+    available: bool
+
 class BookingUpdate(BaseModel):
     origin: Optional[str] = None
     destination: Optional[str] = None
@@ -243,10 +275,26 @@ class OwnershipShare(OwnershipShareInDB):
 class Token(BaseModel):
     access_token: str
     token_type: str
+    refresh_token: Optional[str] = None
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
+class LogoutRequest(BaseModel):
+    refresh_token: Optional[str] = None
 
 class TokenData(BaseModel):
     email: Optional[str] = None
 
+class Principal(BaseModel):
+    """The authenticated caller, as verified from a bearer token."""
+    id: UUID
+    email: str
+    role: str
+    # jti and exp of the access token, used to revoke it on logout
+    token_id: Optional[str] = None
+    token_expires_at: Optional[float] = None
+
 class CategoryBase(BaseModel):
     name: str
     description: Optional[str] = None
@@ -337,4 +385,130 @@ class UserMembership(UserMembershipBase):
     created_at: datetime
 
     class Config:
-        from_attributes = True 
\ No newline at end of file
+        from_attributes = True 
+# Diagnostics schemas
+class HistogramBucket(BaseModel):
+    le: Union[float, str]
+    count: int
+
+class LatencyHistogram(BaseModel):
+    count: int
+    sum_seconds: float
+    avg_seconds: float
+    max_seconds: float
+    buckets: List[HistogramBucket]
+
+class PoolStatus(BaseModel):
+    pool_class: str
+    size: int
+    checked_out: int
+    idle: int
+    overflow: int
+    max_overflow: int
+    timeout_seconds: float
+    recycle_seconds: int
+    checkout_timeouts: int
+    wait: Optional[LatencyHistogram] = None
+
+class DatabasePoolMetrics(BaseModel):
+    sync_engine: PoolStatus
+    async_engine: PoolStatus
+
+class PasswordHasherStats(BaseModel):
+    rounds: int
+    workers: int
+    max_pending: int
+    running: int
+    queued: int
+    completed: int
+    rejected: int
+    rehashed: int
+    wait: LatencyHistogram
+    duration: LatencyHistogram
+
+class PrincipalCacheStats(BaseModel):
+    ttl_seconds: float
+    entries: int
+    max_entries: int
+    hits: int
+    misses: int
+    evictions: int
+
+class TokenRevocationStats(BaseModel):
+    revoked: int
+    persistent: bool
+
+class AuthOverhead(BaseModel):
+    cached: LatencyHistogram
+    verified: LatencyHistogram
+
+class AuthMetrics(BaseModel):
+    password_hasher: PasswordHasherStats
+    principal_cache: PrincipalCacheStats
+    revocations: TokenRevocationStats
+    overhead: AuthOverhead
+
+class LogPipelineStats(BaseModel):
+    policy: str
+    queued: int
+    capacity: int
+    dropped: int
+    batches: int
+    records: int
+    encoder: str
+
+class CircuitBreakerStats(BaseModel):
+    state: str
+    consecutive_failures: int
+    opened: int
+    refused: int
+
+class ConciergeClientStats(BaseModel):
+    base_url: str
+    requests: int
+    retried: int
+    failures: int
+    breaker: CircuitBreakerStats
+    latency: LatencyHistogram
+
+class ChatFallbackStats(BaseModel):
+    served: int
+    entries: int
+    max_entries: int
+    hits: int
+    misses: int
+    evictions: int
+
+class ChatResponseCacheStats(BaseModel):
+    bypassed: int
+    catalog_invalidations: int
+    entries: int
+    max_entries: int
+    hits: int
+    misses: int
+    evictions: int
+
+class ChatTierStats(BaseModel):
+    hits: int
+    hit_rate: float
+    latency: LatencyHistogram
+
+class ChatDispatchStats(BaseModel):
+    total: int
+    cache: ChatTierStats
+    local: ChatTierStats
+    llm: ChatTierStats
+
+class ChatSessionStats(BaseModel):
+    active: int
+    inflight: int
+    connections: int
+    replaced: int
+    turns: int
+
+class ChatMetrics(BaseModel):
+    concierge: ConciergeClientStats
+    fallbacks: ChatFallbackStats
+    responses: ChatResponseCacheStats
+    dispatch: ChatDispatchStats
+    sessions: ChatSessionStats
@@ -0,0 +1,334 @@
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from bisect import bisect_left
+from datetime import datetime, timezone
+from uuid import UUID
+import asyncio
+import logging
+import os
+import time
+
+from sqlalchemy import and_, bindparam, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .. import models
+
+logger = logging.getLogger(__name__)
+
+AVAILABILITY_INDEX_TTL = float(os.getenv("AVAILABILITY_INDEX_TTL", "300"))
+# Width of the time buckets that answer "which jets are busy over [a, b)"
+AVAILABILITY_BUCKET_SECONDS = int(os.getenv("AVAILABILITY_BUCKET_SECONDS", "86400"))
+# Bookings and windows spanning more buckets than this skip the buckets, which bounds the work either needs
+AVAILABILITY_MAX_BUCKETS = int(os.getenv("AVAILABILITY_MAX_BUCKETS", "366"))
+
+CANCELLED = "cancelled"
+# Bookings in these states do not hold the jet
+NON_BLOCKING_STATUSES = (CANCELLED,)
+
+# Exclusion constraint added by the add_booking_overlap_exclusion migration where btree_gist is available
+BOOKING_OVERLAP_CONSTRAINT = "bookings_no_overlap"
+BOOKING_CONFLICT_DETAIL = "Jet is already booked for the requested time"
+
+def to_timestamp(value: datetime) -> float:
+    """Epoch seconds for a datetime; naive values are taken as UTC like the database does."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+def blocks(booking: models.Booking) -> bool:
+    return booking.status not in NON_BLOCKING_STATUSES
+
+def live_bookings():
+    """SQL filter for bookings that still hold their jet.
+
+    The statuses are rendered into the SQL rather than bound, so the planner
+    can match the filter to the partial "live" booking indexes, which are
+    built WHERE status <> 'cancelled'.
+    """
+    return models.Booking.status.not_in(bindparam("non_blocking_statuses", NON_BLOCKING_STATUSES, expanding=True, literal_execute=True))
+
+class _JetSchedule:
+    """One jet's bookings as half-open [start, end) intervals sorted by start.
+
+    `max_end[i]` is the latest end among the first i + 1 intervals. Every
+    interval that could overlap [a, b) starts before b, so one bisect finds
+    that prefix, and its max_end says whether any of them runs past a. That
+    answers overlap queries in O(log n) even if legacy rows overlap each other.
+    """
+
+    def __init__(self):
+        self.intervals: List[Tuple[float, float, UUID]] = []
+        self.max_end: List[float] = []
+
+    def __len__(self) -> int:
+        return len(self.intervals)
+
+    def _reindex_from(self, i: int) -> None:
+        del self.max_end[i:]
+        running = self.max_end[-1] if self.max_end else float("-inf")
+        for _, end, _ in self.intervals[i:]:
+            running = max(running, end)
+            self.max_end.append(running)
+
+    def add(self, start: float, end: float, booking_id: UUID, keep_indexed: bool = True) -> None:
+        entry = (start, end, booking_id)
+        if keep_indexed:
+            i = bisect_left(self.intervals, entry)
+            self.intervals.insert(i, entry)
+            self._reindex_from(i)
+        else:
+            self.intervals.append(entry)
+
+    def reindex(self) -> None:
+        self.intervals.sort()
+        self._reindex_from(0)
+
+    def remove(self, start: float, end: float, booking_id: UUID) -> None:
+        entry = (start, end, booking_id)
+        i = bisect_left(self.intervals, entry)
+        if i < len(self.intervals) and self.intervals[i] == entry:
+            del self.intervals[i]
+            self._reindex_from(i)
+
+    def is_free(self, start: float, end: float) -> bool:
+        i = bisect_left(self.intervals, (end,))
+        return i == 0 or self.max_end[i - 1] <= start
+
+async def find_conflict(
+    db: AsyncSession,
+    jet_id: UUID,
+    start_time: datetime,
+    end_time: datetime,
+    exclude_booking_id: Optional[UUID] = None,
+) -> Optional[UUID]:
+    """Return the id of a blocking booking of `jet_id` that overlaps [start_time, end_time), if any.
+
+    Served by the partial index ix_bookings_live_jet_id_start_time_end_time. Callers that go on to
+    write should hold the jet row lock (see lock_jet) so the answer stays true
+    until they commit.
+    """
+    query = select(models.Booking.id).where(
+        models.Booking.jet_id == jet_id,
+        models.Booking.start_time < end_time,
+        models.Booking.end_time > start_time,
+        live_bookings(),
+    )
+    if exclude_booking_id is not None:
+        query = query.where(models.Booking.id != exclude_booking_id)
+    return await db.scalar(query.limit(1))
+
+async def lock_jet(db: AsyncSession, jet_id: UUID) -> bool:
+    """Take the jet's row lock for the rest of the transaction; False if the jet does not exist.
+
+    Booking writes for one jet serialize on this lock, across every worker,
+    so a conflict check followed by an insert cannot interleave with another.
+    """
+    return await db.scalar(select(models.Jet.id).where(models.Jet.id == jet_id).with_for_update()) is not None
+
+async def find_conflicts(db: AsyncSession, windows: Iterable[Tuple[UUID, datetime, datetime]]) -> Optional[UUID]:
+    """Like find_conflict for many (jet_id, start_time, end_time) windows at once, in one query.
+
+    Returns the id of a jet with a blocking booking overlapping any window, if any.
+    """
+    overlaps = [
+        and_(models.Booking.jet_id == jet_id, models.Booking.start_time < end_time, models.Booking.end_time > start_time)
+        for jet_id, start_time, end_time in windows
+    ]
+    if not overlaps:
+        return None
+    return await db.scalar(
+        select(models.Booking.jet_id)
+        .where(or_(*overlaps), live_bookings())
+        .limit(1)
+    )
+
+async def lock_jets(db: AsyncSession, jet_ids: Iterable[UUID]) -> Set[UUID]:
+    """Take the row locks of several jets in one query; returns the ids that exist.
+
+    Rows are locked in id order, so two transactions locking overlapping sets
+    of jets cannot deadlock.
+    """
+    rows = await db.scalars(
+        select(models.Jet.id).where(models.Jet.id.in_(set(jet_ids))).order_by(models.Jet.id).with_for_update()
+    )
+    return set(rows.all())
+
+class AvailabilityEngine:
+    """In-memory mirror of which jets are booked when.
+
+    Answers "is jet X free over [a, b)" with one bisect, and "which jets are
+    free over [a, b)" with one bisect per jet. The database stays the source
+    of truth: create_booking checks for overlaps in SQL while holding the jet
+    row lock. Writes update this mirror after they commit. A periodic rebuild
+    (AVAILABILITY_INDEX_TTL) picks up writes made through other workers.
+
+    Bookings are also filed under every fixed-width time bucket they touch.
+    Finding the busy jets for a window reads only the buckets the window
+    spans, so the cost follows the number of bookings near the window, not
+    the size of the fleet. Bookings longer than AVAILABILITY_MAX_BUCKETS
+    buckets are kept in a short list checked on every query instead, and
+    longer windows are answered from the per-jet schedules.
+
+    Only bookings that end after the last rebuild are loaded, so windows
+    earlier than `horizon` are outside what the mirror can answer.
+    """
+
+    def __init__(self, ttl: float = AVAILABILITY_INDEX_TTL, bucket_seconds: int = AVAILABILITY_BUCKET_SECONDS, max_buckets: int = AVAILABILITY_MAX_BUCKETS):
+        self.ttl = ttl
+        self.bucket_seconds = bucket_seconds
+        self.max_buckets = max_buckets
+        self._lock = asyncio.Lock()
+        self._jet_locks: Dict[UUID, asyncio.Lock] = {}
+        self._loaded_at: Optional[float] = None
+        self.horizon: float = float("inf")
+        self._schedules: Dict[UUID, _JetSchedule] = {}
+        self._bookings: Dict[UUID, Tuple[UUID, float, float]] = {}
+        self._buckets: Dict[int, Set[UUID]] = {}
+        self._long: Set[UUID] = set()
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded_at is not None
+
+    def covers(self, start: datetime) -> bool:
+        return self.loaded and to_timestamp(start) >= self.horizon
+
+    def _bucket_range(self, start: float, end: float) -> range:
+        # Half-open window: a booking ending exactly on a boundary does not touch the next bucket
+        return range(int(start // self.bucket_seconds), int(-(-end // self.bucket_seconds)))
+
+    def _file(self, buckets: Dict[int, Set[UUID]], long_bookings: Set[UUID], booking_id: UUID, start: float, end: float) -> None:
+        bucket_range = self._bucket_range(start, end)
+        if len(bucket_range) > self.max_buckets:
+            long_bookings.add(booking_id)
+            return
+        for bucket in bucket_range:
+            buckets.setdefault(bucket, set()).add(booking_id)
+
+    def jet_lock(self, jet_id: UUID) -> asyncio.Lock:
+        """Serializes booking writes for one jet within this process."""
+        lock = self._jet_locks.get(jet_id)
+        if lock is None:
+            lock = self._jet_locks[jet_id] = asyncio.Lock()
+        return lock
+
+    async def ensure_loaded(self, db: AsyncSession) -> None:
+        if self._loaded_at is not None and time.monotonic() - self._loaded_at < self.ttl:
+            return
+        async with self._lock:
+            if self._loaded_at is not None and time.monotonic() - self._loaded_at < self.ttl:
+                return
+            await self.rebuild(db)
+
+    async def rebuild(self, db: AsyncSession) -> None:
+        started = time.perf_counter()
+        horizon = time.time()
+        rows = (await db.execute(
+            select(models.Booking.id, models.Booking.jet_id, models.Booking.start_time, models.Booking.end_time)
+            .where(
+                models.Booking.end_time > datetime.fromtimestamp(horizon, timezone.utc),
+                live_bookings(),
+            )
+        )).all()
+        schedules: Dict[UUID, _JetSchedule] = {}
+        bookings: Dict[UUID, Tuple[UUID, float, float]] = {}
+        buckets: Dict[int, Set[UUID]] = {}
+        long_bookings: Set[UUID] = set()
+        for booking_id, jet_id, start_time, end_time in rows:
+            start, end = to_timestamp(start_time), to_timestamp(end_time)
+            schedules.setdefault(jet_id, _JetSchedule()).add(start, end, booking_id, keep_indexed=False)
+            bookings[booking_id] = (jet_id, start, end)
+            self._file(buckets, long_bookings, booking_id, start, end)
+        for schedule in schedules.values():
+            schedule.reindex()
+        self._schedules, self._bookings, self._buckets, self._long, self.horizon = schedules, bookings, buckets, long_bookings, horizon
+        self._loaded_at = time.monotonic()
+        logger.info(f"Availability index built with {len(bookings)} bookings in {(time.perf_counter() - started) * 1000:.1f}ms")
+
+    def upsert(self, booking: models.Booking) -> None:
+        """Mirror a committed booking insert or update. A no-op until the index has loaded."""
+        if not self.loaded:
+            return
+        self.remove(booking.id)
+        if not blocks(booking):
+            return
+        start, end = to_timestamp(booking.start_time), to_timestamp(booking.end_time)
+        if end <= self.horizon:
+            return
+        self._schedules.setdefault(booking.jet_id, _JetSchedule()).add(start, end, booking.id)
+        self._bookings[booking.id] = (booking.jet_id, start, end)
+        self._file(self._buckets, self._long, booking.id, start, end)
+
+    def remove(self, booking_id: UUID) -> None:
+        entry = self._bookings.pop(booking_id, None)
+        if entry is None:
+            return
+        jet_id, start, end = entry
+        schedule = self._schedules.get(jet_id)
+        if schedule is not None:
+            schedule.remove(start, end, booking_id)
+            if not schedule:
+                del self._schedules[jet_id]
+        if booking_id in self._long:
+            self._long.discard(booking_id)
+            return
+        for bucket in self._bucket_range(start, end):
+            holders = self._buckets.get(bucket)
+            if holders is not None:
+                holders.discard(booking_id)
+                if not holders:
+                    del self._buckets[bucket]
+
+    def is_free(self, jet_id: UUID, start_time: datetime, end_time: datetime) -> bool:
+        schedule = self._schedules.get(jet_id)
+        return schedule is None or schedule.is_free(to_timestamp(start_time), to_timestamp(end_time))
+
+    def busy_jets(self, start_time: datetime, end_time: datetime) -> Set[UUID]:
+        """Jets with at least one booking overlapping [start_time, end_time)."""
+        start, end = to_timestamp(start_time), to_timestamp(end_time)
+        bucket_range = self._bucket_range(start, end)
+        if len(bucket_range) > self.max_buckets:
+            return {jet_id for jet_id, schedule in self._schedules.items() if not schedule.is_free(start, end)}
+        busy: Set[UUID] = set()
+        seen: Set[UUID] = set()
+        for booking_ids in [self._long, *(self._buckets.get(bucket, ()) for bucket in bucket_range)]:
+            for booking_id in booking_ids:
+                if booking_id in seen:
+                    continue
+                seen.add(booking_id)
+                jet_id, booking_start, booking_end = self._bookings[booking_id]
+                if booking_start < end and booking_end > start:
+                    busy.add(jet_id)
+        return busy
+
+    def free_jets(self, jet_ids: Iterable[UUID], start_time: datetime, end_time: datetime) -> List[UUID]:
+        """The subset of `jet_ids` with no booking overlapping [start_time, end_time)."""
+        start, end = to_timestamp(start_time), to_timestamp(end_time)
+        free = []
+        for jet_id in jet_ids:
+            schedule = self._schedules.get(jet_id)
+            if schedule is None or schedule.is_free(start, end):
+                free.append(jet_id)
+        return free
+
+    def stats(self) -> Dict[str, int]:
+        return {"jets": len(self._schedules), "bookings": len(self._bookings), "buckets": len(self._buckets), "long_bookings": len(self._long)}
+
+availability = AvailabilityEngine()
+
+async def busy_jet_ids(db: AsyncSession, start_time: datetime, end_time: datetime) -> Set[UUID]:
+    """Jets booked at any point in [start_time, end_time).
+
+    Served from the availability index when it covers the window, otherwise
+    by one DISTINCT query over the bookings overlap index.
+    """
+    await availability.ensure_loaded(db)
+    if availability.covers(start_time):
+        return availability.busy_jets(start_time, end_time)
+    rows = await db.scalars(
+        select(models.Booking.jet_id).distinct().where(
+            models.Booking.start_time < end_time,
+            models.Booking.end_time > start_time,
+            live_bookings(),
+        )
+    )
+    return set(rows.all())
@@ -0,0 +1,210 @@
+from typing import Dict, Any, Awaitable, Callable, Optional
+from collections import OrderedDict
+import asyncio
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+CACHE_URL = os.getenv("CACHE_URL")
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "1024"))
+CATALOG_CACHE_TTL = float(os.getenv("CATALOG_CACHE_TTL", "300"))
+
+class TTLCache:
+    """Thread-safe LRU mapping whose entries also expire after a time-to-live."""
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES, default_ttl: float = CATALOG_CACHE_TTL):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = time.monotonic() + (self.default_ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, *keys: str) -> None:
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+class MemoryCacheBackend:
+    """In-process cache backend. Each worker process holds its own copy."""
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES, default_ttl: float = CATALOG_CACHE_TTL):
+        self._cache = TTLCache(max_entries=max_entries, default_ttl=default_ttl)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self._cache.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        self._cache.set(key, value, ttl)
+
+    async def delete(self, *keys: str) -> None:
+        self._cache.delete(*keys)
+
+    async def clear(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": "memory", **self._cache.stats()}
+
+class RedisCacheBackend:
+    """Redis (or any protocol-compatible server) backend, shared across workers.
+
+    Requires the optional `redis` package. Keys are namespaced so the cache
+    can share a database with other data.
+    """
+
+    def __init__(self, url: str, namespace: str = "jetbooking:", default_ttl: float = CATALOG_CACHE_TTL):
+        import redis.asyncio as redis
+
+        self._client = redis.from_url(url)
+        self.namespace = namespace
+        self.default_ttl = default_ttl
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, key: str) -> Optional[bytes]:
+        value = await self._client.get(self.namespace + key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        ttl = self.default_ttl if ttl is None else ttl
+        await self._client.set(self.namespace + key, value, px=int(ttl * 1000))
+
+    async def delete(self, *keys: str) -> None:
+        if keys:
+            await self._client.delete(*(self.namespace + key for key in keys))
+
+    async def clear(self) -> None:
+        async for key in self._client.scan_iter(match=self.namespace + "*"):
+            await self._client.delete(key)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": "redis", "hits": self.hits, "misses": self.misses}
+
+def build_cache_backend(url: Optional[str] = CACHE_URL):
+    """Return a Redis backend when CACHE_URL is set, otherwise an in-memory one."""
+    if url:
+        try:
+            backend = RedisCacheBackend(url)
+            logger.info("Using Redis cache backend")
+            return backend
+        except ImportError:
+            logger.warning("CACHE_URL is set but the redis package is not installed; using in-memory cache")
+    return MemoryCacheBackend()
+
+class CatalogCache:
+    """Read-through cache of serialized jet catalog responses.
+
+    Values are the final JSON bytes of a response, so a hit skips the
+    database, the ORM and Pydantic entirely. Concurrent misses for the same
+    key share one load. Admin jet writes call the invalidate_* methods after
+    they commit. Jet categories are only written by the seed script, so the
+    cached category list simply expires with the TTL.
+    """
+
+    JETS_KEY = "catalog:jets"
+    CATEGORIES_KEY = "catalog:categories"
+
+    def __init__(self, backend=None, ttl: float = CATALOG_CACHE_TTL):
+        self.backend = backend or build_cache_backend()
+        self.ttl = ttl
+        self._inflight: Dict[str, asyncio.Future] = {}
+        # Bumped on every invalidation so a load that raced a write is not stored
+        self._generation = 0
+
+    @staticmethod
+    def jet_key(jet_id) -> str:
+        return f"catalog:jet:{jet_id}"
+
+    async def get_or_load(self, key: str, loader: Callable[[], Awaitable[Optional[bytes]]]) -> Optional[bytes]:
+        """Return the cached bytes for `key`, calling `loader` on a miss.
+
+        A loader result of None (e.g. a missing jet) is returned but not cached.
+        """
+        value = await self.backend.get(key)
+        if value is not None:
+            return value
+        pending = self._inflight.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        generation = self._generation
+        try:
+            value = await loader()
+            if value is not None and generation == self._generation:
+                await self.backend.set(key, value, self.ttl)
+            future.set_result(value)
+            return value
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            # Mark as retrieved so an unawaited future does not log a warning
+            future.exception()
+            raise
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    async def _invalidate(self, *keys: str) -> None:
+        self._generation += 1
+        for key in keys:
+            self._inflight.pop(key, None)
+        await self.backend.delete(*keys)
+
+    async def invalidate_jet(self, jet_id) -> None:
+        await self._invalidate(self.jet_key(jet_id), self.JETS_KEY)
+
+    async def invalidate_jet_list(self) -> None:
+        await self._invalidate(self.JETS_KEY)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"ttl_seconds": self.ttl, **self.backend.stats()}
+
+catalog_cache = CatalogCache()
@@ -1,55 +1,247 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, AsyncIterator, Awaitable, Callable, List, Optional, Tuple
+from datetime import datetime, timezone
+from uuid import UUID
 import httpx
 import logging
 import json
+import os
+import re
+import time
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from .. import models
+from ..database import AsyncSessionLocal
+from ..utils.metrics import LatencyHistogram
+from .availability import live_bookings
+from .cache import TTLCache
+from .concierge_client import CircuitOpen, ConciergeClient, concierge_client
+from .nlp_service import IntentType, NLPService, nlp_service
 
 logger = logging.getLogger(__name__)
 
+# How long the last good answer to a message is kept to answer it while the MCP server is down
+MCP_FALLBACK_TTL = float(os.getenv("MCP_FALLBACK_TTL", "3600"))
+MCP_FALLBACK_MAX_ENTRIES = int(os.getenv("MCP_FALLBACK_MAX_ENTRIES", "1024"))
+# How long an answer is reused for the same question before asking the MCP server again
+CHAT_CACHE_TTL = float(os.getenv("CHAT_CACHE_TTL", "300"))
+CHAT_CACHE_MAX_ENTRIES = int(os.getenv("CHAT_CACHE_MAX_ENTRIES", "4096"))
+
+# Booking requests change or read per-user state, so their answers are never reused
+CACHEABLE_INTENTS = frozenset({IntentType.GREETING, IntentType.GET_JET_INFO, IntentType.UNKNOWN})
+# Answers that may describe jets; dropped when the jet catalog changes
+CATALOG_INTENTS = frozenset({IntentType.GET_JET_INFO, IntentType.UNKNOWN})
+
+# Intents answered from the database without the MCP server when classified at least this confidently
+CHAT_LOCAL_MIN_CONFIDENCE = float(os.getenv("CHAT_LOCAL_MIN_CONFIDENCE", "0.75"))
+# Jets or bookings listed in a local answer
+CHAT_LOCAL_MAX_ITEMS = int(os.getenv("CHAT_LOCAL_MAX_ITEMS", "10"))
+
+# Dispatch tiers, cheapest first
+CACHE_TIER = "cache"
+LOCAL_TIER = "local"
+LLM_TIER = "llm"
+TIERS = (CACHE_TIER, LOCAL_TIER, LLM_TIER)
+
+_WORD = re.compile(r"[\w']+")
+# Words that may surround a locally answerable phrase without changing what is asked
+_FILLER_WORDS = frozenset(
+    "a all an any are can could do for hello hey hi i just me my now ok okay our please right "
+    "so thank thanks the there to us we what will would you".split()
+)
+
+def normalize_message(message: str) -> str:
+    return " ".join(message.lower().split())
+
 class ChatService:
-    def __init__(self, mcp_url: str = "http://localhost:3010"):
-        self.mcp_url = mcp_url
-        self.client = httpx.AsyncClient()
+    """Answers chat messages from the cheapest tier that can.
+
+    1. cache: a recent answer to the same question (see _cache_key).
+    2. local: greetings, available jets and the user's bookings, answered
+       from the database when NLPService recognizes the request confidently
+       and the message asks nothing beyond it.
+    3. llm: everything else goes to the MCP server's AI Concierge.
+
+    stats() reports how many messages each tier answered and how long it took.
+    """
+
+    def __init__(
+        self,
+        client: ConciergeClient = concierge_client,
+        nlp: NLPService = nlp_service,
+        session_factory: async_sessionmaker = AsyncSessionLocal,
+    ):
+        self.client = client
+        self.nlp = nlp
+        self.session_factory = session_factory
+        self._local_handlers: Dict[IntentType, Callable[[str], Awaitable[Dict[str, Any]]]] = {
+            IntentType.GREETING: self._handle_greeting,
+            IntentType.GET_JET_INFO: self._handle_get_jet_info,
+            IntentType.CHECK_BOOKING: self._handle_check_booking,
+        }
+        self._tier_hits = dict.fromkeys(TIERS, 0)
+        self._tier_latency = {tier: LatencyHistogram() for tier in TIERS}
+        self._fallbacks = TTLCache(max_entries=MCP_FALLBACK_MAX_ENTRIES, default_ttl=MCP_FALLBACK_TTL)
+        self.fallbacks_served = 0
+        self._responses = TTLCache(max_entries=CHAT_CACHE_MAX_ENTRIES, default_ttl=CHAT_CACHE_TTL)
+        self._catalog_generation = 0
+        self.responses_bypassed = 0
+        self.catalog_invalidations = 0
     
     async def close(self):
         await self.client.aclose()
 
+    def _classify(self, message: str) -> Tuple[IntentType, float, List[str]]:
+        """The message's intent, its confidence, and the words outside the phrase that matched it."""
+        text = normalize_message(message)
+        intent, confidence, span = self.nlp.match_intent(text)
+        if span is not None:
+            start, end = span
+            # Take whole words, so "bookings" does not leave a stray "s" behind
+            while end < len(text) and text[end].isalnum():
+                end += 1
+            text = f"{text[:start]} {text[end:]}"
+        return intent, confidence, _WORD.findall(text)
+
+    def _cache_key(self, intent: IntentType, rest: List[str]) -> Optional[str]:
+        """The response cache key for a message, or None if its answer must not be reused.
+
+        Keys combine the intent with the words left once the phrase that
+        matched the intent is taken out, so "list available jets" and "which
+        jets are available" share an answer while "show me jets from Miami"
+        does not. Catalog-dependent keys also carry the catalog generation.
+        """
+        if intent not in CACHEABLE_INTENTS:
+            self.responses_bypassed += 1
+            return None
+        generation = self._catalog_generation if intent in CATALOG_INTENTS else 0
+        return f"{intent.value}:{generation}:{' '.join(rest)}"
+
+    def _cached(self, key: Optional[str]) -> Optional[Dict[str, Any]]:
+        cached = self._responses.get(key) if key is not None else None
+        if cached is None:
+            return None
+        return {**cached, "metadata": {**cached["metadata"], "cached": True}}
+
+    def _remember(self, message: str, key: Optional[str], answer: Dict[str, Any]) -> None:
+        self._fallbacks.set(normalize_message(message), answer)
+        if key is not None:
+            self._responses.set(key, answer)
+
+    def _record(self, tier: str, started: float) -> None:
+        self._tier_hits[tier] += 1
+        self._tier_latency[tier].observe(time.perf_counter() - started)
+
+    async def _answer_locally(self, intent: IntentType, confidence: float, rest: List[str], user_id: str) -> Optional[Dict[str, Any]]:
+        """Answer from the database, or None if the message needs the MCP server."""
+        handler = self._local_handlers.get(intent)
+        if handler is None or confidence < CHAT_LOCAL_MIN_CONFIDENCE or not _FILLER_WORDS.issuperset(rest):
+            return None
+        try:
+            response = await handler(user_id)
+        except Exception as e:
+            logger.warning(f"Could not answer {intent.value} locally, asking the MCP server: {str(e)}")
+            return None
+        return {
+            "status": "success",
+            "response": response,
+            "metadata": {"intent": intent.value, "confidence": confidence, "entities": {}, "local": True}
+        }
+
+    async def _answer_fast(self, message: str, user_id: str, started: float) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+        """Try the cache and local tiers. Returns the cache key and their answer, or None for the LLM tier."""
+        intent, confidence, rest = self._classify(message)
+        key = self._cache_key(intent, rest)
+        answer = self._cached(key)
+        if answer is not None:
+            self._record(CACHE_TIER, started)
+            return key, answer
+        answer = await self._answer_locally(intent, confidence, rest, user_id)
+        if answer is not None:
+            if key is not None:
+                self._responses.set(key, answer)
+            self._record(LOCAL_TIER, started)
+        return key, answer
+
+    def invalidate_catalog(self) -> None:
+        """Stop reusing answers that may describe jets. Admin jet writes call this."""
+        # Old keys become unreachable and age out of the LRU
+        self._catalog_generation += 1
+        self.catalog_invalidations += 1
+
+    def _fallback(self, message: str, error: Exception) -> Dict[str, Any]:
+        """The last good answer to this message, or an error when there is none."""
+        cached = self._fallbacks.get(normalize_message(message))
+        if cached is not None:
+            self.fallbacks_served += 1
+            return {**cached, "metadata": {**cached["metadata"], "fallback": True}}
+        return {
+            "status": "error",
+            "message": "The AI service is currently unavailable. Please try again later.",
+            "error": str(error)
+        }
+
+    @staticmethod
+    def _format(result: Dict[str, Any]) -> Dict[str, Any]:
+        """Turn an MCP concierge result into our response format."""
+        if not result.get("success", False):
+            raise Exception(result.get("error", "Unknown error from MCP server"))
+        return {
+            "status": "success",
+            "response": {
+                "text": result.get("message", "I don't have a response for that."),
+                "data": result.get("data", {})
+            },
+            "metadata": {
+                "intent": result.get("intent", "unknown"),
+                "confidence": result.get("confidence", 1.0),
+                "entities": result.get("entities", {})
+            }
+        }
+
+    @staticmethod
+    def _answer_events(answer: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """A complete answer as stream events."""
+        if answer["status"] != "success":
+            return [{"type": "error", "message": answer["message"], "error": answer.get("error")}]
+        events = [{"type": "token", "text": answer["response"]["text"]}]
+        if answer["response"]["data"]:
+            events.append({"type": "data", "data": answer["response"]["data"]})
+        events.append({"type": "done", "metadata": answer["metadata"]})
+        return events
+
     async def process_message(self, message: str, user_id: str) -> Dict[str, Any]:
-        """Process a user message using the MCP server's AI Concierge."""
+        """Process a user message using the MCP server's AI Concierge.
+
+        Cached and local answers are returned without calling the MCP
+        server. Otherwise the call goes through the shared concierge client,
+        which retries transient failures. While its circuit breaker is open,
+        or when the call fails, the last good answer to the same message is
+        returned if one is cached.
+        """
+        started = time.perf_counter()
+        key, answer = await self._answer_fast(message, user_id, started)
+        if answer is not None:
+            return answer
+        try:
+            return await self._ask_concierge(message, key)
+        finally:
+            self._record(LLM_TIER, started)
+
+    async def _ask_concierge(self, message: str, key: Optional[str]) -> Dict[str, Any]:
         try:
             # Call the MCP server's AI Concierge endpoint
-            response = await self.client.post(
-                f"{self.mcp_url}/ai/concierge",
-                json={"message": message},
-                timeout=30.0
-            )
+            response = await self.client.post("/ai/concierge", {"message": message})
+            answer = self._format(response.json())
+            self._remember(message, key, answer)
+            return answer
             
-            response.raise_for_status()
-            result = response.json()
-            
-            if not result.get("success", False):
-                raise Exception(result.get("error", "Unknown error from MCP server"))
-            
-            # Format the response to match our expected format
-            return {
-                "status": "success",
-                "response": {
-                    "text": result.get("message", "I don't have a response for that."),
-                    "data": result.get("data", {})
-                },
-                "metadata": {
-                    "intent": result.get("intent", "unknown"),
-                    "confidence": result.get("confidence", 1.0),
-                    "entities": result.get("entities", {})
-                }
-            }
-            
-        except httpx.HTTPStatusError as e:
+        except CircuitOpen as e:
+            return self._fallback(message, e)
+        except httpx.HTTPError as e:
             logger.error(f"HTTP error from MCP server: {str(e)}")
-            return {
-                "status": "error",
-                "message": "The AI service is currently unavailable. Please try again later.",
-                "error": str(e)
-            }
+            return self._fallback(message, e)
         except Exception as e:
             logger.error(f"Error processing message with MCP: {str(e)}")
             return {
@@ -57,102 +249,202 @@ class ChatService:
                 "message": "Sorry, I encountered an error processing your request.",
                 "error": str(e)
             }
-    
-    async def _handle_greeting(self, nlp_result: Dict[str, Any], user_id: str) -> Dict[str, Any]:
+
+    async def stream_message(self, message: str, user_id: str) -> AsyncIterator[Dict[str, Any]]:
+        """Process a user message, yielding the answer as it is generated.
+
+        Yields events of these types:
+            token: {"type": "token", "text": ...}, the next piece of the answer text
+            data: {"type": "data", "data": ...}, structured results such as jets or bookings
+            done: {"type": "done", "metadata": ...}, the last event of a successful answer
+            error: {"type": "error", "message": ..., "error": ...}, the last event of a failed answer
+
+        The MCP server's events are relayed as they arrive. A server that
+        replies with one JSON result produces a single token event. Cached
+        and local answers, and failures before the first event, are handled
+        like process_message does.
+        """
+        started = time.perf_counter()
+        key, answer = await self._answer_fast(message, user_id, started)
+        if answer is not None:
+            for answer_event in self._answer_events(answer):
+                yield answer_event
+            return
+        try:
+            async for event in self._stream_concierge(message, key):
+                yield event
+        finally:
+            self._record(LLM_TIER, started)
+
+    async def _stream_concierge(self, message: str, key: Optional[str]) -> AsyncIterator[Dict[str, Any]]:
+        text, data, relayed = [], {}, False
+        try:
+            async for event in self.client.stream("/ai/concierge", {"message": message, "stream": True}):
+                kind = event.get("type")
+                if kind is None:
+                    # Not a stream event: the server answered all at once
+                    answer = self._format(event)
+                    self._remember(message, key, answer)
+                    for answer_event in self._answer_events(answer):
+                        yield answer_event
+                    return
+                relayed = True
+                if kind == "token":
+                    text.append(event.get("text", ""))
+                    yield {"type": "token", "text": event.get("text", "")}
+                elif kind == "data":
+                    data = event.get("data", {})
+                    yield {"type": "data", "data": data}
+                elif kind == "done":
+                    metadata = {
+                        "intent": event.get("intent", "unknown"),
+                        "confidence": event.get("confidence", 1.0),
+                        "entities": event.get("entities", {})
+                    }
+                    self._remember(message, key, {
+                        "status": "success",
+                        "response": {"text": "".join(text), "data": data},
+                        "metadata": metadata
+                    })
+                    yield {"type": "done", "metadata": metadata}
+                    return
+                elif kind == "error":
+                    yield {
+                        "type": "error",
+                        "message": "Sorry, I encountered an error processing your request.",
+                        "error": event.get("error")
+                    }
+                    return
+        except (CircuitOpen, httpx.HTTPError) as e:
+            if not isinstance(e, CircuitOpen):
+                logger.error(f"HTTP error from MCP server: {str(e)}")
+            if not relayed:
+                for answer_event in self._answer_events(self._fallback(message, e)):
+                    yield answer_event
+                return
+            yield {"type": "error", "message": "The AI service stopped responding.", "error": str(e)}
+        except Exception as e:
+            logger.error(f"Error streaming message with MCP: {str(e)}")
+            yield {"type": "error", "message": "Sorry, I encountered an error processing your request.", "error": str(e)}
+
+    def stats(self) -> Dict[str, Any]:
         return {
-            "text": "Hello! I'm your jet booking assistant. How can I help you today?"
+            "concierge": self.client.stats(),
+            "fallbacks": {"served": self.fallbacks_served, **self._fallbacks.stats()},
+            "responses": {
+                "bypassed": self.responses_bypassed,
+                "catalog_invalidations": self.catalog_invalidations,
+                **self._responses.stats(),
+            },
+            "dispatch": self._dispatch_stats(),
+        }
+
+    def _dispatch_stats(self) -> Dict[str, Any]:
+        total = sum(self._tier_hits.values())
+        return {
+            "total": total,
+            **{
+                tier: {
+                    "hits": self._tier_hits[tier],
+                    "hit_rate": round(self._tier_hits[tier] / total, 4) if total else 0.0,
+                    "latency": self._tier_latency[tier].snapshot(),
+                }
+                for tier in TIERS
+            },
         }
     
-    async def _handle_book_jet(self, nlp_result: Dict[str, Any], user_id: str) -> Dict[str, Any]:
-        entities = nlp_result["entities"]
-        
-        # Prepare parameters for MCP
-        params = {
-            "user_id": user_id,
-            "departure_city": entities.get("locations", [""])[0] if entities.get("locations") else None,
-            "travel_date": entities.get("dates", [""])[0] if entities.get("dates") else None,
-            "passenger_count": entities.get("passenger_count", 1)
+    async def _handle_greeting(self, user_id: str) -> Dict[str, Any]:
+        return {
+            "text": "Hello! I'm your jet booking assistant. How can I help you today?",
+            "data": {}
         }
-        
-        # Call MCP to book the jet
-        result = await mcp_client.execute_action(MCPActionType.BOOK_JET, params)
-        
-        if result.get("status") == "success":
-            return {
-                "text": f"✅ Your jet has been successfully booked! {result.get('data', {}).get('message', '')}",
-                "data": result.get("data", {})
-            }
-        else:
-            return {
-                "text": "❌ Sorry, I couldn't complete your booking. Please try again later.",
-                "error": result.get("message", "Unknown error")
-            }
     
-    async def _handle_check_booking(self, nlp_result: Dict[str, Any], user_id: str) -> Dict[str, Any]:
-        # Call MCP to get bookings
-        result = await mcp_client.execute_action(MCPActionType.GET_BOOKINGS, {"user_id": user_id})
-        
-        if result.get("status") == "success" and result.get("data"):
-            bookings = result["data"]
-            response_text = "Here are your bookings:\n\n"
-            
-            for i, booking in enumerate(bookings, 1):
-                response_text += (
-                    f"{i}. Booking #{booking.get('booking_id', 'N/A')}\n"
-                    f"   From: {booking.get('departure', 'N/A')}\n"
-                    f"   To: {booking.get('destination', 'N/A')}\n"
-                    f"   Date: {booking.get('date', 'N/A')}\n"
-                    f"   Status: {booking.get('status', 'N/A')}\n\n"
+    async def _handle_check_booking(self, user_id: str) -> Dict[str, Any]:
+        """The user's upcoming bookings that are not cancelled, soonest first."""
+        async with self.session_factory() as db:
+            bookings = (await db.scalars(
+                select(models.Booking)
+                .where(
+                    models.Booking.user_id == UUID(user_id),
+                    models.Booking.end_time >= datetime.now(timezone.utc),
+                    live_bookings(),
                 )
-            
-            return {
-                "text": response_text,
-                "data": bookings
-            }
-        else:
+                .order_by(models.Booking.start_time)
+                .limit(CHAT_LOCAL_MAX_ITEMS)
+            )).all()
+        
+        if not bookings:
             return {
-                "text": "You don't have any bookings yet.",
-                "data": []
+                "text": "You don't have any upcoming bookings.",
+                "data": {"bookings": []}
             }
-    
-    async def _handle_cancel_booking(self, nlp_result: Dict[str, Any], user_id: str) -> Dict[str, Any]:
-        # In a real implementation, you'd extract the booking ID from the message
-        # For now, we'll just return a message
+        
+        response_text = "Here are your upcoming bookings:\n\n"
+        for i, booking in enumerate(bookings, 1):
+            response_text += (
+                f"{i}. Booking #{booking.id}\n"
+                f"   From: {booking.origin}\n"
+                f"   To: {booking.destination}\n"
+                f"   Date: {booking.start_time:%Y-%m-%d %H:%M %Z}\n"
+                f"   Status: {booking.status}\n\n"
+            )
+        
         return {
-            "text": "To cancel a booking, please provide your booking ID.",
-            "needs_more_info": True,
-            "required_field": "booking_id"
+            "text": response_text,
+            "data": {"bookings": [
+                {
+                    "id": str(booking.id),
+                    "jet_id": str(booking.jet_id),
+                    "origin": booking.origin,
+                    "destination": booking.destination,
+                    "start_time": booking.start_time.isoformat(),
+                    "end_time": booking.end_time.isoformat(),
+                    "status": booking.status,
+                    "passengers": booking.passengers,
+                }
+                for booking in bookings
+            ]}
         }
     
-    async def _handle_get_jet_info(self, nlp_result: Dict[str, Any], user_id: str) -> Dict[str, Any]:
-        # Call MCP to get jet availability
-        result = await mcp_client.execute_action(MCPActionType.GET_JET_AVAILABILITY, {})
+    async def _handle_get_jet_info(self, user_id: str) -> Dict[str, Any]:
+        """Jets currently offered for charter."""
+        async with self.session_factory() as db:
+            jets = (await db.scalars(
+                select(models.Jet)
+                .where(models.Jet.status == "available")
+                .order_by(models.Jet.created_at, models.Jet.id)
+                .limit(CHAT_LOCAL_MAX_ITEMS)
+            )).all()
         
-        if result.get("status") == "success" and result.get("data"):
-            jets = result["data"]
-            response_text = "Here are the available jets:\n\n"
-            
-            for i, jet in enumerate(jets, 1):
-                response_text += (
-                    f"{i}. {jet.get('model', 'N/A')}\n"
-                    f"   Capacity: {jet.get('capacity', 'N/A')} passengers\n"
-                    f"   Range: {jet.get('range_miles', 'N/A')} miles\n"
-                    f"   Status: {'✅ Available' if jet.get('available') else '❌ Not Available'}\n\n"
-                )
-            
-            return {
-                "text": response_text,
-                "data": jets
-            }
-        else:
+        if not jets:
             return {
-                "text": "❌ Sorry, I couldn't retrieve jet information. Please try again later.",
-                "error": result.get("message", "Unknown error")
+                "text": "There are no jets available right now.",
+                "data": {"jets": []}
             }
-    
-    async def _handle_unknown(self, nlp_result: Dict[str, Any], user_id: str) -> Dict[str, Any]:
+        
+        response_text = "Here are the available jets:\n\n"
+        for i, jet in enumerate(jets, 1):
+            response_text += (
+                f"{i}. {jet.name}\n"
+                f"   Capacity: {jet.max_passengers or 'N/A'} passengers\n"
+                f"   Range: {jet.range_nm} nm\n"
+                f"   Price: {'$' + format(jet.price_per_hour, ',.2f') + '/hour' if jet.price_per_hour is not None else 'on request'}\n\n"
+            )
+        
         return {
-            "text": "I'm not sure I understand. I can help you with booking a jet, checking your bookings, or providing information about available jets."
+            "text": response_text,
+            "data": {"jets": [
+                {
+                    "id": str(jet.id),
+                    "name": jet.name,
+                    "manufacturer": jet.manufacturer,
+                    "max_passengers": jet.max_passengers,
+                    "range_nm": jet.range_nm,
+                    "price_per_hour": float(jet.price_per_hour) if jet.price_per_hour is not None else None,
+                    "location": jet.location,
+                }
+                for jet in jets
+            ]}
         }
 
 # Singleton instance
@@ -0,0 +1,154 @@
+from typing import Dict, Any, Optional
+import asyncio
+import json
+import logging
+import os
+
+from fastapi import WebSocket, WebSocketDisconnect
+
+from .chat_service import ChatService, chat_service
+
+logger = logging.getLogger(__name__)
+
+# Chat turns one connection may have in progress at once; further turns wait
+CHAT_WS_MAX_INFLIGHT = int(os.getenv("CHAT_WS_MAX_INFLIGHT", "8"))
+
+# Close code sent to a connection that another connection for the same session replaced
+SESSION_REPLACED = 4000
+
+class ChatSession:
+    """One WebSocket connection carrying any number of chat turns.
+
+    The client sends frames like {"id": "m1", "message": "...", "stream": true}
+    and may send the next one before the first is answered. Every reply frame
+    carries the id of the message it answers. Streamed turns send the events
+    of ChatService.stream_message; other turns send one "response" frame
+    holding the process_message result. {"id": "m1", "type": "cancel"} stops
+    a turn that is still running.
+    """
+
+    def __init__(self, websocket: WebSocket, user_id: str, service: ChatService = chat_service, max_inflight: int = CHAT_WS_MAX_INFLIGHT):
+        self.websocket = websocket
+        self.user_id = user_id
+        self.service = service
+        self.turns = 0
+        self._slots = asyncio.Semaphore(max(1, max_inflight))
+        self._send_lock = asyncio.Lock()
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    @property
+    def inflight(self) -> int:
+        return len(self._tasks)
+
+    async def send(self, frame: Dict[str, Any]) -> None:
+        # Turns finish concurrently; frames must not interleave on the socket
+        async with self._send_lock:
+            await self.websocket.send_json(frame)
+
+    async def run(self) -> None:
+        """Read frames until the client disconnects, answering each turn in its own task."""
+        try:
+            while True:
+                try:
+                    frame = json.loads(await self.websocket.receive_text())
+                except ValueError:
+                    await self.send({"id": None, "type": "error", "message": "Frames must be JSON objects"})
+                    continue
+                if not isinstance(frame, dict):
+                    await self.send({"id": None, "type": "error", "message": "Frames must be JSON objects"})
+                    continue
+                await self._dispatch(frame)
+        except WebSocketDisconnect:
+            pass
+        finally:
+            for task in list(self._tasks.values()):
+                task.cancel()
+
+    async def _dispatch(self, frame: Dict[str, Any]) -> None:
+        message_id = frame.get("id")
+        if not isinstance(message_id, (str, int)) or message_id == "":
+            await self.send({"id": None, "type": "error", "message": "Each frame needs an id"})
+            return
+        message_id = str(message_id)
+        if frame.get("type") == "cancel":
+            task = self._tasks.get(message_id)
+            if task is not None:
+                task.cancel()
+            return
+        message = frame.get("message")
+        if not isinstance(message, str) or not message.strip():
+            await self.send({"id": message_id, "type": "error", "message": "Each frame needs a message"})
+            return
+        if message_id in self._tasks:
+            await self.send({"id": message_id, "type": "error", "message": "A message with this id is still being answered"})
+            return
+        self.turns += 1
+        task = asyncio.create_task(self._answer(message_id, message, bool(frame.get("stream"))))
+        self._tasks[message_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(message_id, None))
+
+    async def _answer(self, message_id: str, message: str, stream: bool) -> None:
+        try:
+            async with self._slots:
+                if stream:
+                    async for event in self.service.stream_message(message, self.user_id):
+                        await self.send({"id": message_id, **event})
+                else:
+                    answer = await self.service.process_message(message, self.user_id)
+                    await self.send({"id": message_id, "type": "response", **answer})
+        except asyncio.CancelledError:
+            pass
+        except (WebSocketDisconnect, RuntimeError):
+            # The socket closed while the answer was being sent
+            pass
+        except Exception as e:
+            logger.error(f"Error answering chat message {message_id}: {str(e)}")
+
+class ChatSessionRegistry:
+    """Keeps one live connection per (user, session).
+
+    A client that reconnects, e.g. after a network change, replaces its
+    previous connection instead of leaving it open next to the new one.
+    """
+
+    def __init__(self):
+        self._sessions: Dict[str, ChatSession] = {}
+        self.connections = 0
+        self.replaced = 0
+        self._closed_turns = 0
+
+    @staticmethod
+    def key(user_id: str, session_id: str) -> str:
+        return f"{user_id}:{session_id}"
+
+    async def serve(self, websocket: WebSocket, user_id: str, session_id: str = "default") -> None:
+        await websocket.accept()
+        key = self.key(user_id, session_id)
+        session = ChatSession(websocket, user_id)
+        previous: Optional[ChatSession] = self._sessions.get(key)
+        self._sessions[key] = session
+        self.connections += 1
+        if previous is not None:
+            self.replaced += 1
+            try:
+                await previous.websocket.close(code=SESSION_REPLACED)
+            except RuntimeError:
+                pass
+        try:
+            await session.run()
+        finally:
+            self._closed_turns += session.turns
+            if self._sessions.get(key) is session:
+                del self._sessions[key]
+
+    def stats(self) -> Dict[str, Any]:
+        sessions = list(self._sessions.values())
+        return {
+            "active": len(sessions),
+            "inflight": sum(session.inflight for session in sessions),
+            "connections": self.connections,
+            "replaced": self.replaced,
+            "turns": self._closed_turns + sum(session.turns for session in sessions),
+        }
+
+chat_sessions = ChatSessionRegistry()
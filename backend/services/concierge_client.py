@@ -0,0 +1,272 @@
+from typing import Dict, Any, AsyncIterator, Optional
+import asyncio
+import json
+import logging
+import os
+import random
+import threading
+import time
+
+import httpx
+
+from ..utils.metrics import LatencyHistogram
+
+logger = logging.getLogger(__name__)
+
+MCP_SERVER_URL = os.getenv("MCP_SERVER_URL", "http://localhost:3010")
+MCP_CONNECT_TIMEOUT = float(os.getenv("MCP_CONNECT_TIMEOUT", "2"))
+MCP_READ_TIMEOUT = float(os.getenv("MCP_READ_TIMEOUT", "10"))
+MCP_RETRIES = int(os.getenv("MCP_RETRIES", "2"))
+MCP_RETRY_BACKOFF = float(os.getenv("MCP_RETRY_BACKOFF", "0.25"))
+MCP_MAX_CONNECTIONS = int(os.getenv("MCP_MAX_CONNECTIONS", "100"))
+MCP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("MCP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+MCP_KEEPALIVE_EXPIRY = float(os.getenv("MCP_KEEPALIVE_EXPIRY", "30"))
+MCP_HTTP2 = os.getenv("MCP_HTTP2", "true").lower() == "true"
+MCP_BREAKER_FAILURES = int(os.getenv("MCP_BREAKER_FAILURES", "5"))
+MCP_BREAKER_RESET = float(os.getenv("MCP_BREAKER_RESET", "30"))
+
+# Gateway errors are usually transient; anything else from the server is final
+RETRYABLE_STATUS_CODES = frozenset({502, 503, 504})
+# Streaming formats understood by ConciergeClient.stream, most preferred first
+STREAM_ACCEPT = "application/x-ndjson, text/event-stream;q=0.9, application/json;q=0.8"
+
+class CircuitOpen(Exception):
+    """Raised instead of calling the MCP server while the circuit breaker is open."""
+
+class CircuitBreaker:
+    """Stops calling a failing dependency for a while, so callers fail fast.
+
+    After `failure_threshold` consecutive failed calls the breaker opens and
+    every call is refused for `reset_timeout` seconds. Then one trial call is
+    let through (half-open). Its success closes the breaker; its failure opens
+    it again for another `reset_timeout`.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = MCP_BREAKER_FAILURES, reset_timeout: float = MCP_BREAKER_RESET):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_running = False
+        self.opened = 0
+        self.refused = 0
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return self.CLOSED
+        if time.monotonic() - self._opened_at < self.reset_timeout:
+            return self.OPEN
+        return self.HALF_OPEN
+
+    def allow(self) -> bool:
+        """Whether a call may go ahead now. A True in the half-open state claims the single trial call."""
+        with self._lock:
+            state = self.state
+            if state == self.CLOSED or (state == self.HALF_OPEN and not self._trial_running):
+                if state == self.HALF_OPEN:
+                    self._trial_running = True
+                return True
+            self.refused += 1
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_running = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._trial_running or (self._opened_at is None and self._failures >= self.failure_threshold):
+                self.opened += 1
+                self._opened_at = time.monotonic()
+                self._trial_running = False
+                logger.warning(f"MCP circuit breaker opened after {self._failures} consecutive failures")
+
+    def release(self) -> None:
+        """Give back a trial call that ended without a verdict, e.g. because the caller went away."""
+        with self._lock:
+            self._trial_running = False
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self._failures,
+                "opened": self.opened,
+                "refused": self.refused,
+            }
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+class ConciergeClient:
+    """The one HTTP client the backend uses to reach the MCP server.
+
+    A single pooled httpx.AsyncClient is shared by every chat request, so
+    connections are kept alive and reused instead of opened per call. HTTP/2
+    is used when MCP_HTTP2 is on and the optional `h2` package is installed.
+
+    Each attempt gets its own connect and read timeout. Transport errors and
+    gateway responses (502/503/504) are retried up to `retries` times, with
+    exponential backoff and full jitter. Calls go through a circuit breaker
+    and raise CircuitOpen while the server is considered unhealthy.
+    """
+
+    def __init__(
+        self,
+        base_url: str = MCP_SERVER_URL,
+        retries: int = MCP_RETRIES,
+        backoff: float = MCP_RETRY_BACKOFF,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.retries = max(0, retries)
+        self.backoff = backoff
+        self.breaker = breaker or CircuitBreaker()
+        self._client: Optional[httpx.AsyncClient] = None
+        self.requests = 0
+        self.retried = 0
+        self.failures = 0
+        self.latency = LatencyHistogram()
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            http2 = MCP_HTTP2 and _http2_available()
+            if MCP_HTTP2 and not http2:
+                logger.info("MCP_HTTP2 is on but the h2 package is not installed; using HTTP/1.1")
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                http2=http2,
+                timeout=httpx.Timeout(MCP_READ_TIMEOUT, connect=MCP_CONNECT_TIMEOUT),
+                limits=httpx.Limits(
+                    max_connections=MCP_MAX_CONNECTIONS,
+                    max_keepalive_connections=MCP_MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=MCP_KEEPALIVE_EXPIRY,
+                ),
+            )
+        return self._client
+
+    def _delay(self, attempt: int) -> float:
+        return random.uniform(0, self.backoff * (2 ** attempt))
+
+    async def post(self, path: str, payload: Dict[str, Any]) -> httpx.Response:
+        """POST JSON to the MCP server and return the successful response.
+
+        Raises:
+            CircuitOpen: If the circuit breaker is refusing calls.
+            httpx.HTTPError: If the last attempt failed or the server returned an error status.
+        """
+        return await self._send(path, payload)
+
+    async def stream(self, path: str, payload: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        """POST JSON to the MCP server and yield its reply as events while they arrive.
+
+        NDJSON and server-sent event replies are relayed one line at a time.
+        A plain JSON reply comes through as a single event. Retries and the
+        circuit breaker cover opening the stream; after that, a failure ends it.
+
+        Raises:
+            CircuitOpen: If the circuit breaker is refusing calls.
+            httpx.HTTPError: If the stream could not be opened or broke off.
+        """
+        response = await self._send(path, payload, stream=True, headers={"Accept": STREAM_ACCEPT})
+        try:
+            content_type = response.headers.get("content-type", "")
+            if "ndjson" in content_type or "event-stream" in content_type:
+                sse = "event-stream" in content_type
+                async for line in response.aiter_lines():
+                    if sse:
+                        # Only data fields carry events; comments and event/id/retry fields are skipped
+                        if not line.startswith("data:"):
+                            continue
+                        line = line[5:]
+                    line = line.strip()
+                    if not line:
+                        continue
+                    if line == "[DONE]":
+                        break
+                    yield json.loads(line)
+            else:
+                yield json.loads(await response.aread())
+        except httpx.HTTPError:
+            self.failures += 1
+            self.breaker.record_failure()
+            raise
+        finally:
+            await response.aclose()
+
+    async def _send(self, path: str, payload: Dict[str, Any], stream: bool = False, headers: Optional[Dict[str, str]] = None) -> httpx.Response:
+        if not self.breaker.allow():
+            raise CircuitOpen("The MCP server is unavailable")
+        self.requests += 1
+        started = time.perf_counter()
+        attempt = 0
+        try:
+            while True:
+                response = None
+                try:
+                    request = self.client.build_request("POST", path, json=payload, headers=headers)
+                    response = await self.client.send(request, stream=stream)
+                    response.raise_for_status()
+                    break
+                except (httpx.TransportError, httpx.HTTPStatusError) as e:
+                    if stream and response is not None:
+                        await response.aclose()
+                    retryable = isinstance(e, httpx.TransportError) or e.response.status_code in RETRYABLE_STATUS_CODES
+                    if not retryable or attempt >= self.retries:
+                        raise
+                    delay = self._delay(attempt)
+                    attempt += 1
+                    self.retried += 1
+                    logger.warning(f"MCP call to {path} failed ({e!r}); retry {attempt}/{self.retries} in {delay:.2f}s")
+                    await asyncio.sleep(delay)
+        except httpx.HTTPStatusError as e:
+            # A 4xx means the request was bad, not that the server is unhealthy
+            if e.response.status_code >= 500:
+                self.failures += 1
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()
+            raise
+        except httpx.HTTPError:
+            self.failures += 1
+            self.breaker.record_failure()
+            raise
+        except asyncio.CancelledError:
+            self.breaker.release()
+            raise
+        finally:
+            # For streams this is the time to the response headers
+            self.latency.observe(time.perf_counter() - started)
+        self.breaker.record_success()
+        return response
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "base_url": self.base_url,
+            "requests": self.requests,
+            "retried": self.retried,
+            "failures": self.failures,
+            "breaker": self.breaker.stats(),
+            "latency": self.latency.snapshot(),
+        }
+
+concierge_client = ConciergeClient()
@@ -0,0 +1,290 @@
+from typing import Dict, Any, Iterable, List, Optional, Set, Tuple
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime
+from operator import itemgetter
+from uuid import UUID
+import asyncio
+import heapq
+import logging
+import os
+import time
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .. import models, schemas
+
+logger = logging.getLogger(__name__)
+
+JET_SEARCH_INDEX_TTL = float(os.getenv("JET_SEARCH_INDEX_TTL", "300"))
+
+def _bitmap(slots) -> int:
+    """Build an int bitmap from slot numbers in one pass, without per-bit big-int churn."""
+    slots = list(slots)
+    if not slots:
+        return 0
+    buffer = bytearray(max(slots) // 8 + 1)
+    for slot in slots:
+        buffer[slot >> 3] |= 1 << (slot & 7)
+    return int.from_bytes(buffer, "little")
+
+def _iter_slots(bitmap: int):
+    """Yield the slot numbers set in a bitmap, lowest first."""
+    data = bitmap.to_bytes((bitmap.bit_length() + 7) // 8, "little")
+    for byte_index, byte in enumerate(data):
+        while byte:
+            low = byte & -byte
+            yield (byte_index << 3) + low.bit_length() - 1
+            byte ^= low
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+class _SubstringIndex:
+    """Case-insensitive substring lookup from a field value to jet slots.
+
+    Distinct values map to slot bitmaps, and trigrams map to the values that
+    contain them, so a query touches only candidate values and never scans
+    jets. Candidates are checked against the real value, so matches are exact.
+    """
+
+    def __init__(self):
+        self.values: Dict[str, int] = {}
+        self.trigrams: Dict[str, Set[str]] = {}
+
+    def add(self, value: Optional[str], slot: int) -> None:
+        if not value:
+            return
+        value = value.lower()
+        if value not in self.values:
+            self.values[value] = 0
+            for gram in _trigrams(value):
+                self.trigrams.setdefault(gram, set()).add(value)
+        self.values[value] |= 1 << slot
+
+    def discard(self, value: Optional[str], slot: int) -> None:
+        if not value:
+            return
+        value = value.lower()
+        bitmap = self.values.get(value, 0) & ~(1 << slot)
+        if bitmap:
+            self.values[value] = bitmap
+            return
+        self.values.pop(value, None)
+        for gram in _trigrams(value):
+            holders = self.trigrams.get(gram)
+            if holders is not None:
+                holders.discard(value)
+                if not holders:
+                    del self.trigrams[gram]
+
+    def match(self, needle: str) -> int:
+        needle = needle.lower()
+        grams = _trigrams(needle)
+        if grams:
+            candidates = None
+            for gram in sorted(grams, key=lambda g: len(self.trigrams.get(g, ()))):
+                holders = self.trigrams.get(gram)
+                if not holders:
+                    return 0
+                candidates = set(holders) if candidates is None else candidates & holders
+                if not candidates:
+                    return 0
+        else:
+            # Needles shorter than a trigram check every distinct value
+            candidates = self.values.keys()
+        bitmap = 0
+        for value in candidates:
+            if needle in value:
+                bitmap |= self.values[value]
+        return bitmap
+
+class _RangeIndex:
+    """Sorted (value, slot) pairs answering value >= / <= bounds with bisect."""
+
+    def __init__(self):
+        self.entries: List[Tuple[float, int]] = []
+
+    def add(self, value, slot: int, keep_sorted: bool = True) -> None:
+        if value is None:
+            return
+        if keep_sorted:
+            insort(self.entries, (float(value), slot))
+        else:
+            self.entries.append((float(value), slot))
+
+    def sort(self) -> None:
+        self.entries.sort()
+
+    def discard(self, value, slot: int) -> None:
+        if value is None:
+            return
+        i = bisect_left(self.entries, (float(value), slot))
+        if i < len(self.entries) and self.entries[i] == (float(value), slot):
+            del self.entries[i]
+
+    def between(self, low: Optional[float], high: Optional[float]) -> int:
+        start = bisect_left(self.entries, (low, -1)) if low is not None else 0
+        end = bisect_right(self.entries, (high, float("inf"))) if high is not None else len(self.entries)
+        return _bitmap(slot for _, slot in self.entries[start:end])
+
+class JetSearchIndex:
+    """In-memory search index over available jets, backing /jets/search.
+
+    Every available jet occupies a slot number. Each filter resolves to a
+    bitmap of slots, and the filters combine with bitwise AND, so a search
+    never touches the database. Slot payloads are pre-serialized JSON, so
+    building a response is one join.
+
+    The index loads lazily on first use. Admin jet writes call refresh_jet or remove
+    after they commit. A periodic rebuild (JET_SEARCH_INDEX_TTL) picks up
+    writes made through other worker processes.
+    """
+
+    def __init__(self, ttl: float = JET_SEARCH_INDEX_TTL):
+        self.ttl = ttl
+        self._lock = asyncio.Lock()
+        self._loaded_at: Optional[float] = None
+        self._reset()
+
+    def _reset(self) -> None:
+        self._slot_of: Dict[UUID, int] = {}
+        self._docs: List[Optional[Dict[str, Any]]] = []
+        self._free: List[int] = []
+        self._live = 0
+        self._category_names: Dict[UUID, str] = {}
+        self._price = _RangeIndex()
+        self._passengers = _RangeIndex()
+        self._range = _RangeIndex()
+        self._location = _SubstringIndex()
+        self._category = _SubstringIndex()
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded_at is not None
+
+    @property
+    def size(self) -> int:
+        return len(self._slot_of)
+
+    async def ensure_loaded(self, db: AsyncSession) -> None:
+        if self._loaded_at is not None and time.monotonic() - self._loaded_at < self.ttl:
+            return
+        async with self._lock:
+            if self._loaded_at is not None and time.monotonic() - self._loaded_at < self.ttl:
+                return
+            await self.rebuild(db)
+
+    async def rebuild(self, db: AsyncSession) -> None:
+        """Reload every available jet from the database."""
+        started = time.perf_counter()
+        categories = (await db.execute(select(models.JetCategory.id, models.JetCategory.name))).all()
+        jets = (await db.scalars(select(models.Jet).where(models.Jet.status == "available"))).all()
+        self._reset()
+        self._category_names = {category_id: name for category_id, name in categories}
+        for jet in jets:
+            self._upsert(schemas.Jet.model_validate(jet), keep_sorted=False)
+        # Sort once instead of paying for an insort per jet
+        for index in (self._price, self._passengers, self._range):
+            index.sort()
+        self._loaded_at = time.monotonic()
+        logger.info(f"Jet search index built with {self.size} jets in {(time.perf_counter() - started) * 1000:.1f}ms")
+
+    async def refresh_jet(self, db: AsyncSession, jet_id: UUID) -> None:
+        """Re-read one jet after a write. A no-op until the index has loaded."""
+        if not self.loaded:
+            return
+        jet = await db.scalar(select(models.Jet).where(models.Jet.id == jet_id))
+        if jet is None:
+            self.remove(jet_id)
+            return
+        if jet.category_id is not None and jet.category_id not in self._category_names:
+            name = await db.scalar(select(models.JetCategory.name).where(models.JetCategory.id == jet.category_id))
+            if name is not None:
+                self._category_names[jet.category_id] = name
+        self._upsert(schemas.Jet.model_validate(jet))
+
+    def remove(self, jet_id: UUID) -> None:
+        slot = self._slot_of.pop(jet_id, None)
+        if slot is None:
+            return
+        doc = self._docs[slot]
+        self._price.discard(doc["price_per_hour"], slot)
+        self._passengers.discard(doc["max_passengers"], slot)
+        self._range.discard(doc["range_nm"], slot)
+        self._location.discard(doc["location"], slot)
+        self._category.discard(doc["category"], slot)
+        self._live &= ~(1 << slot)
+        self._docs[slot] = None
+        self._free.append(slot)
+
+    def _upsert(self, jet: schemas.Jet, keep_sorted: bool = True) -> None:
+        self.remove(jet.id)
+        if jet.status != "available":
+            return
+        slot = self._free.pop() if self._free else len(self._docs)
+        if slot == len(self._docs):
+            self._docs.append(None)
+        doc = {
+            "price_per_hour": jet.price_per_hour,
+            "max_passengers": jet.max_passengers,
+            "range_nm": jet.range_nm,
+            "location": jet.location,
+            "category": self._category_names.get(jet.category_id),
+            "key": (jet.created_at, jet.id),
+            "json": jet.model_dump_json().encode(),
+        }
+        self._docs[slot] = doc
+        self._slot_of[jet.id] = slot
+        self._price.add(doc["price_per_hour"], slot, keep_sorted)
+        self._passengers.add(doc["max_passengers"], slot, keep_sorted)
+        self._range.add(doc["range_nm"], slot, keep_sorted)
+        self._location.add(doc["location"], slot)
+        self._category.add(doc["category"], slot)
+        self._live |= 1 << slot
+
+    def search(
+        self,
+        category: Optional[str] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        location: Optional[str] = None,
+        passengers: Optional[int] = None,
+        range_nm: Optional[int] = None,
+        exclude: Optional[Iterable[UUID]] = None,
+        after: Optional[Tuple[datetime, UUID]] = None,
+        limit: Optional[int] = None,
+    ) -> Tuple[List[bytes], Optional[Tuple[datetime, UUID]]]:
+        """Return serialized jets matching every given filter, ordered by (created_at, id).
+
+        Jets whose ids are in `exclude` (e.g. jets booked over a requested
+        window) are removed with one bitmap mask.
+
+        Returns:
+            Tuple[List[bytes], Optional[Tuple[datetime, UUID]]]: One page of jets, and
+            the key to resume after when another page exists.
+        """
+        bitmap = self._live
+        if category:
+            bitmap &= self._category.match(category)
+        if location and bitmap:
+            bitmap &= self._location.match(location)
+        if (min_price is not None or max_price is not None) and bitmap:
+            bitmap &= self._price.between(min_price, max_price)
+        if passengers is not None and bitmap:
+            bitmap &= self._passengers.between(passengers, None)
+        if range_nm is not None and bitmap:
+            bitmap &= self._range.between(range_nm, None)
+        if exclude and bitmap:
+            bitmap &= ~_bitmap(self._slot_of[jet_id] for jet_id in exclude if jet_id in self._slot_of)
+        matches = ((self._docs[slot]["key"], self._docs[slot]["json"]) for slot in _iter_slots(bitmap))
+        if after is not None:
+            matches = (match for match in matches if match[0] > after)
+        if limit is None:
+            return [body for _, body in sorted(matches, key=itemgetter(0))], None
+        # Partial selection keeps a page at O(n log limit) instead of sorting every match
+        page = heapq.nsmallest(limit + 1, matches, key=itemgetter(0))
+        next_key = page[limit - 1][0] if len(page) > limit else None
+        return [body for _, body in page[:limit]], next_key
+
+jet_search_index = JetSearchIndex()
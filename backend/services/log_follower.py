@@ -0,0 +1,154 @@
+from typing import Dict, Any, List, Optional, Set
+import asyncio
+import glob
+import json
+import os
+
+from .log_store import normalize_level
+
+_READ_BLOCK = 64 * 1024
+
+class LogSubscription:
+    """One viewer of the live log stream, with its own filters and buffer."""
+
+    def __init__(self, level: Optional[str] = None, search: Optional[str] = None, max_buffer: int = 1000):
+        self.level = normalize_level(level)
+        self.needle = search.lower() if search else None
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_buffer)
+        self.dropped = 0
+
+    def matches(self, record: Dict[str, Any]) -> bool:
+        if self.level and record.get("level") != self.level:
+            return False
+        if self.needle and self.needle not in str(record.get("message", "")).lower():
+            return False
+        return True
+
+    def offer(self, record: Dict[str, Any]) -> None:
+        # A slow viewer loses records instead of stalling every other viewer
+        try:
+            self.queue.put_nowait(record)
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+class LogFollower:
+    """Follows the active JSON log file and fans new records out to subscribers.
+
+    A single background task tails the file no matter how many viewers are
+    connected. It starts with the first subscriber and stops after the last
+    one leaves. The file is polled by byte offset. Rotation shows up as an
+    inode change (or the file shrinking), and when that happens the remainder
+    of the old file is drained before the follower moves to the new one.
+    """
+
+    def __init__(self, log_dir: str, pattern: str = "app_*.json", poll_interval: float = 0.5):
+        self.log_dir = log_dir
+        self.pattern = pattern
+        self.poll_interval = poll_interval
+        self._subscribers: Set[LogSubscription] = set()
+        self._task: Optional[asyncio.Task] = None
+        # A cancelled task that may still be waiting for its last poll
+        self._stopping: Optional[asyncio.Task] = None
+        self._file = None
+        self._inode = None
+        self._offset = 0
+        self._pending = b""
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self, level: Optional[str] = None, search: Optional[str] = None) -> LogSubscription:
+        subscription = LogSubscription(level=level, search=search)
+        self._subscribers.add(subscription)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(self._stopping))
+            self._stopping = None
+        return subscription
+
+    def unsubscribe(self, subscription: LogSubscription) -> None:
+        self._subscribers.discard(subscription)
+        if not self._subscribers and self._task is not None:
+            self._task.cancel()
+            self._stopping, self._task = self._task, None
+
+    def _active_path(self) -> Optional[str]:
+        paths = glob.glob(os.path.join(self.log_dir, self.pattern))
+        return max(paths) if paths else None
+
+    def _open(self, path: str, at_end: bool) -> None:
+        self._close()
+        self._file = open(path, "rb")
+        self._inode = os.fstat(self._file.fileno()).st_ino
+        self._offset = self._file.seek(0, os.SEEK_END) if at_end else 0
+        self._pending = b""
+
+    def _close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _read_new(self) -> List[bytes]:
+        lines: List[bytes] = []
+        self._file.seek(self._offset)
+        while True:
+            block = self._file.read(_READ_BLOCK)
+            if not block:
+                break
+            self._offset += len(block)
+            parts = (self._pending + block).split(b"\n")
+            self._pending = parts.pop()
+            lines.extend(part for part in parts if part)
+        return lines
+
+    def _poll(self) -> List[bytes]:
+        """Return the complete lines written since the last poll. Runs in a worker thread."""
+        path = self._active_path()
+        if path is None:
+            return []
+        if self._file is None:
+            # Viewers only see records written after they connect
+            self._open(path, at_end=True)
+            return []
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return self._read_new()
+        if stat.st_ino != self._inode:
+            lines = self._read_new()
+            self._open(path, at_end=False)
+            return lines + self._read_new()
+        if stat.st_size < self._offset:
+            # Truncated in place
+            self._open(path, at_end=False)
+        return self._read_new()
+
+    def _publish(self, lines: List[bytes]) -> None:
+        for line in lines:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            for subscription in self._subscribers:
+                if subscription.matches(record):
+                    subscription.offer(record)
+
+    async def _run(self, previous: Optional[asyncio.Task] = None) -> None:
+        if previous is not None:
+            # The file state is shared; let the previous follower finish with it first
+            await asyncio.wait([previous])
+        poll = None
+        try:
+            while self._subscribers:
+                # Cancelling the task cannot stop a poll already running in its thread
+                poll = asyncio.ensure_future(asyncio.to_thread(self._poll))
+                lines = await asyncio.shield(poll)
+                poll = None
+                if lines:
+                    self._publish(lines)
+                await asyncio.sleep(self.poll_interval)
+        finally:
+            if poll is not None:
+                # so wait for it before closing the file it is reading
+                await asyncio.wait([poll])
+            self._close()
@@ -0,0 +1,236 @@
+from typing import Dict, Any, List, Optional, Iterator, Tuple
+from bisect import bisect_left
+from datetime import datetime, timezone
+import glob
+import json
+import os
+import re
+import threading
+
+# Cheap field extraction on raw lines, so indexing never JSON-parses a record.
+# Matches both compact (orjson) and spaced (json.dumps) output.
+_TIMESTAMP_RE = re.compile(rb'"timestamp":\s*"([^"]+)"')
+_LEVEL_RE = re.compile(rb'"level":\s*"([A-Z]+)"')
+
+_LEVEL_ALIASES = {"WARN": "WARNING", "FATAL": "CRITICAL"}
+_LEVEL_BITS = {"DEBUG": 1, "INFO": 2, "WARNING": 4, "ERROR": 8, "CRITICAL": 16}
+_ALL_LEVELS = 0xFF
+
+_READ_BLOCK = 64 * 1024
+
+def normalize_level(level: Optional[str]) -> Optional[str]:
+    """Map a user-supplied level such as "warn" onto the logging level name."""
+    if not level:
+        return None
+    level = level.upper()
+    return _LEVEL_ALIASES.get(level, level)
+
+def _to_utc_iso(value: Optional[datetime]) -> Optional[str]:
+    """Render a query bound in the same naive-UTC ISO format the JSON logs use."""
+    if value is None:
+        return None
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.isoformat()
+
+class FileIndex:
+    """Sparse time index over one JSON log file.
+
+    Holds the byte offset of the first record of every minute, plus a bitmask
+    of the levels seen in that minute. Timestamps are compared as ISO strings,
+    which sort the same way as the times they represent. The index grows as the
+    file grows and follows the file through renames because it is keyed by inode.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.minutes: List[str] = []
+        self.offsets: List[int] = []
+        self.level_masks: List[int] = []
+        self.first_timestamp: Optional[str] = None
+        self.last_timestamp: Optional[str] = None
+        self.indexed_size = 0
+
+    def update(self, size: int) -> None:
+        """Index any complete lines appended since the last update."""
+        if size <= self.indexed_size:
+            return
+        with open(self.path, "rb") as f:
+            f.seek(self.indexed_size)
+            offset = self.indexed_size
+            pending = b""
+            while True:
+                block = f.read(_READ_BLOCK)
+                if not block:
+                    break
+                lines = (pending + block).split(b"\n")
+                pending = lines.pop()
+                for line in lines:
+                    self._index_line(line, offset)
+                    offset += len(line) + 1
+            # A trailing partial line is picked up on the next update
+            self.indexed_size = offset
+
+    def _index_line(self, line: bytes, offset: int) -> None:
+        match = _TIMESTAMP_RE.search(line, 0, 80)
+        if not match:
+            return
+        timestamp = match.group(1).decode()
+        minute = timestamp[:16]
+        level_match = _LEVEL_RE.search(line)
+        level_bit = _LEVEL_BITS.get(level_match.group(1).decode(), _ALL_LEVELS) if level_match else _ALL_LEVELS
+        if not self.minutes or minute > self.minutes[-1]:
+            self.minutes.append(minute)
+            self.offsets.append(offset)
+            self.level_masks.append(level_bit)
+        else:
+            # Records written slightly out of order stay in the current bucket
+            self.level_masks[-1] |= level_bit
+        if self.first_timestamp is None:
+            self.first_timestamp = timestamp
+        self.last_timestamp = timestamp
+
+    def byte_ranges(self, start: Optional[str], end: Optional[str], level_bit: int) -> List[Tuple[int, int]]:
+        """Return the byte ranges whose buckets may hold matching records, oldest first."""
+        ranges: List[Tuple[int, int]] = []
+        start_minute = start[:16] if start else None
+        end_minute = end[:16] if end else None
+        first = bisect_left(self.minutes, start_minute) if start_minute else 0
+        for i in range(first, len(self.minutes)):
+            if end_minute and self.minutes[i] > end_minute:
+                break
+            if not self.level_masks[i] & level_bit:
+                continue
+            begin = self.offsets[i]
+            finish = self.offsets[i + 1] if i + 1 < len(self.offsets) else self.indexed_size
+            if ranges and ranges[-1][1] == begin:
+                ranges[-1] = (ranges[-1][0], finish)
+            else:
+                ranges.append((begin, finish))
+        return ranges
+
+def _iter_lines_reverse(f, start: int, end: int) -> Iterator[bytes]:
+    """Yield the lines between two byte offsets, last line first."""
+    position = end
+    pending = b""
+    while position > start:
+        size = min(_READ_BLOCK, position - start)
+        position -= size
+        f.seek(position)
+        lines = (f.read(size) + pending).split(b"\n")
+        pending = lines.pop(0)
+        for line in reversed(lines):
+            if line:
+                yield line
+    if pending:
+        yield pending
+
+class LogStore:
+    """Newest-first query engine over the rotated JSON logs written by backend/logger.py."""
+
+    def __init__(self, log_dir: str, pattern: str = "app_*.json*"):
+        self.log_dir = log_dir
+        self.pattern = pattern
+        self._indexes: Dict[Tuple[int, int], FileIndex] = {}
+        self._lock = threading.Lock()
+
+    def _files_newest_first(self) -> List[str]:
+        def sort_key(path: str):
+            name = os.path.basename(path)
+            base, _, suffix = name.partition(".json")
+            # app_20250608.json is newer than app_20250608.json.1, which is newer than .json.2
+            backup = int(suffix[1:]) if suffix[1:].isdigit() else 0
+            return (base, -backup)
+        return sorted(glob.glob(os.path.join(self.log_dir, self.pattern)), key=sort_key, reverse=True)
+
+    def refresh(self) -> List[FileIndex]:
+        """Bring the index up to date and return it, newest file first."""
+        with self._lock:
+            live = {}
+            indexes = []
+            for path in self._files_newest_first():
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                key = (stat.st_dev, stat.st_ino)
+                index = self._indexes.get(key)
+                if index is None or stat.st_size < index.indexed_size:
+                    index = FileIndex(path)
+                index.path = path
+                index.update(stat.st_size)
+                live[key] = index
+                indexes.append(index)
+            self._indexes = live
+            return indexes
+
+    def query(
+        self,
+        level: Optional[str] = None,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+        search: Optional[str] = None,
+        limit: int = 100,
+    ) -> List[Dict[str, Any]]:
+        """Return up to `limit` matching records, newest first.
+
+        Args:
+            level (Optional[str]): Only records with this level (e.g. "info", "warn").
+            start_time (Optional[datetime]): Only records at or after this time.
+            end_time (Optional[datetime]): Only records at or before this time.
+            search (Optional[str]): Case-insensitive substring of the message.
+            limit (int): Maximum number of records to return.
+
+        Returns:
+            List[Dict[str, Any]]: The decoded log records.
+        """
+        level = normalize_level(level)
+        level_bit = _LEVEL_BITS.get(level, _ALL_LEVELS) if level else _ALL_LEVELS
+        start = _to_utc_iso(start_time)
+        end = _to_utc_iso(end_time)
+        needle = search.lower() if search else None
+        raw_needle = needle.encode() if needle else None
+
+        results: List[Dict[str, Any]] = []
+        for index in self.refresh():
+            if limit <= len(results):
+                break
+            if index.last_timestamp is None:
+                continue
+            if start and index.last_timestamp < start:
+                continue
+            if end and index.first_timestamp > end:
+                continue
+            try:
+                with open(index.path, "rb") as f:
+                    for begin, finish in reversed(index.byte_ranges(start, end, level_bit)):
+                        for line in _iter_lines_reverse(f, begin, finish):
+                            # Substring prefilter on the raw line before paying for a JSON parse
+                            if raw_needle and raw_needle not in line.lower():
+                                continue
+                            record = self._match(line, level, start, end, needle)
+                            if record is not None:
+                                results.append(record)
+                                if len(results) >= limit:
+                                    return results
+            except FileNotFoundError:
+                # Rotated away between refresh and read
+                continue
+        return results
+
+    @staticmethod
+    def _match(line: bytes, level, start, end, needle) -> Optional[Dict[str, Any]]:
+        try:
+            record = json.loads(line)
+        except ValueError:
+            return None
+        timestamp = record.get("timestamp", "")
+        if level and record.get("level") != level:
+            return None
+        if start and timestamp < start:
+            return None
+        if end and timestamp > end:
+            return None
+        if needle and needle not in str(record.get("message", "")).lower():
+            return None
+        return record
@@ -1,4 +1,4 @@
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, List, Optional, Tuple
 import re
 from enum import Enum
 
@@ -40,6 +40,10 @@ class NLPService:
                 r"how are you"
             ]
         }
+        self._compiled = {
+            intent_type: [re.compile(pattern, re.IGNORECASE) for pattern in patterns]
+            for intent_type, patterns in self.patterns.items()
+        }
 
     def extract_entities(self, text: str) -> Dict[str, Any]:
         """Extract entities from the user's text."""
@@ -67,18 +71,24 @@ class NLPService:
 
     def classify_intent(self, text: str) -> Tuple[IntentType, float]:
         """Classify the intent of the user's text with a confidence score."""
+        intent, confidence, _ = self.match_intent(text)
+        return intent, confidence
+
+    def match_intent(self, text: str) -> Tuple[IntentType, float, Optional[Tuple[int, int]]]:
+        """Like classify_intent, plus the (start, end) span of the lowercased text that matched."""
         text = text.lower()
         
         # Check for exact matches first
-        for intent_type, patterns in self.patterns.items():
+        for intent_type, patterns in self._compiled.items():
             for pattern in patterns:
-                if re.search(pattern, text, re.IGNORECASE):
+                match = pattern.search(text)
+                if match:
                     # Higher confidence for more specific patterns
                     confidence = min(1.0, 0.7 + (0.3 * (1 / (len(patterns) + 1))))
-                    return intent_type, confidence
+                    return intent_type, confidence, match.span()
         
         # Default to unknown intent with low confidence
-        return IntentType.UNKNOWN, 0.3
+        return IntentType.UNKNOWN, 0.3, None
 
     def process_query(self, text: str) -> Dict[str, Any]:
         """Process the user query and return structured data."""
@@ -0,0 +1,148 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Callable, Optional, Tuple
+import asyncio
+import logging
+import os
+import threading
+import time
+
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+
+from ..utils.metrics import LatencyHistogram
+
+logger = logging.getLogger(__name__)
+
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "64"))
+
+def build_crypt_context(rounds: int = BCRYPT_ROUNDS) -> CryptContext:
+    """A bcrypt context that flags hashes made with any other cost as needing an update."""
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__default_rounds=rounds,
+        bcrypt__min_rounds=rounds,
+        bcrypt__max_rounds=rounds,
+    )
+
+class PasswordHasherBusy(HTTPException):
+    """Raised when the hashing queue is full. Surfaces to the client as a 503."""
+
+    def __init__(self, retry_after: int = 1):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Authentication is busy, please retry shortly",
+            headers={"Retry-After": str(retry_after)},
+        )
+
+class PasswordHasher:
+    """Runs bcrypt hashing and verification on a bounded worker pool.
+
+    bcrypt costs hundreds of milliseconds of CPU per call. Running it on the
+    event loop stalls every other request on the worker. The bcrypt package
+    releases the GIL while hashing, so a small thread pool keeps the loop
+    responsive and hashes in parallel on multi-core hosts.
+
+    At most `max_pending` jobs may be queued or running. Beyond that, calls
+    fail fast with PasswordHasherBusy. A login storm then gets 503s with
+    Retry-After instead of a queue whose wait grows without bound.
+    """
+
+    def __init__(
+        self,
+        rounds: int = BCRYPT_ROUNDS,
+        workers: int = PASSWORD_HASH_WORKERS,
+        max_pending: int = PASSWORD_HASH_MAX_PENDING,
+    ):
+        self.rounds = rounds
+        self.workers = max(1, workers)
+        self.max_pending = max(1, max_pending)
+        self.context = build_crypt_context(rounds)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._running = 0
+        self.completed = 0
+        self.rejected = 0
+        self.rehashed = 0
+        self.wait = LatencyHistogram()
+        self.duration = LatencyHistogram()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hasher")
+        return self._executor
+
+    def _timed(self, submitted: float, fn: Callable, *args):
+        started = time.perf_counter()
+        with self._lock:
+            self._running += 1
+        self.wait.observe(started - submitted)
+        try:
+            return fn(*args)
+        finally:
+            self.duration.observe(time.perf_counter() - started)
+            with self._lock:
+                self._running -= 1
+                self._pending -= 1
+                self.completed += 1
+
+    async def _submit(self, fn: Callable, *args):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                raise PasswordHasherBusy()
+            self._pending += 1
+        loop = asyncio.get_running_loop()
+        try:
+            future = loop.run_in_executor(self._get_executor(), self._timed, time.perf_counter(), fn, *args)
+        except BaseException:
+            with self._lock:
+                self._pending -= 1
+            raise
+        return await future
+
+    async def hash(self, password: str) -> str:
+        return await self._submit(self.context.hash, password)
+
+    async def verify(self, password: str, password_hash: str) -> bool:
+        return await self._submit(self.context.verify, password, password_hash)
+
+    async def verify_and_update(self, password: str, password_hash: str) -> Tuple[bool, Optional[str]]:
+        """Verify a password and, when the stored hash uses another cost, rehash it in the same job.
+
+        Returns:
+            Tuple[bool, Optional[str]]: Whether the password matched, and a new hash
+            to store when one is due.
+        """
+        valid, new_hash = await self._submit(self.context.verify_and_update, password, password_hash)
+        if new_hash is not None:
+            with self._lock:
+                self.rehashed += 1
+        return valid, new_hash
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            pending, running = self._pending, self._running
+            completed, rejected, rehashed = self.completed, self.rejected, self.rehashed
+        return {
+            "rounds": self.rounds,
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "running": running,
+            "queued": pending - running,
+            "completed": completed,
+            "rejected": rejected,
+            "rehashed": rehashed,
+            "wait": self.wait.snapshot(),
+            "duration": self.duration.snapshot(),
+        }
+
+password_hasher = PasswordHasher()
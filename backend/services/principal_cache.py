@@ -0,0 +1,87 @@
+from typing import Dict, Any, Optional
+from uuid import UUID
+import hashlib
+import os
+import threading
+import time
+
+from .. import schemas
+from .cache import TTLCache
+
+PRINCIPAL_CACHE_TTL = float(os.getenv("PRINCIPAL_CACHE_TTL", "60"))
+PRINCIPAL_CACHE_MAX_ENTRIES = int(os.getenv("PRINCIPAL_CACHE_MAX_ENTRIES", "10000"))
+
+class PrincipalCache:
+    """Verified principals keyed by a hash of the bearer token.
+
+    A token is checked against the users table once. After that, requests
+    that present the same token get the cached principal without touching the
+    database, until the entry's TTL runs out. The TTL never outlives the
+    token's own expiry. When a write changes a user's identity or role,
+    invalidate_user drops every entry for that user, so the next request is
+    re-verified.
+
+    Each worker process holds its own cache. A write made through another
+    worker is seen here within PRINCIPAL_CACHE_TTL.
+    """
+
+    def __init__(self, max_entries: int = PRINCIPAL_CACHE_MAX_ENTRIES, ttl: float = PRINCIPAL_CACHE_TTL):
+        self.ttl = ttl
+        self._cache = TTLCache(max_entries=max_entries, default_ttl=ttl)
+        # Bumped by invalidate_user; entries stamped with an older generation are stale
+        self._generations: Dict[UUID, int] = {}
+        # Bumped on every invalidation, so a verification that raced one is not cached
+        self.version = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def get(self, token: str) -> Optional[schemas.Principal]:
+        entry = self._cache.get(self._key(token))
+        if entry is None:
+            return None
+        principal, generation = entry
+        if generation != self._generations.get(principal.id, 0):
+            return None
+        return principal
+
+    def put(
+        self,
+        token: str,
+        principal: schemas.Principal,
+        expires_at: Optional[float] = None,
+        version: Optional[int] = None,
+    ) -> None:
+        """Cache a verified principal.
+
+        Args:
+            token (str): The bearer token the principal was verified from.
+            principal (schemas.Principal): The verified identity.
+            expires_at (Optional[float]): The token's exp claim, in epoch seconds.
+            version (Optional[int]): `self.version` as read before verifying. The
+                entry is dropped if an invalidation happened in between.
+        """
+        if version is not None and version != self.version:
+            return
+        ttl = self.ttl
+        if expires_at is not None:
+            ttl = min(ttl, expires_at - time.time())
+        if ttl <= 0:
+            return
+        generation = self._generations.get(principal.id, 0)
+        self._cache.set(self._key(token), (principal, generation), ttl)
+
+    def invalidate_user(self, user_id: UUID) -> None:
+        with self._lock:
+            self._generations[user_id] = self._generations.get(user_id, 0) + 1
+            self.version += 1
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"ttl_seconds": self.ttl, **self._cache.stats()}
+
+principal_cache = PrincipalCache()
@@ -0,0 +1,164 @@
+from typing import Dict, Any, Iterable, List, NamedTuple, Optional, Tuple
+from datetime import datetime, timezone
+from decimal import Decimal, ROUND_HALF_UP
+from functools import lru_cache
+from uuid import UUID
+import logging
+import os
+import re
+
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from .. import models, schemas
+from .availability import busy_jet_ids, to_timestamp
+from .cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+QUOTE_RATE_TTL = float(os.getenv("QUOTE_RATE_TTL", "300"))
+QUOTE_RATE_MAX_ENTRIES = int(os.getenv("QUOTE_RATE_MAX_ENTRIES", "10000"))
+
+_CENTS = Decimal("0.01")
+_HOURS = Decimal("0.0001")
+_SECONDS_PER_HOUR = Decimal(3600)
+# Membership benefits are free text such as "10% discount on flights"
+_DISCOUNT_PATTERN = re.compile(r"(\d+(?:\.\d+)?)\s*%\s*discount", re.IGNORECASE)
+
+class JetRate(NamedTuple):
+    price_per_hour: Decimal
+    max_passengers: Optional[int]
+
+@lru_cache(maxsize=256)
+def _parse_discount(benefits: Tuple[str, ...]) -> Decimal:
+    percents = [Decimal(match) for benefit in benefits for match in _DISCOUNT_PATTERN.findall(benefit or "")]
+    return min(max(percents, default=Decimal(0)), Decimal(100))
+
+def discount_percent(benefits: Optional[Iterable[str]]) -> Decimal:
+    """The flight discount a membership grants, read from its benefits text."""
+    return _parse_discount(tuple(benefits or ()))
+
+def flight_hours(start_time: datetime, end_time: datetime) -> Decimal:
+    seconds = Decimal(str(to_timestamp(end_time) - to_timestamp(start_time)))
+    return (seconds / _SECONDS_PER_HOUR).quantize(_HOURS, rounding=ROUND_HALF_UP)
+
+def price(price_per_hour: Decimal, hours: Decimal, discount: Decimal = Decimal(0)) -> Decimal:
+    """Charter price: hourly rate times flight duration, less the membership discount."""
+    return (price_per_hour * hours * (100 - discount) / 100).quantize(_CENTS, rounding=ROUND_HALF_UP)
+
+def _membership_benefits(user_id: UUID):
+    """Benefits of the user's plan and of their active memberships."""
+    now = datetime.now(timezone.utc)
+    return select(models.Membership.benefits).where(or_(
+        models.Membership.id == select(models.User.membership_id).where(models.User.id == user_id).scalar_subquery(),
+        models.Membership.id.in_(
+            select(models.UserMembership.membership_id).where(
+                models.UserMembership.user_id == user_id,
+                models.UserMembership.status == "active",
+                models.UserMembership.end_date > now,
+            )
+        ),
+    ))
+
+def _best_discount(benefits: Iterable[Optional[List[str]]]) -> Decimal:
+    return max((discount_percent(b) for b in benefits), default=Decimal(0))
+
+def user_discount(db: Session, user_id: UUID) -> Decimal:
+    """QuoteEngine.discount_for for code running on a blocking Session."""
+    return _best_discount(db.scalars(_membership_benefits(user_id)).all())
+
+class QuoteEngine:
+    """Prices bookings on the server from the jet's hourly rate.
+
+    Jet rates are memoized per jet for QUOTE_RATE_TTL seconds. Admin jet
+    writes call invalidate_jet. A quote for many jets costs one query for the
+    rates not yet cached, one for the user's discount and one availability
+    lookup, however many jets it covers.
+
+    Charters are priced per aircraft, so passengers do not change the price.
+    They only decide whether the jet has enough seats.
+    """
+
+    def __init__(self, ttl: float = QUOTE_RATE_TTL, max_entries: int = QUOTE_RATE_MAX_ENTRIES):
+        self._rates = TTLCache(max_entries=max_entries, default_ttl=ttl)
+
+    async def rates(self, db: AsyncSession, jet_ids: Iterable[UUID]) -> Dict[UUID, JetRate]:
+        """Rates for the given jets. Unknown jets and jets without a price are left out."""
+        found: Dict[UUID, JetRate] = {}
+        missing = []
+        for jet_id in dict.fromkeys(jet_ids):
+            rate = self._rates.get(str(jet_id))
+            if rate is None:
+                missing.append(jet_id)
+            else:
+                found[jet_id] = rate
+        if missing:
+            rows = await db.execute(
+                select(models.Jet.id, models.Jet.price_per_hour, models.Jet.max_passengers)
+                .where(models.Jet.id.in_(missing), models.Jet.price_per_hour.is_not(None))
+            )
+            for jet_id, price_per_hour, max_passengers in rows:
+                rate = found[jet_id] = JetRate(Decimal(price_per_hour), max_passengers)
+                self._rates.set(str(jet_id), rate)
+        return found
+
+    async def discount_for(self, db: AsyncSession, user_id: UUID) -> Decimal:
+        """The best flight discount among the user's plan and active memberships, in percent."""
+        return _best_discount((await db.scalars(_membership_benefits(user_id))).all())
+
+    async def quote(
+        self,
+        db: AsyncSession,
+        user_id: UUID,
+        jet_ids: List[UUID],
+        start_time: datetime,
+        end_time: datetime,
+        passengers: int = 1,
+    ) -> List[schemas.JetQuote]:
+        """Quote every priced jet in `jet_ids` for one trip, in request order."""
+        rates = await self.rates(db, jet_ids)
+        discount = await self.discount_for(db, user_id)
+        busy = await busy_jet_ids(db, start_time, end_time)
+        hours = flight_hours(start_time, end_time)
+        quotes = []
+        for jet_id in dict.fromkeys(jet_ids):
+            rate = rates.get(jet_id)
+            if rate is None:
+                continue
+            quotes.append(schemas.JetQuote(
+                jet_id=jet_id,
+                price_per_hour=rate.price_per_hour,
+                hours=hours,
+                discount_percent=discount,
+                total_price=price(rate.price_per_hour, hours, discount),
+                fits_passengers=rate.max_passengers is None or passengers <= rate.max_passengers,
+                available=jet_id not in busy,
+            ))
+        return quotes
+
+    async def total_price(
+        self, db: AsyncSession, user_id: UUID, jet_id: UUID, start_time: datetime, end_time: datetime
+    ) -> Optional[Decimal]:
+        """The price of one booking, or None if the jet has no hourly rate."""
+        return (await self.total_prices(db, user_id, [(jet_id, start_time, end_time)]))[0]
+
+    async def total_prices(
+        self, db: AsyncSession, user_id: UUID, legs: List[Tuple[UUID, datetime, datetime]]
+    ) -> List[Optional[Decimal]]:
+        """Prices for several (jet_id, start_time, end_time) bookings by one user, in order."""
+        rates = await self.rates(db, [jet_id for jet_id, _, _ in legs])
+        discount = await self.discount_for(db, user_id)
+        totals = []
+        for jet_id, start_time, end_time in legs:
+            rate = rates.get(jet_id)
+            totals.append(None if rate is None else price(rate.price_per_hour, flight_hours(start_time, end_time), discount))
+        return totals
+
+    def invalidate_jet(self, jet_id: UUID) -> None:
+        self._rates.delete(str(jet_id))
+
+    def stats(self) -> Dict[str, Any]:
+        return self._rates.stats()
+
+quote_engine = QuoteEngine()
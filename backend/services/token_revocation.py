@@ -0,0 +1,179 @@
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator, Optional
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+TOKEN_REVOCATION_FILE = os.getenv("TOKEN_REVOCATION_FILE")
+TOKEN_REVOCATION_SYNC_INTERVAL = float(os.getenv("TOKEN_REVOCATION_SYNC_INTERVAL", "1"))
+
+@contextmanager
+def _locked(path: str) -> Iterator[None]:
+    """Hold an exclusive lock shared by every process using the revocation file at `path`.
+
+    The lock lives in a separate file, because compaction replaces the
+    revocation file itself.
+    """
+    with open(f"{path}.lock", "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+class TokenRevocationList:
+    """Token IDs (jti claims) that must be rejected before they expire.
+
+    Lookups are a dict membership test. Each entry is kept only until its
+    token would have expired anyway, so the set stays as small as the number
+    of revoked tokens that are still live.
+
+    With `path` set, revocations are appended to a JSON-lines file, so they
+    survive restarts and reach other worker processes. A background task
+    (start_sync) picks up the appended lines every `sync_interval` seconds in
+    a worker thread, so checks on the request path never touch the file.
+    When the file is replaced (for example by compaction), the worker reloads
+    it in full.
+    """
+
+    def __init__(self, path: Optional[str] = TOKEN_REVOCATION_FILE, sync_interval: float = TOKEN_REVOCATION_SYNC_INTERVAL):
+        self.path = path
+        self.sync_interval = sync_interval
+        self._revoked: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._inode = None
+        self._offset = 0
+        self._sync_task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._revoked)
+
+    def revoke(self, jti: Optional[str], expires_at: Optional[float]) -> None:
+        """Reject `jti` until `expires_at` (epoch seconds). Tokens without a jti cannot be revoked."""
+        if not jti:
+            return
+        expires_at = float(expires_at) if expires_at is not None else time.time() + 24 * 3600
+        if expires_at <= time.time():
+            return
+        with self._lock:
+            self._revoked[jti] = expires_at
+            if self.path:
+                self._append(jti, expires_at)
+
+    def is_revoked(self, jti: Optional[str]) -> bool:
+        if not jti:
+            return False
+        expires_at = self._revoked.get(jti)
+        return expires_at is not None and expires_at > time.time()
+
+    def prune(self) -> None:
+        now = time.time()
+        with self._lock:
+            for jti in [jti for jti, expires_at in self._revoked.items() if expires_at <= now]:
+                del self._revoked[jti]
+
+    def start_sync(self) -> None:
+        """Start syncing from the file and pruning expired entries in the background."""
+        if self._sync_task is None or self._sync_task.done():
+            self._sync_task = asyncio.create_task(self._sync_loop())
+
+    async def stop_sync(self) -> None:
+        if self._sync_task is not None:
+            self._sync_task.cancel()
+            try:
+                await self._sync_task
+            except asyncio.CancelledError:
+                pass
+            self._sync_task = None
+
+    async def _sync_loop(self) -> None:
+        # Without a file there is nothing to sync, only expired entries to drop
+        interval = self.sync_interval if self.path else 60
+        while True:
+            try:
+                if self.path:
+                    await asyncio.to_thread(self.sync)
+                self.prune()
+            except Exception as e:
+                logger.error(f"Token revocation sync failed: {e}")
+            await asyncio.sleep(interval)
+
+    def _append(self, jti: str, expires_at: float) -> None:
+        try:
+            # Under the file lock, so a compaction in another worker cannot drop the line
+            with _locked(self.path), open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps({"jti": jti, "exp": expires_at}) + "\n")
+        except OSError as e:
+            logger.error(f"Could not persist token revocation to {self.path}: {e}")
+
+    def sync(self) -> None:
+        """Load revocations appended to the file by this or another worker."""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return
+        with self._lock:
+            if stat.st_ino != self._inode or stat.st_size < self._offset:
+                self._inode = stat.st_ino
+                self._offset = 0
+            if stat.st_size == self._offset:
+                return
+            now = time.time()
+            with open(self.path, "rb") as f:
+                f.seek(self._offset)
+                data = f.read()
+            # Leave a partially written last line for the next sync
+            complete = data[:data.rfind(b"\n") + 1]
+            self._offset += len(complete)
+            for line in complete.splitlines():
+                try:
+                    entry = json.loads(line)
+                    if entry["exp"] > now:
+                        self._revoked[entry["jti"]] = entry["exp"]
+                except (ValueError, KeyError, TypeError):
+                    continue
+
+    def compact(self) -> None:
+        """Rewrite the file with only the revocations that are still live.
+
+        Runs at startup in every worker. It holds the file lock that appends
+        also take, so revocations written by other workers are either read
+        before the rewrite or appended to the new file, never lost.
+        """
+        if not self.path:
+            return
+        with _locked(self.path):
+            self.sync()
+            self.prune()
+            with self._lock:
+                tmp_path = f"{self.path}.{os.getpid()}.tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    for jti, expires_at in self._revoked.items():
+                        f.write(json.dumps({"jti": jti, "exp": expires_at}) + "\n")
+                os.replace(tmp_path, self.path)
+                stat = os.stat(self.path)
+                self._inode, self._offset = stat.st_ino, stat.st_size
+
+    def stats(self) -> Dict[str, Any]:
+        return {"revoked": len(self._revoked), "persistent": bool(self.path)}
+
+revocation_list = TokenRevocationList()
@@ -8,7 +8,7 @@ setup(
         "fastapi",
         "uvicorn",
         "sqlalchemy",
-        "python-jose[cryptography]",
+        "PyJWT",
         "passlib[bcrypt]",
         "python-multipart",
     ],
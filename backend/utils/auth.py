@@ -1,26 +1,52 @@
+"""The single home for token and password settings.
+
+Every router issues and verifies tokens through this module, and hashes
+passwords through the shared CryptContext owned by the password hasher.
+Settings are read from the environment once, at import.
+"""
 import os
+import uuid
 from dotenv import load_dotenv
 from datetime import datetime, timedelta
 from typing import Optional
 import logging # Import the logging module
 
-from passlib.context import CryptContext
-from jose import JWTError, jwt
+import jwt
+
+from ..services.password_hasher import password_hasher
+from .metrics import LatencyHistogram
 
 # Configure logger for this module
 logger = logging.getLogger(__name__)
 
 load_dotenv()
 
-SECRET_KEY = os.getenv("SECRET_KEY", "your-super-secret-key")  # Secret key for JWT encoding/decoding. Load from environment, default for dev.
-ALGORITHM = "HS256" # Algorithm used for JWT encoding.
-ACCESS_TOKEN_EXPIRE_MINUTES = 30 # Expiration time for access tokens in minutes.
+SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-here")  # Secret key for JWT encoding/decoding. Load from environment, default for dev.
+ALGORITHM = os.getenv("ALGORITHM", "HS256") # Algorithm used for JWT encoding.
+ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "15")) # Expiration time for access tokens in minutes; clients renew them via /auth/refresh.
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "7")) # Expiration time for refresh tokens in days.
+
+# Values of the "type" claim. Tokens issued before refresh tokens existed carry none and count as access tokens.
+ACCESS_TOKEN_TYPE = "access"
+REFRESH_TOKEN_TYPE = "refresh"
+
+# Shared with the password hasher so hashing and verifying agree on the bcrypt cost
+pwd_context = password_hasher.context
+
+# Encoded once instead of on every decode
+_KEY = SECRET_KEY.encode()
+# Every token we issue carries these claims
+_DECODE_OPTIONS = {"require": ["exp"]}
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Time spent authenticating each request, split by whether the principal cache answered
+auth_overhead = {"cached": LatencyHistogram(), "verified": LatencyHistogram()}
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verifies a plain-text password against a hashed password.
 
+    Blocks for the full bcrypt cost; async code should await
+    password_hasher.verify instead.
+
     Args:
         plain_password (str): The plain-text password to verify.
         hashed_password (str): The hashed password to compare against.
@@ -28,25 +54,21 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     Returns:
         bool: True if the passwords match, False otherwise.
     """
-    result = pwd_context.verify(plain_password, hashed_password)
-    if result:
-        logger.info("Password verification successful.")
-    else:
-        logger.warning("Password verification failed.")
-    return result
+    return pwd_context.verify(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
     """Hashes a plain-text password.
 
+    Blocks for the full bcrypt cost; async code should await
+    password_hasher.hash instead.
+
     Args:
         password (str): The plain-text password to hash.
 
     Returns:
         str: The hashed password.
     """
-    hashed_password = pwd_context.hash(password)
-    logger.info("Password hashed successfully.")
-    return hashed_password
+    return pwd_context.hash(password)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Creates a JWT access token.
@@ -58,29 +80,36 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     Returns:
         str: The encoded JWT access token.
     """
+    return _encode(data, expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES), ACCESS_TOKEN_TYPE)
+
+def create_refresh_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
+    """Creates a long-lived refresh token, accepted only by /auth/refresh.
+
+    Args:
+        data (dict): The identity claims to carry (sub, id, role).
+        expires_delta (Optional[timedelta]): Optional timedelta for token expiration. If None, uses default.
+
+    Returns:
+        str: The encoded JWT refresh token.
+    """
+    return _encode(data, expires_delta or timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS), REFRESH_TOKEN_TYPE)
+
+def _encode(data: dict, expires_delta: timedelta, token_type: str) -> str:
     to_encode = data.copy()
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
-    else:
-        expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
-    logger.info(f"Access token created for user: {data.get('sub')}")
-    return encoded_jwt
-
-def decode_access_token(token: str) -> Optional[dict]:
-    """Decodes a JWT access token.
+    # jti gives every token an identity the revocation list can refer to
+    to_encode.update({"exp": datetime.utcnow() + expires_delta, "jti": uuid.uuid4().hex, "type": token_type})
+    return jwt.encode(to_encode, _KEY, algorithm=ALGORITHM)
+
+def decode_access_token(token: str) -> dict:
+    """Verifies a JWT access token and returns its claims.
 
     Args:
         token (str): The JWT access token to decode.
 
+    Raises:
+        InvalidTokenError: If the token is malformed, has a bad signature, or has expired.
+
     Returns:
-        Optional[dict]: The decoded payload if valid, otherwise None.
+        dict: The decoded payload.
     """
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        logger.info("Access token decoded successfully.")
-        return payload
-    except JWTError as e:
-        logger.warning(f"JWT decoding failed: {e}")
-        return None 
\ No newline at end of file
+    return jwt.decode(token, _KEY, algorithms=[ALGORITHM], options=_DECODE_OPTIONS)
@@ -0,0 +1,58 @@
+"""Opt-in diagnostic logging for single requests.
+
+Handlers used to log every row they returned as pretty-printed JSON, which
+dominated the cost of list endpoints. Those dumps now go through here and
+are skipped unless the request is traced. A request is traced when it sends
+`X-Debug-Trace: 1`, or when it falls in the DEBUG_TRACE_SAMPLE_RATE sample
+(0 by default). Payloads are built only for traced requests, and list dumps
+stop after DEBUG_TRACE_MAX_ROWS rows.
+"""
+from contextvars import ContextVar, Token
+from typing import Any, Callable, Dict, Mapping, Sequence
+import json
+import logging
+import os
+import random
+
+from sqlalchemy import inspect
+
+DEBUG_TRACE_HEADER = "X-Debug-Trace"
+DEBUG_TRACE_SAMPLE_RATE = float(os.getenv("DEBUG_TRACE_SAMPLE_RATE", "0"))
+DEBUG_TRACE_MAX_ROWS = int(os.getenv("DEBUG_TRACE_MAX_ROWS", "20"))
+
+# Never written to logs, even for traced requests
+_REDACTED = frozenset({"password", "password_hash"})
+
+_tracing: ContextVar[bool] = ContextVar("debug_trace", default=False)
+
+def start(headers: Mapping[str, str]) -> Token:
+    """Decide whether the current request is traced. Pass the result to reset() when it ends."""
+    traced = headers.get(DEBUG_TRACE_HEADER, "").lower() in ("1", "true", "yes") or (
+        DEBUG_TRACE_SAMPLE_RATE > 0 and random.random() < DEBUG_TRACE_SAMPLE_RATE
+    )
+    return _tracing.set(traced)
+
+def reset(token: Token) -> None:
+    _tracing.reset(token)
+
+def enabled() -> bool:
+    return _tracing.get()
+
+def columns(obj: Any) -> Dict[str, Any]:
+    """The column values of an ORM object, or the fields of a dict, without credentials."""
+    if isinstance(obj, Mapping):
+        items = obj.items()
+    else:
+        items = ((attr.key, getattr(obj, attr.key)) for attr in inspect(obj).mapper.column_attrs)
+    return {key: value for key, value in items if key not in _REDACTED}
+
+def trace(logger: logging.Logger, message: str, payload: Callable[[], Any]) -> None:
+    """Log `payload()` as JSON if the request is traced; otherwise payload is never called."""
+    if _tracing.get():
+        logger.info(f"{message}: {json.dumps(payload(), default=str)}")
+
+def trace_rows(logger: logging.Logger, message: str, rows: Sequence[Any], to_dict: Callable[[Any], Dict[str, Any]] = columns) -> None:
+    """Log up to DEBUG_TRACE_MAX_ROWS rows as one JSON line if the request is traced."""
+    if _tracing.get():
+        sample = [to_dict(row) for row in rows[:DEBUG_TRACE_MAX_ROWS]]
+        logger.info(f"{message} ({len(sample)} of {len(rows)}): {json.dumps(sample, default=str)}")
@@ -0,0 +1,54 @@
+from bisect import bisect_left
+from typing import Dict, Any, Sequence
+import threading
+
+# Default upper bounds (in seconds) for latency buckets, Prometheus style.
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+class LatencyHistogram:
+    """Thread-safe cumulative histogram of durations measured in seconds."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Clear all recorded observations."""
+        with self._lock:
+            self._counts = [0] * (len(self.buckets) + 1)
+            self._count = 0
+            self._sum = 0.0
+            self._max = 0.0
+
+    def observe(self, seconds: float) -> None:
+        """Record a single duration.
+
+        Args:
+            seconds (float): The observed duration in seconds.
+        """
+        index = bisect_left(self.buckets, seconds)
+        with self._lock:
+            self._counts[index] += 1
+            self._count += 1
+            self._sum += seconds
+            if seconds > self._max:
+                self._max = seconds
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the histogram as a JSON-serialisable dict with cumulative buckets."""
+        with self._lock:
+            counts = list(self._counts)
+            total, total_sum, maximum = self._count, self._sum, self._max
+        cumulative = 0
+        buckets = []
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += count
+            buckets.append({"le": "+Inf" if bound == float("inf") else bound, "count": cumulative})
+        return {
+            "count": total,
+            "sum_seconds": round(total_sum, 6),
+            "avg_seconds": round(total_sum / total, 6) if total else 0.0,
+            "max_seconds": round(maximum, 6),
+            "buckets": buckets,
+        }
@@ -0,0 +1,83 @@
+from typing import Any, List, Optional, Tuple
+from datetime import datetime
+from uuid import UUID
+import base64
+import binascii
+
+from fastapi import HTTPException, Query, Response, status
+from sqlalchemy import Select, literal, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+# List bodies stay plain JSON arrays; the cursor for the next page travels in this header
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+CursorKey = Tuple[datetime, UUID]
+
+def encode_cursor(created_at: datetime, id: UUID) -> str:
+    """Encode a (created_at, id) position as an opaque URL-safe cursor."""
+    raw = f"{created_at.isoformat()}|{id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> CursorKey:
+    """Decode a cursor produced by encode_cursor.
+
+    Raises:
+        HTTPException: 400 if the cursor is malformed.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, id = raw.split("|", 1)
+        return datetime.fromisoformat(created_at), UUID(id)
+    except (ValueError, binascii.Error, UnicodeDecodeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid pagination cursor")
+
+class PageParams:
+    """Query parameters shared by every paginated list endpoint."""
+
+    def __init__(
+        self,
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Maximum number of items to return"),
+        after: Optional[str] = Query(None, description=f"Cursor from the {NEXT_CURSOR_HEADER} header of the previous page"),
+    ):
+        self.limit = limit
+        self.after = after
+        self.after_key: Optional[CursorKey] = decode_cursor(after) if after else None
+
+def set_next_cursor(response: Response, key: Optional[CursorKey]) -> None:
+    """Advertise the next page, if there is one."""
+    if key is not None:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(*key)
+
+async def fetch_page(db: AsyncSession, query: Select, model, page: PageParams) -> Tuple[List[Any], Optional[CursorKey]]:
+    """Run `query` as one keyset page ordered by (created_at, id).
+
+    Fetches one row beyond the limit to learn whether another page exists,
+    so each request reads at most limit + 1 rows regardless of table size.
+
+    Args:
+        db (AsyncSession): Database session.
+        query (Select): A select of `model`, with any filters already applied.
+        model: The mapped class; must have created_at and id columns.
+        page (PageParams): The limit and decoded cursor.
+
+    Returns:
+        Tuple[List[Any], Optional[CursorKey]]: At most `page.limit` instances, and
+        the key to resume after when another page exists.
+    """
+    if page.after_key is not None:
+        created_at, id = page.after_key
+        query = query.where(tuple_(model.created_at, model.id) > tuple_(literal(created_at), literal(id)))
+    query = query.order_by(model.created_at, model.id).limit(page.limit + 1)
+    rows = (await db.scalars(query)).all()
+    if len(rows) > page.limit:
+        rows = rows[:page.limit]
+        return rows, (rows[-1].created_at, rows[-1].id)
+    return rows, None
+
+async def paginate(db: AsyncSession, query: Select, model, page: PageParams, response: Response) -> List[Any]:
+    """Like fetch_page, but sets the next-page cursor header on `response`."""
+    rows, next_key = await fetch_page(db, query, model, page)
+    set_next_cursor(response, next_key)
+    return rows